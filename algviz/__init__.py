@@ -13,7 +13,6 @@ License: GPLv3
 
 """
 
-from .visual import Visualizer
 from .graph import GraphNode, parseGraph, updateGraphEdge, generateRandomGraph
 from .tree import BinaryTreeNode, TreeNode, RecursiveTree, parseBinaryTree, parseTree
 from .linked_list import ForwardLinkedListNode, DoublyLinkedListNode
@@ -91,6 +90,17 @@ __all__ = [
 ]
 
 
+def __getattr__(name):
+    """Import the Visualizer and it's rendering modules on first use,
+    so the scripts only use the data structures don't pay for them.
+    """
+    if name == 'Visualizer':
+        from .visual import Visualizer
+        globals()['Visualizer'] = Visualizer
+        return Visualizer
+    raise AttributeError('module {} has no attribute {}'.format(__name__, name))
+
+
 __title__ = 'algviz'
 __version__ = _version
 __author__ = 'zjl9959@gmail.com'
@@ -40,6 +40,8 @@ class GraphNode(NodeBase):
     Attributes:
         val (printable): The label to be displayed in the graph node.
     """
+    __slots__ = ('_neighbors',)
+
     def __init__(self, val):
         super().__init__(val)
         super().__setattr__('_neighbors', list())   # tuple(Neighbor Node, Edge Label).
@@ -50,7 +52,7 @@ class GraphNode(NodeBase):
         Returns:
             GraphNeighborIter: Neighbor node iterator.
         """
-        iter_neighbors = super().__getattribute__('_neighbors')
+        iter_neighbors = self._neighbors
         return GraphNeighborIter(self, tuple(iter_neighbors))
 
     def neighborCount(self):
@@ -59,7 +61,7 @@ class GraphNode(NodeBase):
         Returns:
             int: neighbors count.
         """
-        neighbors_ = super().__getattribute__('_neighbors')
+        neighbors_ = self._neighbors
         return len(neighbors_)
 
     def neighborAt(self, index):
@@ -75,7 +77,7 @@ class GraphNode(NodeBase):
         Raises:
             AlgvizParamError: GraphNode neighbor index type error or out of range.
         """
-        neighbors_ = super().__getattribute__('_neighbors')
+        neighbors_ = self._neighbors
         if type(index) != int or index < 0 or index >= len(neighbors_):
             raise AlgvizParamError('GraphNode neighbor index type error or out of range.')
         return neighbors_[index][0], neighbors_[index][1]
@@ -90,7 +92,7 @@ class GraphNode(NodeBase):
             int: the index position of the neighbor node. If node not found, then return -1.
         """
         res = -1
-        neighbors_ = super().__getattribute__('_neighbors')
+        neighbors_ = self._neighbors
         for i in range(len(neighbors_)):
             if node == neighbors_[i][0]:
                 res = i
@@ -108,7 +110,7 @@ class GraphNode(NodeBase):
         """
         if (type(index) != int and index is not None) or (type(index) == int and index < 0):
             raise AlgvizParamError('GraphNode neighbor index should be a positive integer!')
-        neighbors_ = super().__getattribute__('_neighbors')
+        neighbors_ = self._neighbors
         for (n, _) in neighbors_:
             if node == n:
                 return
@@ -124,7 +126,7 @@ class GraphNode(NodeBase):
         Args:
             node (GraphNode): The neighbor node to be removed.
         """
-        neighbors_ = super().__getattribute__('_neighbors')
+        neighbors_ = self._neighbors
         for i in range(len(neighbors_)):
             if neighbors_[i][0] == node:
                 neighbors_.pop(i)
@@ -140,7 +142,7 @@ class GraphNode(NodeBase):
         Raises:
             AlgvizParamError: GraphNode neighbor index type error or out of range.
         """
-        neighbors_ = super().__getattribute__('_neighbors')
+        neighbors_ = self._neighbors
         if type(index) != int or index < 0 or index >= len(neighbors_):
             raise AlgvizParamError('GraphNode neighbor index type error or out of range.')
         neighbors_.pop(index)
@@ -152,7 +154,7 @@ class GraphNode(NodeBase):
         Returns:
             list[(neighbor_node, edge)]: All the neighbors nodes and edges.
         """
-        neighbors_ = super().__getattribute__('_neighbors')
+        neighbors_ = self._neighbors
         return neighbors_
 
 
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+
+"""Define the native layout engines which render SvgGraph without graphviz.
+
+The SVG generated by these engines keeps the same structure as graphviz's output,
+so SvgGraph can add animations on it as usual::
+
+    <svg width="{W}pt" height="{H}pt" viewBox="0.00 0.00 {W}.00 {H}.00">
+      <g id="graph0" class="graph" transform="scale(1 1) rotate(0) translate(4 {H-4})">
+        <g id="node{id}" class="node"><title/><ellipse/><text/></g>
+        <g id="edge{id}" class="edge"><title/><path/><polygon/><text/></g>
+      </g>
+    </svg>
+
+Author: zjl9959@gmail.com
+
+License: GPLv3
+
+"""
+
+from math import ceil, sqrt
+
+from algviz.utility import text_font_size, get_text_width, FONT_FAMILY
+
+
+NODE_RADIUS = 18            # The radius of graph node circle (same as graphviz's default node size).
+NODE_SEP = 18               # The minimum horizontal space between two nodes in the same rank.
+RANK_SEP = 72               # The vertical distance between the center of two adjacent ranks.
+ARROW_LENGTH = 10           # The length of the 'vee' arrowhead.
+ARROW_WIDTH = 4.5           # The half width of the 'vee' arrowhead.
+ARROW_NOTCH = 6.22          # The depth of the notch in the 'vee' arrowhead.
+SVG_PADDING = 4             # The padding between the graph and the SVG border.
+DOUBLE_EDGE_SHIFT = 6       # The distance between each one of the two edges and their center line.
+ARC_BEND_RATE = 0.3         # The bend distance of an arc edge relative to it's length.
+EDGE_COLOR = '#7b7b7b'
+EDGE_LABEL_COLOR = '#c0c0c0'
+EDGE_LABEL_FONT_SIZE = 12
+
+
+def _escape_(data):
+    """Escape the text data as the same as xml.sax.saxutils.escape, which is slow to import."""
+    return data.replace('&', '&amp;').replace('>', '&gt;').replace('<', '&lt;')
+
+
+def _node_svg_(node_id, label, cx, cy):
+    """Generate a graph node <g> element in SVG.
+
+    Args:
+        node_id (int): The consecutive id of this node in SVG.
+        label (str): The text to be displayed in this node.
+        cx, cy (float): The center position of this node.
+
+    Returns:
+        str: The SVG string of this node.
+    """
+    fs = min(14, text_font_size(NODE_RADIUS * 2 - 4, label))
+    return ('<g id="node{0}" class="node"><title>{0}</title>'
+            '<ellipse fill="none" stroke="{1}" cx="{2:.2f}" cy="{3:.2f}" rx="{4}" ry="{4}"/>'
+            '<text text-anchor="middle" x="{2:.2f}" y="{5:.2f}" font-family="{6}" font-size="{7:.2f}">{8}</text>'
+            '</g>').format(node_id, EDGE_COLOR, cx, cy, NODE_RADIUS, cy + fs * 0.33, FONT_FAMILY, fs, _escape_(label))
+
+
+def _edge_svg_(edge_id, node1_id, node2_id, points, label, directed):
+    """Generate a graph edge <g> element in SVG.
+
+    Args:
+        edge_id (int): The consecutive id of this edge in SVG.
+        node1_id, node2_id (int): The consecutive id of the begin and end node in SVG.
+        points (list((float, float))): The begin point, two bezier control points and the end point of the edge path.
+            The arrowhead(if directed) starts from the end point along the direction from the last control point.
+        label (printable): The label of this edge, None if no label.
+        directed (bool): Whether to draw an arrowhead at the end of this edge.
+
+    Returns:
+        str: The SVG string of this edge.
+    """
+    (x0, y0), (x1, y1), (x2, y2), (x3, y3) = points
+    res = ['<g id="edge{}" class="edge"><title>{}{}{}</title>'.format(edge_id, node1_id, '-&gt;' if directed else '--', node2_id)]
+    if directed:
+        dx, dy = x3 - x2, y3 - y2
+        dist = sqrt(dx * dx + dy * dy)
+        if dist < 0.001:
+            dx, dy, dist = x3 - x0, y3 - y0, max(sqrt((x3 - x0) ** 2 + (y3 - y0) ** 2), 0.001)
+        ux, uy = dx / dist, dy / dist
+        tx, ty = x3 + ux * ARROW_LENGTH, y3 + uy * ARROW_LENGTH
+        nx, ny = -uy * ARROW_WIDTH, ux * ARROW_WIDTH
+        mx, my = tx - ux * ARROW_NOTCH, ty - uy * ARROW_NOTCH
+    res.append('<path fill="none" stroke="{}" d="M{:.2f},{:.2f}C{:.2f},{:.2f} {:.2f},{:.2f} {:.2f},{:.2f}"/>'.format(
+        EDGE_COLOR, x0, y0, x1, y1, x2, y2, x3, y3))
+    if directed:
+        vee = ((tx, ty), (x3 + nx, y3 + ny), (mx, my), (x3, y3), (mx, my), (x3 - nx, y3 - ny), (tx, ty))
+        res.append('<polygon fill="{0}" stroke="{0}" points="{1}"/>'.format(
+            EDGE_COLOR, ' '.join('{:.2f},{:.2f}'.format(x, y) for x, y in vee)))
+    if label is not None:
+        label = str(label)
+        lx = (x0 + x3) * 0.5 + get_text_width(label, EDGE_LABEL_FONT_SIZE) * 0.5 + 2
+        ly = (y0 + y3) * 0.5 + EDGE_LABEL_FONT_SIZE * 0.33
+        res.append('<text text-anchor="middle" x="{:.2f}" y="{:.2f}" font-family="{}" font-size="{:.2f}" fill="{}">{}</text>'.format(
+            lx, ly, FONT_FAMILY, EDGE_LABEL_FONT_SIZE, EDGE_LABEL_COLOR, _escape_(label)))
+    res.append('</g>')
+    return ''.join(res)
+
+
+def _straight_edge_points_(pos1, pos2, directed):
+    """Calculate the points of a straight edge between the border of two node circles.
+
+    Args:
+        pos1, pos2 ((float, float)): The center position of the begin and end node.
+        directed (bool): Whether to leave the space for arrowhead at the end of this edge.
+
+    Returns:
+        list((float, float)): The begin point, two bezier control points and the end point of the edge path.
+    """
+    dx, dy = pos2[0] - pos1[0], pos2[1] - pos1[1]
+    dist = max(sqrt(dx * dx + dy * dy), 0.001)
+    ux, uy = dx / dist, dy / dist
+    end_space = NODE_RADIUS + ARROW_LENGTH if directed else NODE_RADIUS
+    x0, y0 = pos1[0] + ux * NODE_RADIUS, pos1[1] + uy * NODE_RADIUS
+    x3, y3 = pos2[0] - ux * end_space, pos2[1] - uy * end_space
+    return [(x0, y0), (x0 + (x3 - x0) / 3, y0 + (y3 - y0) / 3), (x0 + (x3 - x0) * 2 / 3, y0 + (y3 - y0) * 2 / 3), (x3, y3)]
+
+
+def _render_graph_svg_(node_seq, edge_label, node_idmap, edge_idmap, directed, node_pos, edge_points=None):
+    """Render the positioned nodes and edges into a graphviz like SVG document.
+
+    Args:
+        node_seq (list(GraphNodeBase)): All the nodes in graph.
+        edge_label (dict((GraphNodeBase, GraphNodeBase):printable)): All the edges and their labels in graph.
+        node_idmap (ConsecutiveIdMap): Map the node into it's id in SVG.
+        edge_idmap (ConsecutiveIdMap): Map the edge into it's id in SVG.
+        directed (bool): Whether the graph is a directed graph.
+        node_pos (dict(GraphNodeBase:(float, float))): The center position of each node, the y axis points down.
+        edge_points (dict((GraphNodeBase, GraphNodeBase):list((float, float)))): The path points of the curved edges.
+            Edges not in edge_points are drawn straight.
+
+    Returns:
+        str: The SVG string of the whole graph.
+    """
+    if edge_points is None:
+        edge_points = dict()
+    min_x, min_y, max_x, max_y = 0.0, 0.0, 0.0, 0.0
+    if len(node_pos) > 0:
+        min_x = min(x for x, _ in node_pos.values()) - NODE_RADIUS
+        max_x = max(x for x, _ in node_pos.values()) + NODE_RADIUS
+        min_y = min(y for _, y in node_pos.values()) - NODE_RADIUS
+        max_y = max(y for _, y in node_pos.values()) + NODE_RADIUS
+    for points in edge_points.values():
+        for (x, y) in points:
+            min_x, max_x = min(min_x, x), max(max_x, x)
+            min_y, max_y = min(min_y, y), max(max_y, y)
+    # Move the graph into graphviz's coordinate: 0 <= x <= width, -height <= y <= 0.
+    elements = list()
+    for (node1, node2), label in edge_label.items():
+        points = edge_points.get((node1, node2))
+        if points is None:
+            points = _straight_edge_points_(node_pos[node1], node_pos[node2], directed)
+        points = [(x - min_x, y - max_y) for (x, y) in points]
+        elements.append(_edge_svg_(edge_idmap.toConsecutiveId((node1, node2)), node_idmap.toConsecutiveId(node1),
+                                   node_idmap.toConsecutiveId(node2), points, label, directed))
+    for node in node_seq:
+        cx, cy = node_pos[node]
+        elements.append(_node_svg_(node_idmap.toConsecutiveId(node), str(node), cx - min_x, cy - max_y))
+    svg_width = int(ceil(max_x - min_x)) + SVG_PADDING * 2
+    svg_height = int(ceil(max_y - min_y)) + SVG_PADDING * 2
+    inner_width, inner_height = svg_width - SVG_PADDING, svg_height - SVG_PADDING
+    return ('<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+            'width="{0}pt" height="{1}pt" viewBox="0.00 0.00 {0}.00 {1}.00">'
+            '<g id="graph0" class="graph" transform="scale(1 1) rotate(0) translate({2} {3})">'
+            '<polygon fill="none" stroke="none" points="-{2},{2} -{2},-{3} {4},-{3} {4},{2} -{2},{2}"/>'
+            '{5}</g></svg>').format(svg_width, svg_height, SVG_PADDING, inner_height, inner_width, ''.join(elements))
+
+
+def _contour_values_(contour):
+    """Iterate the x positions of a subtree contour from the top rank to the bottom rank.
+
+    A contour is a persistent list: (head, tail, tail_skip, tail_shift).
+    It's values are the list head, followed by the values of contour tail
+    (skip the first tail_skip ranks and add tail_shift to each value).
+
+    Args:
+        contour (tuple): The contour to be iterated.
+
+    Yields:
+        float: The x position of the contour in each rank.
+    """
+    shift, skip = 0.0, 0
+    while contour is not None:
+        head, tail, tail_skip, tail_shift = contour
+        if skip < len(head):
+            for i in range(skip, len(head)):
+                yield head[i] + shift
+            skip = 0
+        else:
+            skip -= len(head)
+        skip += tail_skip
+        shift += tail_shift
+        contour = tail
+
+
+class _SubtreeLayout():
+    """The relative layout of one subtree, reused until the subtree changed.
+    """
+    __slots__ = ('children', 'results', 'offsets', 'left', 'right', 'height')
+
+    def __init__(self, children, results, offsets, left, right, height):
+        self.children = children    # The children slots of subtree root node, None for an empty binary tree slot.
+        self.results = results      # The _SubtreeLayout of each child node.
+        self.offsets = offsets      # The x offset of each child relative to the subtree root.
+        self.left = left            # The left contour of the subtree.
+        self.right = right          # The right contour of the subtree.
+        self.height = height        # The number of ranks in the subtree.
+
+
+def _place_siblings_(results):
+    """Place the sibling subtrees from left to right as close as possible.
+
+    Args:
+        results (list(_SubtreeLayout)): The layout of sibling subtrees.
+
+    Returns:
+        (list(float), contour, contour, int): The x position of each subtree root,
+            the combined left contour, the combined right contour and the combined height.
+    """
+    unit = NODE_RADIUS * 2 + NODE_SEP
+    positions = [0.0]
+    acc_left, acc_right, acc_height = results[0].left, results[0].right, results[0].height
+    for res in results[1:]:
+        gap = max(r - l for r, l in zip(_contour_values_(acc_right), _contour_values_(res.left)))
+        pos = gap + unit
+        positions.append(pos)
+        # The right contour of the new subtree covers all the ranks it reached.
+        if res.height >= acc_height:
+            acc_right = ([], res.right, 0, pos)
+        else:
+            head = [v + pos for v in _contour_values_(res.right)]
+            acc_right = (head, acc_right, res.height, 0.0)
+        # The left contour only extends when the new subtree is deeper.
+        if res.height > acc_height:
+            acc_left = (list(_contour_values_(acc_left)), res.left, acc_height, pos)
+            acc_height = res.height
+    return positions, acc_left, acc_right, acc_height
+
+
+class TreeLayoutEngine():
+    """Tidy tree layout (Reingold-Tilford) for BinaryTreeNode and TreeNode graphs.
+
+    The relative layout of each subtree is cached, only the changed subtrees and their ancestors are relayouted.
+    """
+
+    def __init__(self):
+        self._subtrees = dict()     # Key: tree node; Value: _SubtreeLayout of this subtree in the last frame.
+
+    def render(self, node_seq, edge_label, node_idmap, edge_idmap, directed):
+        """Layout the tree nodes and render them into SVG.
+
+        Args:
+            node_seq (list(GraphNodeBase)): All the nodes in graph.
+            edge_label (dict((GraphNodeBase, GraphNodeBase):printable)): All the edges and their labels in graph.
+            node_idmap (ConsecutiveIdMap): Map the node into it's id in SVG.
+            edge_idmap (ConsecutiveIdMap): Map the edge into it's id in SVG.
+            directed (bool): Whether the graph is a directed graph.
+
+        Returns:
+            str: The SVG string of the graph, None if these nodes can't form a forest.
+        """
+        node_set = set(node_seq)
+        children = dict()
+        has_parent = set()
+        for node in node_seq:
+            slots = list()
+            for (neigh, _) in node._neighbors_():
+                if neigh is None:
+                    slots.append(None)
+                    continue
+                if neigh not in node_set:
+                    continue
+                if neigh in has_parent:
+                    return None     # Node with multiple parents is not a tree.
+                has_parent.add(neigh)
+                slots.append(neigh)
+            children[node] = slots
+        roots = [node for node in node_seq if node not in has_parent]
+        layouts = self._layout_subtrees_(roots, children)
+        if layouts is None or len(layouts) != len(node_seq):
+            return None     # There are cycles in graph.
+        # Place all the trees side by side and calculate the absolute position of each node.
+        node_pos = dict()
+        if len(roots) > 0:
+            root_pos, _, _, _ = _place_siblings_([layouts[root] for root in roots])
+            stack = [(root, x, 0) for root, x in zip(roots, root_pos)]
+            while len(stack) > 0:
+                node, x, rank = stack.pop()
+                node_pos[node] = (x, rank * RANK_SEP)
+                res = layouts[node]
+                for child, offset in zip(res.children, res.offsets):
+                    if child is not None:
+                        stack.append((child, x + offset, rank + 1))
+        return _render_graph_svg_(node_seq, edge_label, node_idmap, edge_idmap, directed, node_pos)
+
+    def _layout_subtrees_(self, roots, children):
+        """Calculate the relative layout of all the subtrees in post order.
+
+        Args:
+            roots (list(GraphNodeBase)): The root nodes of all the trees.
+            children (dict(GraphNodeBase:list(GraphNodeBase))): The children slots of each node.
+
+        Returns:
+            dict(GraphNodeBase:_SubtreeLayout): The layout of each visited subtree.
+        """
+        layouts = dict()
+        stack = [(root, False) for root in roots[::-1]]
+        while len(stack) > 0:
+            node, expanded = stack.pop()
+            if not expanded:
+                if node in layouts:
+                    return None
+                layouts[node] = None
+                stack.append((node, True))
+                for child in children[node][::-1]:
+                    if child is not None:
+                        if child in layouts:
+                            return None
+                        stack.append((child, False))
+                continue
+            slots = children[node]
+            results = [layouts[child] if child is not None else None for child in slots]
+            old = self._subtrees.get(node)
+            if old is not None and len(old.children) == len(slots) and \
+                    all(a is b for a, b in zip(old.children, slots)) and \
+                    all(a is b for a, b in zip(old.results, results)):
+                layouts[node] = old
+            else:
+                layouts[node] = self._layout_node_(slots, results)
+        self._subtrees = layouts
+        return layouts
+
+    def _layout_node_(self, slots, results):
+        """
+        Args:
+            slots (list(GraphNodeBase)): The children slots of node, None for an empty slot.
+            results (list(_SubtreeLayout)): The layout of each child subtree.
+
+        Returns:
+            _SubtreeLayout: The layout of the subtree rooted at this node.
+        """
+        placed = [(i, res) for i, res in enumerate(results) if res is not None]
+        offsets = [0.0] * len(slots)
+        if len(placed) == 0:
+            return _SubtreeLayout(slots, results, offsets, ([0.0], None, 0, 0.0), ([0.0], None, 0, 0.0), 1)
+        if len(placed) == 1 and len(slots) == 2:
+            # Binary tree node with single child, move the child to it's side.
+            index, res = placed[0]
+            offset = (NODE_RADIUS + NODE_SEP * 0.5) * (-1 if index == 0 else 1)
+            offsets[index] = offset
+            return _SubtreeLayout(slots, results, offsets, ([0.0], res.left, 0, offset),
+                                  ([0.0], res.right, 0, offset), res.height + 1)
+        positions, left, right, height = _place_siblings_([res for _, res in placed])
+        mid = (positions[0] + positions[-1]) * 0.5
+        for (index, _), pos in zip(placed, positions):
+            offsets[index] = pos - mid
+        return _SubtreeLayout(slots, results, offsets, ([0.0], left, 0, -mid), ([0.0], right, 0, -mid), height + 1)
+
+
+class ChainLayoutEngine():
+    """Linear layout for ForwardLinkedListNode and DoublyLinkedListNode graphs.
+
+    Each linked list is placed in a row from left to right by following it's next pointers.
+    Edges between adjacent nodes in a row are straight, other edges are drawn as arcs below the nodes.
+    """
+
+    def render(self, node_seq, edge_label, node_idmap, edge_idmap, directed):
+        """Layout the linked list nodes and render them into SVG.
+
+        Args:
+            node_seq (list(GraphNodeBase)): All the nodes in graph.
+            edge_label (dict((GraphNodeBase, GraphNodeBase):printable)): All the edges and their labels in graph.
+            node_idmap (ConsecutiveIdMap): Map the node into it's id in SVG.
+            edge_idmap (ConsecutiveIdMap): Map the edge into it's id in SVG.
+            directed (bool): Whether the graph is a directed graph.
+
+        Returns:
+            str: The SVG string of the graph.
+        """
+        node_set = set(node_seq)
+        next_node = dict()
+        has_prev = set()
+        for node in node_seq:
+            # The first neighbor of linked list node is it's next node.
+            neighbors = node._neighbors_()
+            if len(neighbors) > 0 and neighbors[0][0] is not None and neighbors[0][0] in node_set:
+                next_node[node] = neighbors[0][0]
+                has_prev.add(neighbors[0][0])
+        # Start a new row from each head node, then from the nodes in cycles.
+        slots = dict()      # Key: linked list node; Value: (row, column).
+        row = 0
+        for heads in ([node for node in node_seq if node not in has_prev], node_seq):
+            for head in heads:
+                if head in slots:
+                    continue
+                col, node = 0, head
+                while node is not None and node not in slots:
+                    slots[node] = (row, col)
+                    node = next_node.get(node)
+                    col += 1
+                row += 1
+        node_pos = dict()
+        for node, (row, col) in slots.items():
+            node_pos[node] = (col * RANK_SEP, row * RANK_SEP)
+        edge_points = dict()
+        for (node1, node2) in edge_label.keys():
+            (row1, col1), (row2, col2) = slots[node1], slots[node2]
+            if row1 != row2 or abs(col1 - col2) != 1:
+                edge_points[(node1, node2)] = _arc_edge_points_(node_pos[node1], node_pos[node2], directed)
+            elif (node2, node1) in edge_label:
+                # Separate the two edges between adjacent doubly linked list nodes.
+                edge_points[(node1, node2)] = _shifted_edge_points_(node_pos[node1], node_pos[node2], directed)
+        return _render_graph_svg_(node_seq, edge_label, node_idmap, edge_idmap, directed, node_pos, edge_points)
+
+
+def _shifted_edge_points_(pos1, pos2, directed):
+    """Calculate the points of a straight edge, shift it to the right side of it's direction.
+
+    Args:
+        pos1, pos2 ((float, float)): The center position of the begin and end node.
+        directed (bool): Whether to leave the space for arrowhead at the end of this edge.
+
+    Returns:
+        list((float, float)): The begin point, two bezier control points and the end point of the edge path.
+    """
+    dx, dy = pos2[0] - pos1[0], pos2[1] - pos1[1]
+    dist = max(sqrt(dx * dx + dy * dy), 0.001)
+    ux, uy = dx / dist, dy / dist
+    nx, ny = -uy * DOUBLE_EDGE_SHIFT, ux * DOUBLE_EDGE_SHIFT
+    # Keep the shifted end points on the border of node circles.
+    along = sqrt(NODE_RADIUS * NODE_RADIUS - DOUBLE_EDGE_SHIFT * DOUBLE_EDGE_SHIFT)
+    end_space = along + ARROW_LENGTH if directed else along
+    x0, y0 = pos1[0] + ux * along + nx, pos1[1] + uy * along + ny
+    x3, y3 = pos2[0] - ux * end_space + nx, pos2[1] - uy * end_space + ny
+    return [(x0, y0), (x0 + (x3 - x0) / 3, y0 + (y3 - y0) / 3), (x0 + (x3 - x0) * 2 / 3, y0 + (y3 - y0) * 2 / 3), (x3, y3)]
+
+
+def _arc_edge_points_(pos1, pos2, directed):
+    """Calculate the points of an arc edge which bends to the right side of it's direction(or below for horizontal arcs).
+
+    Args:
+        pos1, pos2 ((float, float)): The center position of the begin and end node.
+        directed (bool): Whether to leave the space for arrowhead at the end of this edge.
+
+    Returns:
+        list((float, float)): The begin point, two bezier control points and the end point of the edge path.
+    """
+    dx, dy = pos2[0] - pos1[0], pos2[1] - pos1[1]
+    dist = max(sqrt(dx * dx + dy * dy), 0.001)
+    ux, uy = dx / dist, dy / dist
+    bend = max(dist * ARC_BEND_RATE, NODE_RADIUS)
+    nx, ny = -uy, ux
+    if abs(dy) < 0.001 and dx < 0:
+        nx, ny = -nx, -ny   # Always bend the horizontal arcs below the row.
+    c1 = (pos1[0] + dx / 3 + nx * bend, pos1[1] + dy / 3 + ny * bend)
+    c2 = (pos1[0] + dx * 2 / 3 + nx * bend, pos1[1] + dy * 2 / 3 + ny * bend)
+    # Leave the node along the direction of control points.
+    sx, sy = c1[0] - pos1[0], c1[1] - pos1[1]
+    sd = max(sqrt(sx * sx + sy * sy), 0.001)
+    ex, ey = pos2[0] - c2[0], pos2[1] - c2[1]
+    ed = max(sqrt(ex * ex + ey * ey), 0.001)
+    end_space = NODE_RADIUS + ARROW_LENGTH if directed else NODE_RADIUS
+    p0 = (pos1[0] + sx / sd * NODE_RADIUS, pos1[1] + sy / sd * NODE_RADIUS)
+    p3 = (pos2[0] - ex / ed * end_space, pos2[1] - ey / ed * end_space)
+    return [p0, c1, c2, p3]
@@ -17,16 +17,19 @@ class GraphNodeBase:
 
     GraphNodeBase's subclasses contain:
     GraphNode, BinaryTreeNode, ForwardLinkedListNode and DoublyLinkedListNode.
-    If you want to get/set attribute in subclass, don't use dot operation like 'self.attr'.
-    Please use these interfaces instead:
-
-        super().__getattribute__(attr)
+    The attributes are stored in __slots__ to keep large graphs compact,
+    so the subclasses should declare their attributes in __slots__ too.
+    You can still set your own attributes on a node (eg: node.visited = True) and create weak references to it,
+    the instance dictionary is only allocated when the first extra attribute is set.
+    Reading an attribute is not intercepted, only setting `val` and the neighbor attributes notify the bind graphs.
+    If you want to set an attribute in subclass without notifying the bind graphs, use:
 
         super().__setattr__(attr, new_value)
 
     Attributes:
         val (printable): The label to be displayed in the graph node.
     """
+    __slots__ = ('val', '_bind_graphs', '__dict__', '__weakref__')
 
     def __init__(self, val):
         """
@@ -34,13 +37,7 @@ class GraphNodeBase:
             val (printable): The initial label for the graph node.
         """
         object.__setattr__(self, 'val', val)
-        object.__setattr__(self, '_bind_graphs', set())
-
-    def __getattribute__(self, name):
-        if name == 'val':
-            return object.__getattribute__(self, 'val')
-        else:
-            return object.__getattribute__(self, name)
+        object.__setattr__(self, '_bind_graphs', None)     # The set of bind graphs is created when it's first bound.
 
     def __setattr__(self, name, value):
         if name == 'val':
@@ -50,7 +47,7 @@ class GraphNodeBase:
             object.__setattr__(self, name, value)
 
     def __str__(self):
-        value = object.__getattribute__(self, 'val')
+        value = self.val
         if value is None:
             value = ''
         return str(value)
@@ -61,33 +58,36 @@ class GraphNodeBase:
         Args:
             value (printable): The value to be displayed in this node.
         """
-        bind_graphs = object.__getattribute__(self, '_bind_graphs')
+        bind_graphs = self._bind_graphs
+        if bind_graphs is None:
+            return
         for graph in bind_graphs:
             graph._updateNodeLabel(self, self.__str__())
 
     def _on_update_neighbor_(self, new_neighbor):
         """
         Notify the bind graph to update the displayed edge color between this node and it's neighbor.
-        old_neighbor and new_neighbor can be None.
+        It's called after the neighbors of this node changed, new_neighbor can be None.
 
         Args:
             new_neighbor: The new neighbor node to replace the old neighbor nodes.
         """
-        # Mark edge between this node and it's old_neighbor.
-        bind_graphs = object.__getattribute__(self, '_bind_graphs')
-        if len(bind_graphs) == 0:
+        bind_graphs = self._bind_graphs
+        if not bind_graphs:
             return
-        # Mark edge between this node and it's new_neighbor.
-        if new_neighbor:
-            for graph in bind_graphs:
-                graph.addNode(new_neighbor)
+        # Add the new_neighbor into the bind graphs and update their neighbors index of this node.
+        for graph in bind_graphs:
+            graph._updateNodeNeighbors(self, new_neighbor)
 
     def bind_graphs(self):
         """
         Returns:
             set(SvgGraph): The bind graphs collection of this node.
         """
-        return object.__getattribute__(self, '_bind_graphs')
+        bind_graphs = self._bind_graphs
+        if bind_graphs is None:
+            return frozenset()
+        return bind_graphs
 
     def _bind_new_graph_(self, graph):
         """Bind a new SvgGraph object for this graph node object.
@@ -95,8 +95,10 @@ class GraphNodeBase:
         Args:
             graph (SvgGraph): New SvgGraph object to track this node.
         """
-        bind_graphs = object.__getattribute__(self, '_bind_graphs')
-        if graph not in bind_graphs:
+        bind_graphs = self._bind_graphs
+        if bind_graphs is None:
+            object.__setattr__(self, '_bind_graphs', {graph})
+        elif graph not in bind_graphs:
             bind_graphs.add(graph)
 
     def _remove_bind_graph_(self, graph):
@@ -107,6 +109,8 @@ class GraphNodeBase:
         Args:
             graph (SvgGraph): SvgGraph object to be removed.
         """
-        bind_graphs = object.__getattribute__(self, '_bind_graphs')
-        if graph in bind_graphs:
+        bind_graphs = self._bind_graphs
+        if bind_graphs is not None and graph in bind_graphs:
             bind_graphs.remove(graph)
+            if len(bind_graphs) == 0:
+                object.__setattr__(self, '_bind_graphs', None)
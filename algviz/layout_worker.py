@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+
+"""Define the long-lived graphviz layout workers used by SvgGraph.
+
+The graphviz python library starts a new `dot` process every time a graph is rendered.
+A LayoutWorkerPool keeps the layout engines alive and reuses them across frames
+and across all the graphs created by the same Visualizer:
+
+    1. If the pygraphviz library is installed, graphs are laid out in process by libgvc.
+
+    2. Otherwise, each worker is a resident `dot` process which reads graphs from it's stdin
+    and writes the SVG result into it's stdout. A crashed or stuck process is restarted.
+
+Author: zjl9959@gmail.com
+
+License: GPLv3
+
+"""
+
+import subprocess
+from queue import Queue, Empty
+from threading import Lock, Thread
+
+from algviz.utility import AlgvizFatalError
+
+
+DOT_EXECUTABLE = 'dot'
+RENDER_TIMEOUT = 30.0       # The maximum seconds to wait for the layout result of one graph.
+RENDER_RETRY = 1            # Retry times after the worker process crashed.
+
+
+class _InProcessEngine():
+    """Layout graphs by the graphviz C library through pygraphviz binding.
+    """
+
+    def __init__(self, engine):
+        """
+        Args:
+            engine (str): The graphviz layout engine name. eg: 'dot', 'neato'.
+        """
+        import pygraphviz
+        self._agraph_type = pygraphviz.AGraph
+        self._engine = engine
+        self._lock = Lock()
+
+    def render(self, source):
+        """
+        Args:
+            source (str): The graph description in DOT language.
+
+        Returns:
+            str: The SVG string of the graph generated by graphviz.
+        """
+        with self._lock:
+            graph = self._agraph_type(string=source)
+            graph.layout(prog=self._engine)
+            svg = graph.draw(format='svg')
+            graph.close()
+        if isinstance(svg, bytes):
+            svg = svg.decode('utf-8')
+        return svg
+
+    def close(self):
+        pass
+
+
+class _DotProcess():
+    """A resident `dot` process which reads graphs from stdin and writes SVG into stdout.
+    """
+
+    def __init__(self, engine, timeout=RENDER_TIMEOUT):
+        """
+        Args:
+            engine (str): The graphviz layout engine name. eg: 'dot', 'neato'.
+            timeout (float): The maximum seconds to wait for the layout result of one graph.
+        """
+        self._engine = engine
+        self._timeout = timeout
+        self._process = None    # The running dot process.
+        self._lines = None      # The output lines read from the dot process.
+        self._lock = Lock()
+
+    def render(self, source):
+        """
+        Args:
+            source (str): The graph description in DOT language.
+
+        Returns:
+            str: The SVG string of the graph generated by graphviz.
+
+        Raises:
+            AlgvizFatalError: Graphviz layout worker failed.
+        """
+        with self._lock:
+            for retry in range(RENDER_RETRY + 1):
+                try:
+                    if not self._is_alive_():
+                        self._start_()
+                    return self._render_(source)
+                except Exception as e:
+                    self._stop_()
+                    if retry == RENDER_RETRY:
+                        raise AlgvizFatalError('Graphviz layout worker failed:{}'.format(e))
+
+    def close(self):
+        with self._lock:
+            self._stop_()
+
+    def _render_(self, source):
+        self._process.stdin.write(source.encode('utf-8'))
+        self._process.stdin.write(b'\n')
+        self._process.stdin.flush()
+        svg_lines = list()
+        while True:
+            try:
+                line = self._lines.get(timeout=self._timeout)
+            except Empty:
+                raise TimeoutError('no output in {}s'.format(self._timeout))
+            if line is None:
+                raise EOFError('dot process exit with code {}'.format(self._process.poll()))
+            svg_lines.append(line)
+            if line.strip() == b'</svg>':
+                break
+        return b''.join(svg_lines).decode('utf-8')
+
+    def _is_alive_(self):
+        return self._process is not None and self._process.poll() is None
+
+    def _start_(self):
+        self._process = subprocess.Popen([DOT_EXECUTABLE, '-K{}'.format(self._engine), '-Tsvg'],
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                         stderr=subprocess.DEVNULL)
+        self._lines = Queue()
+        reader = Thread(target=_read_lines_, args=(self._process.stdout, self._lines), daemon=True)
+        reader.start()
+
+    def _stop_(self):
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+        except Exception:
+            pass
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        self._process = None
+        self._lines = None
+
+
+def _read_lines_(stream, lines):
+    """Move the output lines of stream into the lines queue, put None when reach the end.
+    """
+    for line in iter(stream.readline, b''):
+        lines.put(line)
+    lines.put(None)
+
+
+def _has_in_process_engine_():
+    try:
+        import pygraphviz   # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+class LayoutWorkerPool():
+    """A pool of graphviz layout workers shared by all the graphs in one Visualizer.
+
+    The idle workers of each layout engine wait in a queue, a graph is rendered by an idle worker,
+    a new worker is started if there is no idle one, or waits for one when the pool is full.
+    The in process engine of pygraphviz is not thread safe, so there is at most one for each layout engine.
+    """
+
+    def __init__(self, size=1, timeout=RENDER_TIMEOUT):
+        """
+        Args:
+            size (int): The maximum number of `dot` processes for each layout engine.
+                It's ignored if pygraphviz is installed, the graphs are laid out in process one by one.
+            timeout (float): The maximum seconds to wait for the layout result of one graph.
+        """
+        self._in_process = _has_in_process_engine_()
+        self._size = 1 if self._in_process else max(int(size), 1)
+        self._timeout = timeout
+        self._workers = dict()      # Key: engine name; Value: list(_DotProcess or _InProcessEngine).
+        self._idle_workers = dict()  # Key: engine name; Value: Queue of the idle workers.
+        self._lock = Lock()
+
+    def render(self, source, engine='dot'):
+        """Layout the graph and render it into SVG.
+
+        Args:
+            source (str): The graph description in DOT language.
+            engine (str): The graphviz layout engine name. eg: 'dot', 'neato'.
+
+        Returns:
+            str: The SVG string of the graph generated by graphviz.
+
+        Raises:
+            AlgvizFatalError: Graphviz layout worker failed.
+        """
+        (worker, idle_workers) = self._acquire_worker_(engine)
+        try:
+            return worker.render(source)
+        finally:
+            idle_workers.put(worker)
+
+    def size(self):
+        """
+        Returns:
+            int: The maximum number of workers for each layout engine.
+        """
+        return self._size
+
+    def close(self):
+        """Stop all the workers in this pool.
+        """
+        with self._lock:
+            for workers in self._workers.values():
+                for worker in workers:
+                    worker.close()
+            self._workers.clear()
+            self._idle_workers.clear()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _acquire_worker_(self, engine):
+        """Take an idle worker of the layout engine, start a new one if there is no idle worker and the pool is not full.
+
+        Returns:
+            (_DotProcess or _InProcessEngine, Queue): The worker and the queue to put it back after use.
+        """
+        with self._lock:
+            if engine not in self._workers:
+                self._workers[engine] = list()
+                self._idle_workers[engine] = Queue()
+            workers, idle_workers = self._workers[engine], self._idle_workers[engine]
+            try:
+                return (idle_workers.get_nowait(), idle_workers)
+            except Empty:
+                pass
+            if len(workers) < self._size:
+                if self._in_process:
+                    workers.append(_InProcessEngine(engine))
+                else:
+                    workers.append(_DotProcess(engine, self._timeout))
+                return (workers[-1], idle_workers)
+        return (idle_workers.get(), idle_workers)
+
+
+_process_pool = None    # The layout workers of current process, used by the export processes.
+
+
+def render_dot_source(source, engine='dot'):
+    """Layout the graph by the layout workers of current process, it's called by the export process pool.
+
+    Args:
+        source (str): The graph description in DOT language.
+        engine (str): The graphviz layout engine name. eg: 'dot', 'neato'.
+
+    Returns:
+        str: The SVG string of the graph generated by graphviz.
+
+    Raises:
+        AlgvizFatalError: Graphviz layout worker failed.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = LayoutWorkerPool(1)
+    return _process_pool.render(source, engine)
@@ -11,33 +11,53 @@ License: GPLv3
 """
 
 
-from xml.dom.minidom import Document
+from io import StringIO
+from hashlib import sha1
 from os import path as os_path
 from platform import uname
 from ctypes import c_int
 from ctypes import Structure as ctypes_Structure
 from math import ceil
+from threading import Lock
+import warnings
 
-from algviz.utility import add_default_text_style, text_char_num, AlgvizRuntimeError, FONT_FAMILY
+from algviz.utility import add_default_text_style, text_char_num, AlgvizRuntimeError, FONT_FAMILY, LRUCache
 from algviz.sequencer import Sequencer
+from algviz.svg_dom import SvgDocument
 from algviz.logo import get_logo, get_logo_size
+from algviz.packing import solve_strip_packing
+from algviz.layout_worker import render_dot_source
 
 
 LOGO_SHOW_TIME = 3
 WEB_URL = 'https://zjl9959.github.io/algviz/'
 SVG_MARGIN = 5
 NAME_MARGIN = 5
+NATIVE_SOLVER_MAX_RECTS = 8     # The native packing solver is slower than the python one if there are more rectangles.
+PACKING_CACHE_SIZE = 256        # The maximum number of packing results memoized by PackingSolver.
+MIN_SHARED_FRAGMENT = 64        # The shorter fragments are not worth to be referenced by <use>.
 
 
 class Layouter:
-    def __init__(self, vid):
+    def __init__(self, vid, share_defs=True, delta_frames=False, export_workers=0):
+        """
+        Args:
+            vid (int): The id of the visualizer, it identifies different layouters in one page.
+            share_defs (bool): Whether to hoist the repeated static fragments of frames into <defs> and reference them by <use>.
+            delta_frames (bool): Whether to export each static fragment once for the frames it doesn't change,
+                instead of a full snapshot for each frame.
+            export_workers (int): The number of processes to layout the captured graph frames when exporting.
+        """
         self._vid = vid                     # Identify different layouter.
+        self._share_defs = share_defs
+        self._delta_frames = delta_frames
+        self._export_workers = export_workers
         self._display_id2seq = dict()       # Key:display_id; Value:Sequencer
         self._display_id2name = dict()      # Key:display_id; Value:(ObjNameString, title_font)
         self._delays = list()               # Record the delay time for each frame.
         self._next_seq_id = 0               # The unique id for next sequencer.
-        # Create xmldom object and svg.
-        self._dom = Document()
+        # Create the svg document, frames of display objects are moved into it without parsing.
+        self._dom = SvgDocument()
         self._svg = self._dom.createElement('svg')
         self._svg.setAttribute('xmlns', 'http://www.w3.org/2000/svg')
         self._svg.setAttribute('xmlns:xlink', 'http://www.w3.org/1999/xlink')
@@ -52,63 +72,81 @@ class Layouter:
         self._svg_height = logo_size[1]
         self._max_width = 800
         self._svg_str = None
+        self._exported = False              # Frames are released after they are exported.
         self._update_svg_size_()
 
     def solve_layout(self, strip_width, start_frame, end_frame):
         """Layout all the svg animation pictures.
+
+        Args:
+            strip_width (int): The maximum strip width limit to layouter.
+            start_frame, end_frame (int): The range of frames to layout.
+
+        Returns:
+            dict(str, (float, float, float, float)): Key:display_id; Value:(x_offset, y_offset, width, height).
+        """
+        layout = self.solve_layouts(strip_width, [(start_frame, end_frame)])[0]
+        self._apply_layout_(layout)
+        return layout[0]
+
+    def solve_layouts(self, strip_width, frame_ranges):
+        """Layout the svg animation pictures for several frame ranges in one batch.
+
+        The ranges with the same display sizes share one packing result, see `PackingSolver.solve_batch`.
+
+        Args:
+            strip_width (int): The maximum strip width limit to layouter.
+            frame_ranges (list((int, int))): The (start_frame, end_frame) of each frame range.
+
         Returns:
-            dict(str, (float, float)): Key:display_id; Value:(x_offset, y_offset).
+            list((dict, dict, (float, float))): The layout of each frame range, contains
+                display offsets(Key:display_id; Value:(x_offset, y_offset, width, height)),
+                title font sizes(Key:display_id; Value:font size) and the size of all the pictures.
         """
-        width, height = 0, 0
-        rects_num = len(self._display_id2seq)
-        RectArrayType = RectType * rects_num
-        rects_data = RectArrayType()
-        id_map = dict()
-        next_id = 0
-        max_rect_width = 0
-        for did, seq in self._display_id2seq.items():
-            rects_data[next_id].id = next_id
-            id_map[next_id] = did
-            seq_size = seq.size(start_frame, end_frame)
-            title_font = 0
-            if did in self._display_id2name:
-                title = self._display_id2name[did][0]
-                title_char_num = text_char_num(title)
+        problems, range_infos = list(), list()
+        for (start_frame, end_frame) in frame_ranges:
+            display_ids, rects, title_fonts = list(), list(), dict()
+            for did, seq in self._display_id2seq.items():
+                seq_size = seq.size(start_frame, end_frame)
                 title_font = 0
-                if title_char_num > 0:
-                    temp_title_font = seq_size[0] * 1.2 / title_char_num
-                    title_font = ceil(min(12, temp_title_font, seq_size[0] * 0.8))
-                self._display_id2name[did][1] = title_font
-            rects_data[next_id].w = seq_size[0] + SVG_MARGIN
-            rects_data[next_id].h = ceil(seq_size[1] + title_font * 1.5 + SVG_MARGIN)
-            max_rect_width = max(max_rect_width, rects_data[next_id].w)
-            next_id = next_id + 1
-        strip_w = c_int(max(strip_width, max_rect_width + 50))
-        rect_num_c = c_int(rects_num)
-        try:
-            packing_solver = load_dll()
-            packing_solver.solve_strip_packing(strip_w, rect_num_c, rects_data)
-        except Exception as e:
-            print('Error when call packing solver:', e)
-            return None
-        display_offsets = dict()
-        for i in range(len(rects_data)):
-            did = id_map[rects_data[i].id]
-            title_font = 0
-            if did in self._display_id2name:
-                title_font = self._display_id2name[did][1]
-            display_offsets[did] = (
-                rects_data[i].x + SVG_MARGIN,
-                rects_data[i].y + title_font * 1.5 + SVG_MARGIN,
-                rects_data[i].w, rects_data[i].h
-            )
-            width = max(width, rects_data[i].x + rects_data[i].w)
-            height = max(height, rects_data[i].y + rects_data[i].h + title_font * 1.5)
-        if width > 0 and height > 0:
-            self._svg_width = width + SVG_MARGIN
-            self._svg_height = height + SVG_MARGIN
-            self._update_svg_size_()
-        return display_offsets
+                if did in self._display_id2name:
+                    title = self._display_id2name[did][0]
+                    title_char_num = text_char_num(title)
+                    if title_char_num > 0:
+                        temp_title_font = seq_size[0] * 1.2 / title_char_num
+                        title_font = ceil(min(12, temp_title_font, seq_size[0] * 0.8))
+                    title_fonts[did] = title_font
+                display_ids.append(did)
+                rects.append((seq_size[0] + SVG_MARGIN, ceil(seq_size[1] + title_font * 1.5 + SVG_MARGIN)))
+            max_rect_width = max([w for (w, h) in rects] + [0])
+            problems.append((max(strip_width, max_rect_width + 50), rects))
+            range_infos.append((display_ids, rects, title_fonts))
+        layouts = list()
+        for (display_ids, rects, title_fonts), positions in zip(range_infos, get_packing_solver().solve_batch(problems)):
+            display_offsets = dict()
+            width, height = 0, 0
+            for i in range(len(display_ids)):
+                did = display_ids[i]
+                title_font = title_fonts.get(did, 0)
+                (x, y), (w, h) = positions[i], rects[i]
+                display_offsets[did] = (x + SVG_MARGIN, y + title_font * 1.5 + SVG_MARGIN, w, h)
+                width = max(width, x + w)
+                height = max(height, y + h + title_font * 1.5)
+            layouts.append((display_offsets, title_fonts, (width, height)))
+        return layouts
+
+    def _apply_layout_(self, layout):
+        """Update the title fonts and the svg size by one layout solved by `solve_layouts`.
+        """
+        (display_offsets, title_fonts, svg_size) = layout
+        for did, title_font in title_fonts.items():
+            self._display_id2name[did][1] = title_font
+        if svg_size[0] > 0 and svg_size[1] > 0:
+            self._svg_width = svg_size[0] + SVG_MARGIN
+            self._svg_height = svg_size[1] + SVG_MARGIN
+        else:
+            (self._svg_width, self._svg_height) = get_logo_size()
+        self._update_svg_size_()
 
     def _update_svg_size_(self):
         self._svg.setAttribute('width', '{:.0f}pt'.format(self._svg_width))
@@ -141,15 +179,21 @@ class Layouter:
     def next_frame(self, delay):
         self._delays.append(delay)
 
-    def _add_logo_(self, start_frame, end_frame):
+    def frame_count(self):
+        """
+        Returns:
+            int: The number of recorded frames.
+        """
+        return len(self._delays)
+
+    def _add_logo_(self, delays, start_frame, end_frame):
         logo = get_logo(self._svg_width, self._svg_height)
         seq = Sequencer(self._vid, logo, self._dom, self._next_seq_id)
         for i in range(end_frame):
             seq.update(i, skip=True)
         seq.update(end_frame)
         offset = (logo.offset_x, logo.offset_y)
-        obj_node = seq.export_logo(offset, self._delays, start_frame, end_frame)
-        self._link.appendChild(obj_node)
+        return seq.export_logo(offset, delays, start_frame, end_frame)
 
     def _add_backgrounds_(self, display_offsets, start_frame, end_frame):
         bg_group = self._dom.createElement('g')
@@ -204,7 +248,7 @@ class Layouter:
                 r.setAttribute('fill', 'none')
                 bg_group.appendChild(r)
                 self.layout_info[display_id] = (offset[0], offset[1] - txt_font * 1.5, seq_size[0], seq_size[1] + txt_font * 1.5)
-        self._link.appendChild(bg_group)
+        return bg_group
 
     def _repr_svg_(self):
         if self._svg_str is None:
@@ -212,20 +256,106 @@ class Layouter:
         return self._svg_str
 
     def export(self, max_width, start_frame, end_frame):
-        # Layout and add nodes into dom tree.
-        if end_frame is None:
-            end_frame = len(self._delays)
-        display_offsets = self.solve_layout(max_width, start_frame, end_frame)
-        if display_offsets is None:
-            return
-        self._delays.insert(end_frame, LOGO_SHOW_TIME)
+        """
+        Returns:
+            str: The merged animation SVG string, None if failed to layout.
+        """
+        out = StringIO()
+        if self.export_to(out, max_width, start_frame, end_frame):
+            return out.getvalue()
+        return None
+
+    def export_to(self, file, max_width, start_frame, end_frame):
+        """Write the merged animation SVG into file frame by frame.
+
+        Each frame is released after it's written into file, so the peak memory during export
+        is bounded by one frame plus the layout metadata. The frames can only be exported once.
+
+        Args:
+            file (file object): The writable text file object to write SVG into.
+            max_width (int): The maximum strip width limit to layouter.
+            start_frame, end_frame (int): The range of frames to export, export until the last frame if end_frame is None.
+
+        Returns:
+            bool: True if the SVG is written; False if failed to layout.
+
+        Raises:
+            AlgvizRuntimeError: The frames have been exported.
+        """
+        return self.export_ranges_to([file], max_width, [(start_frame, end_frame)])
+
+    def export_ranges_to(self, files, max_width, frame_ranges):
+        """Write several ranges of frames into files, each range is merged into one animation SVG.
+
+        The layouts of all the ranges are solved by `solve_layouts` in one batch.
+        The ranges may overlap, a frame is released after the last range contains it is written.
+        The frames can only be exported once.
+
+        Args:
+            files (list(file object)): The writable text file object to write SVG into for each range.
+            max_width (int): The maximum strip width limit to layouter.
+            frame_ranges (list((int, int))): The (start_frame, end_frame) of each range, until the last frame if end_frame is None.
+
+        Returns:
+            bool: True if the SVGs are written; False if failed to layout.
+
+        Raises:
+            AlgvizRuntimeError: The frames have been exported.
+        """
+        if self._exported:
+            raise AlgvizRuntimeError('The frames have been exported.')
+        frame_ranges = [(start_frame, len(self._delays) if end_frame is None else end_frame)
+                        for (start_frame, end_frame) in frame_ranges]
+        self._resolve_frames_()
+        layouts = self.solve_layouts(max_width, frame_ranges)
+        self._exported = True
+        last_ranges = dict()    # Key: frame; Value: the index of the last range contains the frame.
+        for k, (start_frame, end_frame) in enumerate(frame_ranges):
+            for i in range(start_frame, end_frame):
+                last_ranges[i] = k
+        for k, (start_frame, end_frame) in enumerate(frame_ranges):
+            self._apply_layout_(layouts[k])
+            # The frames are finalized in place by the last range, the previous ranges export their copies.
+            released = set([i for i in range(start_frame, end_frame) if last_ranges[i] == k])
+            self._write_animation_(files[k], layouts[k][0], start_frame, end_frame, k + 1 < len(frame_ranges), released)
+        return True
+
+    def _write_animation_(self, file, display_offsets, start_frame, end_frame, copy, released):
+        """Write the frames in range into file as one animation SVG.
+
+        Args:
+            copy (bool): Export the copies of the frames and keep them unchanged for the next ranges.
+            released (set(int)): The frames to be released after they are written.
+        """
+        delays = self._delays[:end_frame] + [LOGO_SHOW_TIME]
+        file.write(self._dom.toxml_head())
+        file.write(self._svg.open_tag())
+        for child in self._svg.childNodes:
+            if child is self._link:
+                break
+            file.write(child.toxml())
+        file.write(self._link.open_tag())
+        shared = SharedFragments(self._vid) if self._share_defs else None
         for display_id, seq in self._display_id2seq.items():
             offset = display_offsets[display_id]
-            obj_nodes = seq.export(offset, self._delays, start_frame, end_frame, True)
-            for i in range(start_frame, end_frame):
-                self._link.appendChild(obj_nodes[i])
-        self._add_logo_(start_frame, end_frame)
-        self._add_backgrounds_(display_offsets, start_frame, end_frame)
+            if self._delta_frames:
+                seq.plan_delta_frames(start_frame, end_frame)
+            for i in range(start_frame, min(end_frame, seq.frame_count())):
+                if self._delta_frames:
+                    nodes = seq.export_delta_frame(i, offset, delays, start_frame, end_frame, True, copy)
+                else:
+                    g_frame = seq.export_frame(i, offset, delays, start_frame, end_frame, True, copy)
+                    nodes = [g_frame] if g_frame is not None else []    # Skip the frames merged into the previous frame.
+                for node in nodes:
+                    if shared is not None:
+                        shared.write_frame(file, node)
+                    else:
+                        file.write(node.toxml())
+                if i in released:
+                    seq.release_frame(i)
+        file.write(self._add_logo_(delays, start_frame, end_frame).toxml())
+        file.write(self._add_backgrounds_(display_offsets, start_frame, end_frame).toxml())
+        file.write(self._link.close_tag())
         duration = 0
         for i in range(start_frame, end_frame):
             duration += self._delays[i]
@@ -237,9 +367,74 @@ class Layouter:
             "layout": self.layout_info
         }
         # Add description into svg.
-        comment = self._dom.createComment(str(info))
-        self._svg.appendChild(comment)
-        return self._dom.toxml()
+        file.write(self._dom.createComment(str(info)).toxml())
+        file.write(self._svg.close_tag())
+
+    def _resolve_frames_(self):
+        """Layout the captured graph frames by a process pool, then render them in order.
+        """
+        sequencers = list(self._display_id2seq.values())
+        jobs = list()
+        for seq in sequencers:
+            jobs.extend(seq.pending_layouts())
+        jobs = list(dict.fromkeys(jobs))    # Different frames and graphs may share one layout.
+        raw_svgs = dict()
+        if len(jobs) > 0 and self._export_workers > 0:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(min(self._export_workers, len(jobs))) as executor:
+                results = executor.map(render_dot_source, [job[0] for job in jobs], [job[1] for job in jobs])
+                raw_svgs = dict(zip(jobs, results))
+        for seq in sequencers:
+            seq.resolve_frames(raw_svgs)
+
+
+class SharedFragments:
+    """Hoist the repeated static fragments of frames into <defs> and reference them by <use>.
+
+    The cells, index labels and cursors of a display object are often the same in many frames.
+    Since the frames are streamed, a fragment is written inline when it first appears,
+    then it's moved into a <defs> node when it appears again, and referenced by <use> since then.
+    The fragments with animations are always written inline, because their animations begin with the frame.
+    """
+
+    def __init__(self, vid):
+        self._vid = vid
+        self._fragments = dict()    # Key: content hash of the fragment; Value: def id, None if not shared yet.
+        self._next_def_id = 0
+
+    def write_frame(self, file, g_frame):
+        """Write the frame group node into file, the repeated children are replaced by <use>.
+
+        Args:
+            file (file object): The writable text file object to write SVG into.
+            g_frame (SvgElement): The frame group node exported by Sequencer.
+        """
+        if not g_frame.childNodes:
+            file.write(g_frame.toxml())
+            return
+        file.write(g_frame.open_tag())
+        for child in g_frame.childNodes:
+            file.write(self._share_(child.toxml()))
+        file.write(g_frame.close_tag())
+
+    def _share_(self, xml):
+        """
+        Returns:
+            str: The XML string to write for the fragment.
+        """
+        if len(xml) < MIN_SHARED_FRAGMENT or '<animate' in xml:
+            return xml
+        digest = sha1(xml.encode()).digest()
+        if digest not in self._fragments:
+            self._fragments[digest] = None
+            return xml
+        def_id = self._fragments[digest]
+        if def_id is None:
+            def_id = 'V{}_D{}'.format(self._vid, self._next_def_id)
+            self._next_def_id += 1
+            self._fragments[digest] = def_id
+            return '<defs><g id="{}">{}</g></defs><use xlink:href="#{}"/>'.format(def_id, xml, def_id)
+        return '<use xlink:href="#{}"/>'.format(def_id)
 
 
 class RectType(ctypes_Structure):
@@ -293,9 +488,134 @@ def load_dll_linux(dll_path):
     return cdll.LoadLibrary(dll_path)
 
 
+class PackingSolver():
+    """The strip packing solver session shared by all the layouters in one process.
+
+    The native packing solver library is loaded only once, and the packing results are memoized
+    by the strip width and the sorted rectangle sizes.
+    """
+
+    def __init__(self, cache_size=PACKING_CACHE_SIZE):
+        """
+        Args:
+            cache_size (int): The maximum number of memoized packing results.
+        """
+        self._lock = Lock()             # Protect the library handle and the cache.
+        self._native_lock = Lock()      # The native solver is not guaranteed to be thread safe.
+        self._native = None
+        self._native_loaded = False
+        self._cache = LRUCache(cache_size)
+
+    def native_solver(self):
+        """
+        Returns:
+            ctypes.CDLL: The native packing solver library, None if it's unavailable on this platform.
+        """
+        with self._lock:
+            if not self._native_loaded:
+                try:
+                    self._native = load_dll()
+                except Exception:
+                    self._native = None
+                self._native_loaded = True
+            return self._native
+
+    def solve(self, strip_width, rects):
+        """Place the rectangles into a strip and try to minimize the used height of the strip.
+
+        Args:
+            strip_width (int): The width of the strip.
+            rects (list((int, int))): The (width, height) of the rectangles to be placed.
+
+        Returns:
+            list((int, int)): The (x, y) position of each rectangle's top left corner.
+        """
+        return self.solve_batch([(strip_width, rects)])[0]
+
+    def solve_batch(self, problems):
+        """Solve several strip packing problems.
+
+        The problems with the same strip width and rectangle sizes in any order are solved only once.
+
+        Args:
+            problems (list((int, list((int, int))))): The strip width and rectangles of each problem.
+
+        Returns:
+            list(list((int, int))): The positions of rectangles for each problem.
+        """
+        orders, results = list(), dict()    # Key: (strip width, sorted rectangles); Value: the sorted positions.
+        for (strip_width, rects) in problems:
+            order = sorted(range(len(rects)), key=lambda i: rects[i])
+            key = (strip_width, tuple([rects[i] for i in order]))
+            orders.append((order, key))
+            results[key] = None
+        for key in results.keys():
+            with self._lock:
+                sorted_positions = self._cache.get(key)
+            if sorted_positions is None:
+                sorted_positions = tuple(self._solve_(key[0], key[1]))
+                with self._lock:
+                    self._cache.put(key, sorted_positions)
+            results[key] = sorted_positions
+        batch_positions = list()
+        for (order, key) in orders:
+            positions = [None] * len(order)
+            for i in range(len(order)):
+                positions[order[i]] = results[key][i]
+            batch_positions.append(positions)
+        return batch_positions
+
+    def cache_info(self):
+        """
+        Returns:
+            dict: The hits, misses counters and the current size, maxsize of the packing results cache.
+        """
+        with self._lock:
+            return self._cache.info()
+
+    def _solve_(self, strip_width, rects):
+        native = None
+        if len(rects) <= NATIVE_SOLVER_MAX_RECTS:
+            native = self.native_solver()
+        if native is not None:
+            rects_data = (RectType * len(rects))()
+            for i in range(len(rects)):
+                rects_data[i].id = i
+                rects_data[i].w, rects_data[i].h = rects[i]
+            try:
+                with self._native_lock:
+                    native.solve_strip_packing(c_int(strip_width), c_int(len(rects)), rects_data)
+                positions = [None] * len(rects)
+                for rect in rects_data:
+                    positions[rect.id] = (rect.x, rect.y)
+                return positions
+            except Exception as e:
+                warnings.warn('Native packing solver failed, fall back to the python solver: {}'.format(e), RuntimeWarning)
+        return solve_strip_packing(strip_width, rects)[0]
+
+
+_packing_solver = None
+_packing_solver_lock = Lock()
+
+
+def get_packing_solver():
+    """
+    Returns:
+        PackingSolver: The packing solver session of this process.
+    """
+    global _packing_solver
+    if _packing_solver is None:
+        with _packing_solver_lock:
+            if _packing_solver is None:
+                _packing_solver = PackingSolver()
+    return _packing_solver
+
+
+def is_native_solver_supported():
+    return get_packing_solver().native_solver() is not None
+
+
 def is_layout_supported():
-    try:
-        load_dll()
-        return True
-    except Exception:
-        return False
+    """Layout is supported on all the platforms, the pure python packing solver is used if there is no native solver.
+    """
+    return True
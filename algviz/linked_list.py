@@ -29,6 +29,7 @@ class ForwardLinkedListNode(NodeBase):
         val (printable): The label to be displayed in the forward linked list node.
         next (ForwardLinkedListNode): Point to the next ForwardLinkedListNode object.
     """
+    __slots__ = ('next',)
 
     def __init__(self, val, next=None):
         """
@@ -40,14 +41,6 @@ class ForwardLinkedListNode(NodeBase):
         super().__setattr__('next', next)
         self._on_update_neighbor_(next)
 
-    def __getattribute__(self, name):
-        if name == 'next':
-            # Visit next node in the forward linked list and update the node's visit state.
-            node = super().__getattribute__('next')
-            return node
-        else:
-            return super().__getattribute__(name)
-
     def __setattr__(self, name, value):
         if name == 'next':
             super().__setattr__('next', value)
@@ -61,7 +54,7 @@ class ForwardLinkedListNode(NodeBase):
         Returns:
             list(tuple(next_node, None)): The neighbors list of this node.
         """
-        next_node = super().__getattribute__('next')
+        next_node = self.next
         return [(next_node, None)]
 
 
@@ -73,6 +66,7 @@ class DoublyLinkedListNode(NodeBase):
         prev (DoublyLinkedListNode): Point to the previous DoublyLinkedListNode object.
         next (DoublyLinkedListNode): Point to the next DoublyLinkedListNode object.
     """
+    __slots__ = ('prev', 'next')
 
     def __init__(self, val, prev=None, next=None):
         """
@@ -87,14 +81,6 @@ class DoublyLinkedListNode(NodeBase):
         super().__setattr__('next', next)
         self._on_update_neighbor_(next)
 
-    def __getattribute__(self, name):
-        if name == 'next' or name == 'prev':
-            # Visit next node in the doubly linked list and update the node's visit state.
-            node = super().__getattribute__(name)
-            return node
-        else:
-            return super().__getattribute__(name)
-
     def __setattr__(self, name, value):
         if name == 'next' or name == 'prev':
             super().__setattr__(name, value)
@@ -108,8 +94,8 @@ class DoublyLinkedListNode(NodeBase):
         Returns:
             list(tuple(next_node, None)): The neighbors list of this node.
         """
-        next_node = super().__getattribute__('next')
-        prev_node = super().__getattribute__('prev')
+        next_node = self.next
+        prev_node = self.prev
         return [(next_node, None), (prev_node, None)]
 
 
@@ -41,6 +41,7 @@ class Logger():
         self._next_node_id = 0
         self._log_lines = 0
         self._show_line_num = show_line_num
+        self._svg_str = None        # The cached svg string, it's reset after the logs changed.
 
     def write(self, data):
         """Write log data. Use \\n to split multi-lines.
@@ -59,6 +60,7 @@ class Logger():
             else:
                 self._logs.append(line)
             self._log_lines += 1
+        self._svg_str = None
 
     def clear(self):
         """Clear all cached log string.
@@ -67,8 +69,11 @@ class Logger():
         for child in self._svg.childNodes:
             self._svg.removeChild(child)
         self._logs.clear()
+        self._svg_str = None
 
     def _repr_svg_(self):
+        if self._svg_str is not None:
+            return self._svg_str
         svg_width = 0
         for child in self._svg.childNodes:
             self._svg.removeChild(child)
@@ -92,4 +97,5 @@ class Logger():
         self._svg.setAttribute('width', '{:.0f}pt'.format(svg_width))
         self._svg.setAttribute('height', '{:.0f}pt'.format(svg_height))
         self._svg.setAttribute('viewBox', '0.00 0.00 {:.2f} {:.2f}'.format(svg_width, svg_height))
-        return self._dom.toxml()
+        self._svg_str = self._dom.toxml()
+        return self._svg_str
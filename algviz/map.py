@@ -20,11 +20,12 @@ class Map():
     You can also add or remove a (key, value) pair and iterate on existing keys, values or items.
     [WARNING] Don't create this class directly, use algviz.Visualizer.createMap instead.
     """
-    def __init__(self, data, delay):
+    def __init__(self, data, delay, layout_pool=None):
         """
         Args:
             data (dict): The initial key and values of this map.
             delay (float): The delay time between two animation frames.
+            layout_pool (LayoutWorkerPool): The graphviz layout workers to render this map.
         """
         if data is None:
             self._data = dict()
@@ -34,7 +35,7 @@ class Map():
             self._data = data
         self._delay = delay
         self._graph_nodes = dict()
-        self._graph = SvgGraph([], True, self._delay)
+        self._graph = SvgGraph([], True, self._delay, layout_pool)
         self._graph._type = _SvgGraphType(None, 'ellipse')
         for k, v in self._data.items():
             node_key = GraphNode(str(k))
@@ -124,6 +125,22 @@ class Map():
                 self._graph.markNode(color, node_key, hold)
                 self._graph.markNode(color, node_val, hold)
 
+    def markColors(self, key_colors, hold=False):
+        """Emphasize many key and value nodes by mark their background colors, each key can have a different color.
+
+        Args:
+            key_colors (iterable((printable, (R,G,B)))): The (key, color) pairs to be marked.
+                R, G, B stand for color channel for red, green, blue. R,G,B should be int value and 0 <= R,G,B <= 255. eg:(0, 255, 0)
+            hold (bool): Whether to keep the mark colors in future animation frames.
+        """
+        node_colors = list()
+        for (k, color) in key_colors:
+            if k in self._graph_nodes:
+                (node_key, node_val) = self._graph_nodes[k]
+                node_colors.append((node_key, color))
+                node_colors.append((node_val, color))
+        self._graph.markNodeColors(node_colors, hold)
+
     def removeMark(self, color):
         """Remove the mark color.
 
@@ -173,3 +190,24 @@ class Map():
     def _repr_svg_(self):
         self._graph._delay = self._delay
         return self._graph._repr_svg_()
+
+    def _capture_frame_(self):
+        """Capture the current frame of the map's graph, then render it by `_render_svg_frame_`.
+
+        Returns:
+            _GraphFrame: The captured frame.
+        """
+        self._graph._delay = self._delay
+        return self._graph._capture_frame_()
+
+    def _render_svg_frame_(self, frame, raw_svg=None):
+        """Render the frame captured by `_capture_frame_`, the frames should be rendered in the order they are captured.
+
+        Args:
+            frame (_GraphFrame): The captured frame.
+            raw_svg (str): The SVG generated by graphviz for the frame, layout it now if it's None.
+
+        Returns:
+            str: SVG string to representation the map with animation.
+        """
+        return self._graph._render_svg_frame_(frame, raw_svg)
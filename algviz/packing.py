@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+"""Define the pure python strip packing solver used by Layouter.
+
+Layouter packs the display objects of a visualizer into a strip with fixed width,
+and the native packing solver is only built for some platforms.
+This solver implements the skyline bottom-left heuristic: each rectangle is put on
+the skyline at the position where it's top edge is the lowest. Several rectangle
+orders are tried, then the best order is improved by a short local search.
+
+Author: zjl9959@gmail.com
+
+License: GPLv3
+
+"""
+
+from random import Random
+
+from algviz.utility import clamp
+
+
+SEARCH_WORK = 400000        # Limit the local search steps by (rectangle number)^2 * steps.
+MIN_SEARCH_STEPS = 8
+MAX_SEARCH_STEPS = 1000
+
+
+def solve_strip_packing(strip_width, rects, search_steps=None):
+    """Place the rectangles into a strip and try to minimize the used height of the strip.
+
+    Args:
+        strip_width (int): The width of the strip, it should not be less than the width of any rectangle.
+        rects (list((int, int))): The (width, height) of the rectangles to be placed.
+        search_steps (int): The number of local search steps after the greedy placement.
+            It's decided by the number of rectangles if None.
+
+    Returns:
+        (list((int, int)), int): The (x, y) position of each rectangle's top left corner and the used strip height.
+    """
+    if len(rects) == 0:
+        return list(), 0
+    best_order, best_positions, best_height = None, None, None
+    for order in _rect_orders_(rects):
+        positions, height = _skyline_pack_(strip_width, rects, order)
+        if best_height is None or height < best_height:
+            best_order, best_positions, best_height = order, positions, height
+    # Improve the best order by swapping or moving rectangles in it, the random seed is fixed to get stable layouts.
+    if search_steps is None:
+        search_steps = clamp(SEARCH_WORK // (len(rects) * len(rects)), MIN_SEARCH_STEPS, MAX_SEARCH_STEPS)
+    rand = Random(0)
+    for step in range(search_steps if len(rects) > 1 else 0):
+        order = list(best_order)
+        i, j = rand.randrange(len(order)), rand.randrange(len(order))
+        if step % 2 == 0:
+            order[i], order[j] = order[j], order[i]
+        else:
+            order.insert(j, order.pop(i))
+        positions, height = _skyline_pack_(strip_width, rects, order)
+        if height <= best_height:
+            best_order, best_positions, best_height = order, positions, height
+    return best_positions, best_height
+
+
+def _rect_orders_(rects):
+    """
+    Returns:
+        list(list(int)): The orders of rectangles' index to be tried.
+    """
+    index = range(len(rects))
+    sort_keys = [
+        lambda i: (-rects[i][1], -rects[i][0]),                 # Height first.
+        lambda i: (-rects[i][0], -rects[i][1]),                 # Width first.
+        lambda i: (-rects[i][0] * rects[i][1], -rects[i][1]),   # Area first.
+        lambda i: (-max(rects[i]), -min(rects[i])),             # Longer side first.
+        lambda i: (-rects[i][0] - rects[i][1], -rects[i][1]),   # Perimeter first.
+    ]
+    orders = list()
+    for key in sort_keys:
+        order = sorted(index, key=key)
+        if order not in orders:
+            orders.append(order)
+    return orders
+
+
+def _skyline_pack_(strip_width, rects, order):
+    """Place the rectangles one by one in the order by skyline bottom-left heuristic.
+
+    Returns:
+        (list((int, int)), int): The (x, y) position of each rectangle and the used strip height.
+    """
+    skyline = [[0, 0, strip_width]]     # The skyline segments [x, y, width], sorted by x.
+    positions = [(0, 0)] * len(rects)
+    height = 0
+    for rid in order:
+        (w, h) = rects[rid]
+        best = None     # (top, waste, x, y)
+        for i in range(len(skyline)):
+            # Try to align the rectangle with the left end and right end of this segment.
+            seg_x, _, seg_w = skyline[i]
+            for (x, step) in ((seg_x, 1), (seg_x + seg_w - w, -1)):
+                if x < 0 or x + w > strip_width:
+                    continue
+                fit = _fit_(skyline, i, step, x, w, h, best)
+                if fit is not None:
+                    best = fit
+        if best is None:    # The rectangle is wider than the strip, put it on the top.
+            x, y = 0, max([seg[1] for seg in skyline])
+        else:
+            x, y = best[2], best[3]
+        positions[rid] = (x, y)
+        height = max(height, y + h)
+        _place_(skyline, x, y + h, min(w, strip_width - x))
+    return positions, height
+
+
+def _fit_(skyline, i, step, x, w, h, best):
+    """Put the rectangle on the skyline from x to x + w, the segment i is the first (step=1) or last (step=-1) covered one.
+
+    Returns:
+        (int, int, int, int): The (top, waste, x, y) of this position, or None if it's worse than the best position.
+    """
+    end = x + w
+    y, j = 0, i
+    while 0 <= j < len(skyline) and skyline[j][0] < end and skyline[j][0] + skyline[j][2] > x:
+        y = max(y, skyline[j][1])
+        if best is not None and y + h > best[0]:
+            return None
+        j += step
+    waste = 0
+    for k in range(min(i, j - step), max(i, j - step) + 1):
+        seg_x, seg_y, seg_w = skyline[k]
+        waste += (y - seg_y) * (min(seg_x + seg_w, end) - max(seg_x, x))
+    fit = (y + h, waste, x, y)
+    if best is not None and fit >= best:
+        return None
+    return fit
+
+
+def _place_(skyline, x, top, width):
+    """Raise the skyline in [x, x + width) to top, and merge the neighbor segments with same height.
+    """
+    end = x + width
+    new_skyline = list()
+    for seg in skyline:
+        seg_x, seg_y, seg_w = seg
+        seg_end = seg_x + seg_w
+        if seg_end <= x or seg_x >= end:
+            new_skyline.append(seg)
+            continue
+        if seg_x < x:
+            new_skyline.append([seg_x, seg_y, x - seg_x])
+        if len(new_skyline) == 0 or new_skyline[-1][0] + new_skyline[-1][2] <= x:
+            new_skyline.append([x, top, width])
+        if seg_end > end:
+            new_skyline.append([end, seg_y, seg_end - end])
+    new_skyline.sort(key=lambda seg: seg[0])
+    skyline.clear()
+    for seg in new_skyline:
+        if skyline and skyline[-1][1] == seg[1] and skyline[-1][0] + skyline[-1][2] == seg[0]:
+            skyline[-1][2] += seg[2]
+        else:
+            skyline.append(seg)
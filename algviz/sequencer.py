@@ -9,7 +9,9 @@ License: GPLv3
 """
 
 
-from xml.dom.minidom import parseString, Document
+from hashlib import sha1
+
+from algviz.svg_dom import parse_svg_frame
 
 
 class Sequencer:
@@ -19,7 +21,12 @@ class Sequencer:
         self._root_dom = root_dom           # The root dom Document to contain all the new created nodes.
         self._uid = uid                     # Unique id for this sequencer.
         self._size = list()                 # The svg size at each frame.
-        self._frames = list()               # list(xmldom.Element) frame group node.
+        self._frames = list()               # list(xmldom.Element) frame group node, the merged frames share one node.
+        self._merged = list()               # list(bool) whether the frame is merged into the previous frame.
+        self._last_digest = None            # The content hash of the last frame.
+        self._delta_runs = dict()           # Key:(first frame, child index); Value: last frame of the static child.
+        self._delta_animated = dict()       # Key:frame; Value:list(int) index of the animated children.
+        self._pending = list()              # list((frame, captured frame, frame nodes)) the frames waiting for layout.
 
     def size(self, start_frame, end_frame):
         """Return the maximum size of all the svg frames.
@@ -45,37 +52,105 @@ class Sequencer:
 
         This function just cache the svg nodes of display_obj,
         But will not modify the content.
+        If the content is the same as the last frame and there is no animation in it,
+        this frame is merged into the last frame.
+        The graphs which layout later are captured here, and rendered by `resolve_frames` before export.
 
         """
-        # Wrap the svg's child node with a frame group.
-        g_frame = self._root_dom.createElement('g')
-        g_frame.setAttribute('class', 'frame')
-        g_frame.setAttribute('style', 'opacity:0')
+        captured, frame = None, None
         if not skip:
             if len(self._frames) != frame_count:
                 raise Exception("Sequence:{}.update frame count({}) error!".format(self, frame_count))
-            # Get svg xmldom tree from display_obj.
-            dom = parseString(self._display_obj._repr_svg_())
-            if type(dom) != Document:
-                return
-            svgs = dom.getElementsByTagName('svg')
-            if len(svgs) == 0:
-                return
-            svg = svgs[0]
-            # Try update svg max size.
-            width = int(svg.getAttribute('width')[0:-2])
-            height = int(svg.getAttribute('height')[0:-2])
-            self._size.append((width, height))
-            cache_child_nodes = list()
-            for child in svg.childNodes:
-                if hasattr(child, 'tagName') and (child.tagName == 'g' or child.tagName == 'svg'):
-                    cache_child_nodes.append(child)
-            for child in cache_child_nodes:
-                g_frame.appendChild(child)
+            # Capture the frame and layout it later if display_obj supports, it's resolved by `resolve_frames`.
+            if hasattr(self._display_obj, '_capture_svg_frame_'):
+                captured = self._display_obj._capture_svg_frame_()
+            if captured is None:
+                frame = self._repr_frame_()
+                if frame is None:
+                    return
         else:
-            self._size.append((0, 0))
-        # Cache the g_frame node.
-        self._frames.append(g_frame)
+            frame = (0, 0, (), '')
+        index = len(self._frames)
+        self._size.append((0, 0))
+        self._frames.append(None)
+        self._merged.append(False)
+        # The frames after a pending frame wait for it, because merging frames depends on the last frame.
+        if captured is not None or len(self._pending) > 0:
+            self._pending.append((index, captured, frame))
+        else:
+            self._set_frame_(index, *frame)
+
+    def pending_layouts(self):
+        """
+        Returns:
+            list((str, str)): The (DOT source, graphviz engine) to layout the pending frames, in the order of frames.
+        """
+        jobs = list()
+        for (index, captured, frame) in self._pending:
+            if captured is not None:
+                job = captured.layout_job()
+                if job is not None:
+                    jobs.append(job)
+        return jobs
+
+    def resolve_frames(self, raw_svgs):
+        """Render the pending frames in order with their layout results.
+
+        Args:
+            raw_svgs (dict): Key: (DOT source, graphviz engine) in `pending_layouts`; Value: the SVG generated by graphviz.
+                The frames without layout result are layouted now.
+        """
+        for (index, captured, frame) in self._pending:
+            if captured is not None:
+                job = captured.layout_job()
+                content = self._display_obj._render_svg_frame_(captured, raw_svgs.get(job) if job is not None else None)
+                frame = parse_svg_frame(content)
+                if frame is None:
+                    frame = (0, 0, (), '')
+                else:
+                    frame = frame + (content,)
+            self._set_frame_(index, *frame)
+        self._pending.clear()
+
+    def _repr_frame_(self):
+        """
+        Returns:
+            (int, int, list(xmldom.Element), str): The width, height, child nodes and content of the current frame,
+                None if display_obj has no SVG.
+        """
+        # Take the frame nodes from display_obj directly if it supports, otherwise parse it's svg string.
+        if hasattr(self._display_obj, '_repr_svg_frame_'):
+            frame = self._display_obj._repr_svg_frame_()
+            if frame is None:
+                return None
+            (width, height, child_nodes) = frame
+            content = '{},{}:'.format(width, height) + ''.join([child.toxml() for child in child_nodes])
+            return (width, height, child_nodes, content)
+        content = self._display_obj._repr_svg_()
+        frame = parse_svg_frame(content)
+        if frame is None:
+            return None
+        return frame + (content,)
+
+    def _set_frame_(self, index, width, height, child_nodes, content):
+        """Cache the frame nodes at index, merge it into the last frame if they have the same content.
+        """
+        # Try update svg max size.
+        self._size[index] = (width, height)
+        digest = sha1(content.encode()).digest()
+        if digest == self._last_digest and index > 0 and '<animate' not in content:
+            self._frames[index] = self._frames[index - 1]
+            self._merged[index] = True
+            return
+        self._last_digest = digest
+        # Wrap the svg's child node with a frame group, and cache the g_frame node.
+        g_frame = self._root_dom.createElement('g')
+        g_frame.setAttribute('class', 'frame')
+        g_frame.setAttribute('style', 'opacity:0')
+        for child in child_nodes:
+            g_frame.appendChild(child)
+        self._frames[index] = g_frame
+        self._merged[index] = False
 
     def export(self, pos_offset, frame_delays, start_frame, end_frame, logo):
         """Return the merged dom tree which contain all the svg frames.
@@ -89,27 +164,137 @@ class Sequencer:
             pos_offset (float, float): The x and y position's offset of the nodes.
 
         Returns:
-            dict_values(xmldom.Element): The svg nodes for all the frames.
+            list(xmldom.Element): The svg nodes for all the frames, the merged frames have only one node.
 
         """
         start_frame = max(start_frame, 0)
         end_frame = min(end_frame, len(self._frames))
+        g_frames = list()
         for frame in range(start_frame, end_frame):
-            g_frame = self._frames[frame]
-            g_frame.setAttribute('transform', 'translate({},{})'.format(pos_offset[0], pos_offset[1]))
-            self._update_gframe_animates_(g_frame, frame)
-            animate_appear = None
-            if frame == start_frame:
-                if logo:
-                    animate_appear = self._create_first_frame_animate(start_frame, end_frame + 1, frame, end_frame - 1, frame_delays)
-                else:
-                    animate_appear = self._create_first_frame_animate(start_frame, end_frame, frame, end_frame - 1, frame_delays)
+            g_frame = self.export_frame(frame, pos_offset, frame_delays, start_frame, end_frame, logo)
+            if g_frame is not None:
+                g_frames.append(g_frame)
+        return g_frames
+
+    def export_frame(self, frame, pos_offset, frame_delays, start_frame, end_frame, logo, copy=False):
+        """Finalize the svg node of one frame, see `export` for details.
+
+        The merged frames are exported by their first frame in the range, and it shows until the last merged frame ends.
+
+        Args:
+            copy (bool): Finalize a copy of the frame node and keep the frame unchanged, so it can be exported again.
+
+        Returns:
+            SvgElement: The svg node of the frame, None if the frame is merged into the previous frame.
+        """
+        start_frame = max(start_frame, 0)
+        if frame > start_frame and self._merged[frame]:
+            return None
+        g_frame = self._frames[frame]
+        if copy:
+            g_frame = g_frame.cloneNode(True)
+        return self._export_frame_node_(g_frame, frame, pos_offset, frame_delays, start_frame, end_frame, logo)
+
+    def _export_frame_node_(self, g_frame, frame, pos_offset, frame_delays, start_frame, end_frame, logo):
+        end_frame = min(end_frame, len(self._frames))
+        last_frame = self._last_merged_frame_(frame, end_frame)
+        g_frame.setAttribute('transform', 'translate({},{})'.format(pos_offset[0], pos_offset[1]))
+        self._update_gframe_animates_(g_frame, frame)
+        animate_appear = None
+        if frame == start_frame:
+            if logo:
+                animate_appear = self._create_first_frame_animate(start_frame, end_frame + 1, frame, end_frame - 1, frame_delays)
             else:
-                animate_appear = self._create_frame_appear_animate_(frame, frame - 1)
-            g_frame.appendChild(animate_appear)
-            animate_disappear = self._create_frame_disappear_animate_(frame, frame_delays[frame])
-            g_frame.appendChild(animate_disappear)
-        return self._frames
+                animate_appear = self._create_first_frame_animate(start_frame, end_frame, frame, end_frame - 1, frame_delays)
+        else:
+            animate_appear = self._create_frame_appear_animate_(frame, frame - 1)
+        g_frame.appendChild(animate_appear)
+        animate_disappear = self._create_frame_disappear_animate_(frame, last_frame, sum(frame_delays[frame:last_frame + 1]))
+        g_frame.appendChild(animate_disappear)
+        return g_frame
+
+    def plan_delta_frames(self, start_frame, end_frame):
+        """Find the runs of frames that each static child node of the frames stays the same.
+
+        The static child nodes are compared by their XML string, they are exported once for each run by
+        `export_delta_frame`. The child nodes with animations are kept in their frames.
+        """
+        start_frame = max(start_frame, 0)
+        end_frame = min(end_frame, len(self._frames))
+        self._delta_runs.clear()
+        self._delta_animated.clear()
+        active = dict()     # Key:XML string; Value:list((int, int)) the first frame and child index of the runs.
+        last_frame = None
+        for frame in range(start_frame, end_frame):
+            if frame > start_frame and self._merged[frame]:
+                continue
+            next_active = dict()
+            for i, child in enumerate(self._frames[frame].childNodes):
+                xml = child.toxml()
+                if '<animate' in xml:
+                    self._delta_animated.setdefault(frame, list()).append(i)
+                    continue
+                runs = active.get(xml)
+                run = runs.pop() if runs else (frame, i)
+                next_active.setdefault(xml, list()).append(run)
+            for runs in active.values():
+                for run in runs:
+                    self._delta_runs[run] = last_frame
+            active = next_active
+            last_frame = self._last_merged_frame_(frame, end_frame)
+        for runs in active.values():
+            for run in runs:
+                self._delta_runs[run] = last_frame
+
+    def export_delta_frame(self, frame, pos_offset, frame_delays, start_frame, end_frame, logo, copy=False):
+        """Export one frame planned by `plan_delta_frames`, only the changed child nodes are exported.
+
+        Each static child node is exported at the first frame of it's run, it's wrapped by a group node which
+        is shown by <set> nodes from the begin of the run's first frame to the end of the run's last frame.
+        The animated child nodes are kept in the frame node, see `export_frame` for details.
+
+        Args:
+            copy (bool): Export a copy of the frame node and keep the frame unchanged, so it can be exported again.
+
+        Returns:
+            list(SvgElement): The wrapped static nodes and the frame node, empty if the frame is merged into the previous frame.
+        """
+        start_frame = max(start_frame, 0)
+        if frame > start_frame and self._merged[frame]:
+            return list()
+        g_frame = self._frames[frame]
+        if copy:
+            g_frame = g_frame.cloneNode(True)
+        animated = set(self._delta_animated.get(frame, ()))
+        nodes, children = list(), g_frame.childNodes
+        g_frame.childNodes = list()
+        for i, child in enumerate(children):
+            child.parentNode = None
+            if i in animated:
+                g_frame.appendChild(child)
+            elif (frame, i) in self._delta_runs:
+                g_static = self._root_dom.createElement('g')
+                g_static.setAttribute('transform', 'translate({},{})'.format(pos_offset[0], pos_offset[1]))
+                g_static.setAttribute('style', 'opacity:0')
+                g_static.appendChild(child)
+                g_static.appendChild(self._create_opacity_set_(1, 'V{}_{}S{}.begin'.format(self._vid, self._uid, frame)))
+                last_frame = self._delta_runs[(frame, i)]
+                g_static.appendChild(self._create_opacity_set_(0, 'V{}_{}E{}.begin'.format(self._vid, self._uid, last_frame)))
+                nodes.append(g_static)
+        nodes.append(self._export_frame_node_(g_frame, frame, pos_offset, frame_delays, start_frame, end_frame, logo))
+        return nodes
+
+    def frame_count(self):
+        """
+        Returns:
+            int: The number of recorded frames.
+        """
+        return len(self._frames)
+
+    def release_frame(self, frame):
+        """Release the svg node of an exported frame to free memory.
+        """
+        self._frames[frame] = None
 
     def export_logo(self, pos_offset, frame_delays, start_frame, end_frame):
         start_frame = max(start_frame, 0)
@@ -120,10 +305,27 @@ class Sequencer:
         self._update_gframe_animates_(g_frame, frame)
         animate_appear = self._create_first_frame_animate(start_frame, end_frame, frame, frame, frame_delays)
         g_frame.appendChild(animate_appear)
-        animate_disappear = self._create_frame_disappear_animate_(frame, frame_delays[frame])
+        animate_disappear = self._create_frame_disappear_animate_(frame, frame, frame_delays[frame])
         g_frame.appendChild(animate_disappear)
         return g_frame
 
+    def _last_merged_frame_(self, frame, end_frame):
+        """
+        Returns:
+            int: The last frame before end_frame which is merged into the frame.
+        """
+        last_frame = frame
+        while last_frame + 1 < end_frame and self._merged[last_frame + 1]:
+            last_frame += 1
+        return last_frame
+
+    def _create_opacity_set_(self, opacity, begin):
+        set_node = self._root_dom.createElement('set')
+        set_node.setAttribute('attributeName', 'opacity')
+        set_node.setAttribute('to', str(opacity))
+        set_node.setAttribute('begin', begin)
+        return set_node
+
     def _create_first_frame_animate(self, frame_start, frame_end, first_frame, last_frame, frame_delays):
         animate = self._root_dom.createElement('animate')
         animate.setAttribute('attributeName', 'opacity')
@@ -153,10 +355,10 @@ class Sequencer:
         animate.setAttribute('fill', 'freeze')
         return animate
 
-    def _create_frame_disappear_animate_(self, frame, delay):
+    def _create_frame_disappear_animate_(self, frame, last_frame, delay):
         animate = self._root_dom.createElement('animate')
         animate.setAttribute('attributeName', 'opacity')
-        animate.setAttribute('id', 'V{}_{}E{}'.format(self._vid, self._uid, frame))
+        animate.setAttribute('id', 'V{}_{}E{}'.format(self._vid, self._uid, last_frame))
         animate.setAttribute('begin', 'V{}_{}S{}.begin+{}s'.format(self._vid, self._uid, frame, delay))
         animate.setAttribute('from', '1')
         animate.setAttribute('to', '0')
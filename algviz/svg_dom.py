@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+
+"""Define a lightweight SVG document model which serializes itself by string templates.
+
+It implements the subset of xml.dom.minidom interfaces used by SvgTable, Layouter and the animation utilities,
+and generates the same XML string as minidom's `toxml()` method.
+Elements are compact __slots__ records, so creating and serializing large tables is much cheaper.
+
+Author: zjl9959@gmail.com
+
+License: GPLv3
+
+"""
+
+from xml.parsers import expat
+
+
+RAW_XML_NODE = 0    # The serialized XML string of an element, it can't be modified.
+ELEMENT_NODE = 1
+TEXT_NODE = 3
+CDATA_SECTION_NODE = 4
+COMMENT_NODE = 8
+DOCUMENT_NODE = 9
+
+_XML_HEADER = '<?xml version="1.0" ?>'
+_templates = dict()     # Key: (tag name, attribute names); Value: (open tag template, empty tag template).
+
+
+def _tag_templates_(key):
+    """Compile the string templates for the elements with the same tag name and attribute names.
+
+    Args:
+        key ((str, tuple(str))): The tag name and attribute names of an element.
+
+    Returns:
+        (str, str): The template for open tag and the template for empty element tag.
+    """
+    templates = _templates.get(key)
+    if templates is None:
+        tag = '<' + key[0].replace('{', '{{').replace('}', '}}')
+        for name in key[1]:
+            tag += ' ' + name.replace('{', '{{').replace('}', '}}') + '="{}"'
+        templates = (tag + '>', tag + '/>')
+        _templates[key] = templates
+    return templates
+
+
+def escape_xml(data):
+    """Escape the XML special characters in text data or attribute value as the same as minidom."""
+    if '&' in data:
+        data = data.replace('&', '&amp;')
+    if '<' in data:
+        data = data.replace('<', '&lt;')
+    if '"' in data:
+        data = data.replace('"', '&quot;')
+    if '>' in data:
+        data = data.replace('>', '&gt;')
+    return data
+
+
+class SvgText():
+    """The text node in SvgDocument.
+    """
+    __slots__ = ('data', 'parentNode')
+    nodeType = TEXT_NODE
+    childNodes = ()
+
+    def __init__(self, data):
+        self.data = data
+        self.parentNode = None
+
+    def getElementsByTagName(self, name):
+        return []
+
+    def cloneNode(self, deep):
+        return SvgText(self.data)
+
+    def toxml(self):
+        out = list()
+        self._write_(out)   # SvgCData writes itself differently.
+        return ''.join(out)
+
+    def _write_(self, out):
+        out.append(escape_xml(self.data))
+
+
+class SvgCData(SvgText):
+    """The CDATA section node in SvgDocument.
+    """
+    __slots__ = ()
+    nodeType = CDATA_SECTION_NODE
+
+    def cloneNode(self, deep):
+        return SvgCData(self.data)
+
+    def _write_(self, out):
+        out.append('<![CDATA[' + self.data + ']]>')
+
+
+class SvgComment():
+    """The comment node in SvgDocument.
+    """
+    __slots__ = ('data', 'parentNode')
+    nodeType = COMMENT_NODE
+    childNodes = ()
+
+    def __init__(self, data):
+        self.data = data
+        self.parentNode = None
+
+    def getElementsByTagName(self, name):
+        return []
+
+    def cloneNode(self, deep):
+        return SvgComment(self.data)
+
+    def toxml(self):
+        return '<!--' + self.data + '-->'
+
+    def _write_(self, out):
+        out.append('<!--' + self.data + '-->')
+
+
+class SvgRawXml():
+    """A frozen element which is already serialized into XML string.
+
+    It's used to share the unchanged elements between animation frames without copying them.
+    """
+    __slots__ = ('xml', 'parentNode')
+    nodeType = RAW_XML_NODE
+    childNodes = ()
+
+    def __init__(self, xml):
+        self.xml = xml
+        self.parentNode = None
+
+    def getElementsByTagName(self, name):
+        return []
+
+    def cloneNode(self, deep):
+        return SvgRawXml(self.xml)
+
+    def toxml(self):
+        return self.xml
+
+    def _write_(self, out):
+        out.append(self.xml)
+
+
+class SvgElement():
+    """The element node in SvgDocument.
+    """
+    __slots__ = ('tagName', 'attributes', 'childNodes', 'parentNode')
+    nodeType = ELEMENT_NODE
+
+    def __init__(self, tag_name):
+        self.tagName = tag_name
+        self.attributes = dict()    # Attribute name and value, keep the insertion order.
+        self.childNodes = list()
+        self.parentNode = None
+
+    @property
+    def firstChild(self):
+        return self.childNodes[0] if self.childNodes else None
+
+    def setAttribute(self, name, value):
+        self.attributes[name] = value
+
+    def getAttribute(self, name):
+        return self.attributes.get(name, '')
+
+    def hasAttribute(self, name):
+        return name in self.attributes
+
+    def removeAttribute(self, name):
+        self.attributes.pop(name, None)
+
+    def appendChild(self, node):
+        if node.parentNode is not None:
+            node.parentNode.removeChild(node)
+        self.childNodes.append(node)
+        node.parentNode = self
+        return node
+
+    def removeChild(self, node):
+        self.childNodes.remove(node)
+        node.parentNode = None
+        return node
+
+    def getElementsByTagName(self, name):
+        """
+        Returns:
+            list(SvgElement): All the descendant elements with the tag name in document order.
+        """
+        res = list()
+        self._collect_(name, res)
+        return res
+
+    def cloneNode(self, deep):
+        node = SvgElement(self.tagName)
+        node.attributes = self.attributes.copy()
+        if deep:
+            for child in self.childNodes:
+                child = child.cloneNode(True)
+                child.parentNode = node
+                node.childNodes.append(child)
+        return node
+
+    def _collect_(self, name, res):
+        for node in self.childNodes:
+            if node.nodeType == ELEMENT_NODE:
+                if node.tagName == name:
+                    res.append(node)
+                if node.childNodes:
+                    node._collect_(name, res)
+
+    def toxml(self):
+        out = list()
+        self._write_(out)
+        return ''.join(out)
+
+    def open_tag(self):
+        """
+        Returns:
+            str: The start tag of this element, used to write the element's children one by one.
+        """
+        open_tag, _ = _tag_templates_((self.tagName, tuple(self.attributes)))
+        return open_tag.format(*[escape_xml(v) for v in self.attributes.values()])
+
+    def close_tag(self):
+        """
+        Returns:
+            str: The end tag of this element.
+        """
+        return '</' + self.tagName + '>'
+
+    def _write_(self, out):
+        attrs = self.attributes
+        open_tag, empty_tag = _tag_templates_((self.tagName, tuple(attrs)))
+        values = [escape_xml(v) for v in attrs.values()]
+        if self.childNodes:
+            out.append(open_tag.format(*values))
+            for child in self.childNodes:
+                child._write_(out)
+            out.append('</' + self.tagName + '>')
+        else:
+            out.append(empty_tag.format(*values))
+
+
+class SvgDocument(SvgElement):
+    """The root of the lightweight SVG document model.
+    """
+    __slots__ = ()
+    nodeType = DOCUMENT_NODE
+
+    def __init__(self):
+        super().__init__('#document')
+
+    def createElement(self, tag_name):
+        return SvgElement(tag_name)
+
+    def createTextNode(self, data):
+        return SvgText(data)
+
+    def createComment(self, data):
+        return SvgComment(data)
+
+    def toxml(self):
+        out = [self.toxml_head()]
+        for child in self.childNodes:
+            child._write_(out)
+        return ''.join(out)
+
+    def toxml_head(self):
+        """
+        Returns:
+            str: The XML declaration of this document.
+        """
+        return _XML_HEADER
+
+
+def import_node(node):
+    """Deep copy a xml.dom.minidom node or SvgDocument node into a new SvgDocument node.
+
+    Args:
+        node (xmldom.Node or SvgElement): The element, text or comment node to be copied.
+
+    Returns:
+        SvgElement or SvgText or SvgComment: The copied node, None if the node type is not supported.
+    """
+    if node.nodeType == ELEMENT_NODE:
+        elem = SvgElement(node.tagName)
+        elem.attributes = dict(node.attributes.items())
+        for child in node.childNodes:
+            child = import_node(child)
+            if child is not None:
+                child.parentNode = elem
+                elem.childNodes.append(child)
+        return elem
+    elif node.nodeType == TEXT_NODE:
+        return SvgText(node.data)
+    elif node.nodeType == CDATA_SECTION_NODE:
+        return SvgCData(node.data)
+    elif node.nodeType == COMMENT_NODE:
+        return SvgComment(node.data)
+    elif node.nodeType == RAW_XML_NODE:
+        return SvgRawXml(node.xml)
+    return None
+
+
+def parse_svg(xml):
+    """Parse the XML string into SvgDocument, the document generates the same XML string as minidom.
+
+    Args:
+        xml (str): The XML string to be parsed.
+
+    Returns:
+        SvgDocument: The parsed document.
+    """
+    doc = SvgDocument()
+    stack = [doc]
+    cdata = [False, False]  # Whether in CDATA section, and whether to continue the last CDATA node.
+
+    def start_element(name, attrs):
+        elem = SvgElement(name)
+        # Keep the same attributes order as minidom: namespace declarations go first.
+        names, values = attrs[0::2], attrs[1::2]
+        for i in range(len(names)):
+            if names[i] == 'xmlns' or names[i].startswith('xmlns:'):
+                elem.attributes[names[i]] = values[i]
+        for i in range(len(names)):
+            if names[i] not in elem.attributes:
+                elem.attributes[names[i]] = values[i]
+        elem.parentNode = stack[-1]
+        stack[-1].childNodes.append(elem)
+        stack.append(elem)
+
+    def end_element(name):
+        stack.pop()
+
+    def character_data(data):
+        parent = stack[-1]
+        if parent is doc:
+            return
+        last_type = parent.childNodes[-1].nodeType if parent.childNodes else None
+        if cdata[0]:
+            if cdata[1] and last_type == CDATA_SECTION_NODE:
+                parent.childNodes[-1].data += data
+                return
+            text = SvgCData(data)
+            cdata[1] = True
+        elif last_type == TEXT_NODE:
+            parent.childNodes[-1].data += data
+            return
+        else:
+            text = SvgText(data)
+        text.parentNode = parent
+        parent.childNodes.append(text)
+
+    def start_cdata():
+        cdata[0], cdata[1] = True, False
+
+    def end_cdata():
+        cdata[0] = False
+
+    def comment(data):
+        node = SvgComment(data)
+        node.parentNode = stack[-1]
+        stack[-1].childNodes.append(node)
+
+    parser = expat.ParserCreate()
+    parser.ordered_attributes = True
+    parser.buffer_text = True
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.CharacterDataHandler = character_data
+    parser.CommentHandler = comment
+    parser.StartCdataSectionHandler = start_cdata
+    parser.EndCdataSectionHandler = end_cdata
+    parser.Parse(xml, True)
+    return doc
+
+
+def parse_svg_frame(xml):
+    """Parse the SVG string of a display object into an animation frame.
+
+    Args:
+        xml (str): The SVG string of a display object.
+
+    Returns:
+        (int, int, list(SvgElement)): The width, height of the SVG and it's child <g> and <svg> nodes, None if there is no SVG.
+    """
+    svgs = parse_svg(xml).getElementsByTagName('svg')
+    if len(svgs) == 0:
+        return None
+    svg = svgs[0]
+    width = int(svg.getAttribute('width')[0:-2])
+    height = int(svg.getAttribute('height')[0:-2])
+    nodes = list()
+    for child in svg.childNodes:
+        if child.nodeType == ELEMENT_NODE and (child.tagName == 'g' or child.tagName == 'svg'):
+            child.parentNode = None
+            nodes.append(child)
+    return (width, height, nodes)
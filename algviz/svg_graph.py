@@ -13,31 +13,35 @@ License: GPLv3
 
 from algviz.utility import str2rgbcolor, text_font_size, auto_text_color, rgbcolor2str, FONT_FAMILY
 from algviz.utility import add_animate_appear_into_node, add_animate_move_into_node, layout_text
-from algviz.utility import TraceColorStack, ConsecutiveIdMap, AlgvizFatalError
-from algviz.utility import add_desc_into_svg, find_tag_by_id, add_animate_scale_into_text
+from algviz.utility import TraceColorStack, ConsecutiveIdMap, AlgvizFatalError, AlgvizParamError, LRUCache
+from algviz.utility import add_desc_into_svg, add_animate_scale_into_text
 from algviz.graph import GraphNode
 from algviz.tree import BinaryTreeNode, TreeNode
 from algviz.linked_list import ForwardLinkedListNode, DoublyLinkedListNode
+from algviz.graph_layout import TreeLayoutEngine, ChainLayoutEngine
 
-from graphviz import Digraph as graphviz_Digraph
-from graphviz import Graph as graphviz_Graph
-from graphviz import __version__ as graphviz_version
 from xml.dom.minidom import parseString as mindom_parseString
+from hashlib import sha1
 
 
 SVG_GRAPH_NODE_WIDTH = 32
+SVG_GRAPH_LAYOUT_CACHE_SIZE = 64    # The default maximum number of layouts cached by one graph.
+SVG_GRAPH_FULL_TRAVERSE_RATE = 0.25  # Traverse the whole graph again if more than this rate of nodes changed in a frame.
 
 
 class _SvgGraphType:
     """This class is used to specific the layout parameter for SvgGraph class.
     """
-    def __init__(self, rankdir=None, shape='circle'):
+    def __init__(self, rankdir=None, shape='circle', engine=None):
         """
         Args:
             rankdir (str): The layout direction for graph. example: 'LR'
+            shape (str): The shape of graph nodes. example: 'circle'
+            engine (str): The native layout engine for graph, None means layout by graphviz. example: 'tree', 'chain'
         """
         self.rankdir = rankdir
         self.shape = shape
+        self.engine = engine
 
 
 def _get_graph_type_by_data_(data):
@@ -60,19 +64,159 @@ def _get_graph_type_by_data_(data):
         layout = _SvgGraphType('LR')
     elif type(data) == BinaryTreeNode:
         # For binary tree layout.
-        layout = _SvgGraphType()
+        layout = _SvgGraphType(engine='tree')
     elif type(data) == TreeNode:
         # For normal tree layout.
-        layout = _SvgGraphType()
+        layout = _SvgGraphType(engine='tree')
     elif type(data) == ForwardLinkedListNode:
         # For forward linked list layout.
-        layout = _SvgGraphType('LR')
+        layout = _SvgGraphType('LR', engine='chain')
     elif type(data) == DoublyLinkedListNode:
         # For doubly linked list layout.
-        layout = _SvgGraphType('LR')
+        layout = _SvgGraphType('LR', engine='chain')
     return layout
 
 
+class _GraphFrame():
+    """The state of a graph captured at one animation frame.
+
+    It contains everything needed to render the frame except the graph layout,
+    so the layout can be done later, and the frames are rendered into SVG one by one after that.
+    """
+
+    def __init__(self, delay, node_idmap, edge_idmap):
+        """
+        Args:
+            delay (float): Animation delay time of this frame.
+            node_idmap, edge_idmap (ConsecutiveIdMap): Map the graph nodes/edges into their id in the SVG of this frame.
+        """
+        self.delay = delay
+        self.node_idmap = node_idmap
+        self.edge_idmap = edge_idmap
+        self.raw_svg = None                 # The SVG string generated by the layout engine.
+        self.layout_dot = None              # The graphviz graph to be laid out if raw_svg is None.
+        self.layout_key = None              # The key of this layout in the layout cache.
+        self.node_appear = set()
+        self.node_disappear = set()
+        self.edge_appear = set()
+        self.edge_disappear = set()
+        self.nodes_label_update = dict()    # The old labels of the updated nodes.
+        self.edges_label_update = dict()    # The old labels of the updated edges.
+        self.mark_colors = dict()           # dict((bool, node/edge): color) The colors removed by removeMark before this frame.
+        self.trace_colors = dict()          # dict((bool, node/edge): color) The colors updated by the marks of this frame.
+        self.node_colors = dict()           # The color of each node after this frame.
+        self.edge_colors = dict()           # The color of each edge after this frame.
+
+    def layout_job(self):
+        """
+        Returns:
+            (str, str): The DOT source and graphviz engine to layout this frame, None if the layout is ready.
+        """
+        if self.raw_svg is not None:
+            return None
+        return (self.layout_dot.source, self.layout_dot.engine)
+
+
+class _SvgLayout():
+    """The structure of a graph SVG generated by graphviz or the native layout engines.
+
+    The SVG is parsed only once into this record, then all the nodes, edges and their positions can be found without searching the SVG again.
+    """
+
+    def __init__(self, svg):
+        """
+        Args:
+            svg (xmldom.Document): The SVG object laid out by graphviz or the native layout engines.
+        """
+        self.svg = svg
+        self.root = svg.documentElement     # The <svg> element.
+        self.graph = None                   # The <g id="graph0" class="graph"> element which contains all the nodes and edges.
+        self.graphs = list()                # All the <g class="graph"> elements in the SVG, graph0 and the graph1 added later.
+        self.delt_x, self.delt_y = 0, 0     # The translate of graph0's transform.
+        self.nodes = dict()                 # Key: SVG_node_id; Value: (SVG_node_object, position_x, position_y).
+        self.edges = dict()                 # Key: SVG_edge_id; Value: SVG_edge_object.
+        for graph in self.root.childNodes:
+            if graph.nodeType == graph.ELEMENT_NODE and graph.tagName == 'g' and graph.getAttribute('class') == 'graph':
+                self.graphs.append(graph)
+                if self.graph is None and graph.getAttribute('id') == 'graph0':
+                    self.graph = graph
+        if self.graph is None:
+            return
+        transform = self.graph.getAttribute('transform')
+        translate_index = transform.find('translate')
+        if translate_index != -1:
+            st = transform.find('(', translate_index) + 1
+            ed = transform.find(')', translate_index)
+            translate = transform[st:ed].split(' ')
+            self.delt_x, self.delt_y = float(translate[0]), float(translate[1])
+        for elem in self.graph.childNodes:
+            if elem.nodeType != elem.ELEMENT_NODE or elem.tagName != 'g':
+                continue
+            elem_class = elem.getAttribute('class')
+            if elem_class == 'node':
+                ellipse = _first_child_by_tag_(elem, 'ellipse')
+                cx = float(ellipse.getAttribute('cx')) + self.delt_x
+                cy = float(ellipse.getAttribute('cy')) + self.delt_y
+                self.nodes[int(elem.getAttribute('id')[4:])] = (elem, cx, cy)
+            elif elem_class == 'edge':
+                self.edges[int(elem.getAttribute('id')[4:])] = elem
+
+    def add_graph(self, graph):
+        """Append a new <g class="graph"> element into the SVG.
+
+        Args:
+            graph (xmldom.Node): The graph element to be appended.
+        """
+        self.root.appendChild(graph)
+        self.graphs.append(graph)
+
+    def add_node(self, node_id, node):
+        """Record a node appended into the SVG, the node already in the SVG is kept if they have the same id.
+
+        Args:
+            node_id (int): The id of the node in SVG.
+            node (xmldom.Node): The node element appended into the SVG.
+        """
+        if node_id not in self.nodes:
+            self.nodes[node_id] = (node, 0, 0)
+
+    def add_edge(self, edge_id, edge):
+        """Record an edge appended into the SVG, the edge already in the SVG is kept if they have the same id.
+
+        Args:
+            edge_id (int): The id of the edge in SVG.
+            edge (xmldom.Node): The edge element appended into the SVG.
+        """
+        if edge_id not in self.edges:
+            self.edges[edge_id] = edge
+
+    def find_node(self, node_id):
+        """
+        Returns:
+            xmldom.Node or None: The node element in SVG with this id, None if not found.
+        """
+        node = self.nodes.get(node_id)
+        return node[0] if node is not None else None
+
+    def find_edge(self, edge_id):
+        """
+        Returns:
+            xmldom.Node or None: The edge element in SVG with this id, None if not found.
+        """
+        return self.edges.get(edge_id)
+
+
+def _first_child_by_tag_(node, tag_name):
+    """
+    Returns:
+        xmldom.Node or None: The first child element of node with the tag name, None if not found.
+    """
+    for child in node.childNodes:
+        if child.nodeType == child.ELEMENT_NODE and child.tagName == tag_name:
+            return child
+    return None
+
+
 class SvgGraph():
     """A SvgGraph object can record all the nodes in it's binded graph.
 
@@ -82,21 +226,35 @@ class SvgGraph():
 
     """
 
-    def __init__(self, data, directed, delay):
+    def __init__(self, data, directed, delay, layout_pool=None, layout_cache_size=SVG_GRAPH_LAYOUT_CACHE_SIZE, layout_engine='auto',
+                 deferred=False):
         """
         Args:
             data (iterable): The root node(s) of the topology graph, used to initialize auxiliary data for this graph.
             directed (bool): Should this graph be directed graph or undirected.
             delay (float): Animation delay time between two animation frames.
+            layout_pool (LayoutWorkerPool): The graphviz layout workers to render this graph.
+                Render graph by a new graphviz process each frame if layout_pool is None.
+            layout_cache_size (int): The maximum number of graphviz layouts cached by this graph, 0 to disable the cache.
+            layout_engine (str): 'auto': layout trees and linked lists by the native layout engines, other graphs by graphviz.
+                'graphviz': layout all kinds of graphs by graphviz.
+            deferred (bool): Whether to capture the frames by `_capture_svg_frame_` and layout them later when exporting.
+
+        Raises:
+            AlgvizParamError: Unsupported layout_engine xxx.
         """
         self._directed = directed       # Whether the graph is a directed graph.
+        self._layout_pool = layout_pool  # The graphviz layout workers shared with other graphs.
+        self._layout_cache = LRUCache(layout_cache_size)    # Map the topology hash of graph into graphviz's output svg.
         self._delay = delay             # Delay time of each frame of animation.
         self._node_seq = list()         # The graph node(s) list arranged in a certain order.
         self._add_nodes = list()        # Record the externally added node(s) since last frame.
-        self._remove_nodes = list()     # Record the externally deleted node(s) since last frame.
+        self._remove_nodes = set()      # Record the externally deleted node(s) since last frame.
         self._edge_label = dict()       # Label information to be displayed on each edge of the graph.
         self._node_tcs = dict()         # Record the trajectory access information for all nodes in the current graph (node: ColorStack).
         self._edge_tcs = dict()         # Record the trajectory access information of all edges in the current graph ((start_node, end_node): ColorStack).
+        self._node_color_members = dict()   # Key: mark color; Value: set of the nodes which may carry this color in _node_tcs.
+        self._edge_color_members = dict()   # Key: mark color; Value: set of the edges which may carry this color in _edge_tcs.
         self._node_appear = set()       # Record the collection of node(s) that appearing in the next frame of animation.
         self._node_disappear = set()    # Record the collection of node(s) that disappear in the next frame of animation.
         self._edge_appear = set()       # Record the collection of edge(s) that appearing in the next frame of animation.
@@ -105,14 +263,31 @@ class SvgGraph():
         self._frame_trace_old = list()  # Cache the node/edge related information that needs to be cleared in the previous frame (node_index/edge_index, ColorStack).
         self._frame_trace = list()      # Cache the node/edge related information to be refreshed in the next frame (node_index/edge_index, ColorStack, persistence).
         self._svg = None                # The svg object of the graph to be displayed.
+        self._svg_layout = None         # The _SvgLayout parsed from self._svg.
         self._node_idmap = None         # Map node_index value to the corresponding node index in graphviz's output svg.
         self._edge_idmap = None         # Map edge_index value to the corresponding edge index in graphviz's output svg.
         self._add_history = set()       # Record all the nodes that have been added since graph created. Used to check duplicates when add/remove nodes in the graph.
+        self._node_successors = dict()      # Key: node in _add_history; Value: set of it's neighbor nodes.
+        self._node_predecessors = dict()    # Key: node; Value: set of the nodes in _add_history which have an edge into it.
+        self._node_set = set()          # The nodes in _node_seq.
+        self._node_edges = dict()       # Key: node in the graph; Value: list((neighbor, edge, label)) it's edges in traversal order.
+        self._dirty_nodes = set()       # The nodes whose neighbors or edge labels changed since last frame.
         self._nodes_label_update = dict()   # Cache all the nodes label in the graph to be update since last frame.
         self._edges_lable_update = dict()   # Cache all the edges label in the graph to be update since last frame.
+        self._mark_colors = dict()      # The (is_edge, node/edge): color updated by removeMark since last frame.
+        self._deferred = deferred       # Whether the frames are captured and layouted later.
         self._type = _get_graph_type_by_data_(data)
+        self._layout_engine = None      # The native layout engine for this graph, None means layout by graphviz.
+        if layout_engine == 'auto':
+            if self._type.engine == 'tree':
+                self._layout_engine = TreeLayoutEngine()
+            elif self._type.engine == 'chain':
+                self._layout_engine = ChainLayoutEngine()
+        elif layout_engine != 'graphviz':
+            raise AlgvizParamError('Unsupported layout_engine {}.'.format(layout_engine))
         # Init graph nodes and svg.
         (self._svg, self._node_idmap, self._edge_idmap) = self._create_svg_()
+        self._svg_layout = _SvgLayout(self._svg)
         self._init_graph_nodes(data)    # Traverse the data and add nodes into this graph.
         add_desc_into_svg(self._svg)
 
@@ -135,6 +310,8 @@ class SvgGraph():
                 continue
             cur_node._bind_new_graph_(self)
             self._add_history.add(cur_node)
+            self._index_neighbors_(cur_node)
+            self._remove_nodes.discard(cur_node)   # The node is removed and added again in one frame.
             self._add_nodes.append(cur_node)
             added_nodes_num = added_nodes_num + 1
             for neigh in cur_node._neighbors_()[::-1]:
@@ -162,8 +339,6 @@ class SvgGraph():
                     continue
                 if cur_node in self._remove_nodes or cur_node not in self._add_history:
                     continue
-                cur_node._remove_bind_graph_(self)
-                self._add_history.remove(cur_node)
                 subgraph_nodes.add(cur_node)
                 for neighbor in cur_node._neighbors_():
                     node_stack.append(neighbor[0])
@@ -172,21 +347,16 @@ class SvgGraph():
                 subgraph_nodes.add(node)
             else:
                 return 0
-        # Make sure there is no output edge into the subgraph nodes to be removed.
-        node_stack = self._node_seq + self._add_nodes
-        visited = set(self._remove_nodes)
-        while len(node_stack) > 0:
-            cur_node = node_stack.pop()
-            if cur_node is None or cur_node in subgraph_nodes or cur_node in visited:
-                continue
-            visited.add(cur_node)
-            for neigh in cur_node._neighbors_():
-                if neigh[0] is not None:
-                    if neigh[0] in subgraph_nodes:
-                        return 0
-                    node_stack.append(neigh[0])
-        for node in subgraph_nodes:
-            self._remove_nodes.append(node)
+        # Make sure there is no output edge from the remaining nodes into the subgraph nodes to be removed.
+        for cur_node in subgraph_nodes:
+            for pred in self._node_predecessors.get(cur_node, ()):
+                if pred not in subgraph_nodes:
+                    return 0
+        for cur_node in subgraph_nodes:
+            cur_node._remove_bind_graph_(self)
+            self._add_history.remove(cur_node)
+            self._unindex_neighbors_(cur_node)
+            self._remove_nodes.add(cur_node)
         return len(subgraph_nodes)
 
     def markNode(self, color, node, hold=False):
@@ -202,6 +372,7 @@ class SvgGraph():
             if node not in self._node_tcs.keys():
                 self._node_tcs[node] = TraceColorStack()
             self._node_tcs[node].add(color)
+            self._node_color_members.setdefault(tuple(color), set()).add(node)
             self._frame_trace.append((node, color, hold))
 
     def markNodes(self, color, nodes, hold=False):
@@ -216,6 +387,17 @@ class SvgGraph():
         for node in nodes:
             self.markNode(color, node, hold)
 
+    def markNodeColors(self, node_colors, hold=False):
+        """Emphasize many nodes by mark their background colors, each node can have a different color.
+
+        Args:
+            node_colors (iterable((subclass of GraphNodeBase, (R,G,B)))): The (node, color) pairs to be marked.
+                R, G, B stand for color channel for red, green, blue. R,G,B should be int value and 0 <= R,G,B <= 255. eg:(0, 255, 0)
+            hold (bool): Whether to keep the mark colors in future animation frames.
+        """
+        for (node, color) in node_colors:
+            self.markNode(color, node, hold)
+
     def markEdge(self, color, node1, node2, hold=False):
         """Emphasize one edge by mark it's stoke color.
 
@@ -231,6 +413,7 @@ class SvgGraph():
             if edge_key not in self._edge_tcs.keys():
                 self._edge_tcs[edge_key] = TraceColorStack(bgcolor=(123, 123, 123))
             self._edge_tcs[edge_key].add(color)
+            self._edge_color_members.setdefault(tuple(color), set()).add(edge_key)
             self._frame_trace.append((edge_key, color, hold))
 
     def markEdges(self, color, edges, hold=False):
@@ -247,6 +430,19 @@ class SvgGraph():
             if len(edge) == 2:
                 self.markEdge(color, edge[0], edge[1], hold)
 
+    def markEdgeColors(self, edge_colors, hold=False):
+        """Emphasize many edges by mark their stroke colors, each edge can have a different color.
+
+        Args:
+            edge_colors (iterable(((subclass of GraphNodeBase, subclass of GraphNodeBase), (R,G,B)))):
+                The (edge, color) pairs to be marked. One edge contains the begin and end node in the edge to be marked.
+                R, G, B stand for color channel for red, green, blue. R,G,B should be int value and 0 <= R,G,B <= 255. eg:(0, 255, 0)
+            hold (bool): Whether to keep the mark colors in future animation frames.
+        """
+        for (edge, color) in edge_colors:
+            if len(edge) == 2:
+                self.markEdge(color, edge[0], edge[1], hold)
+
     def removeMark(self, color):
         """Remove the mark color for node(s) and edge(s).
 
@@ -254,16 +450,8 @@ class SvgGraph():
             color ((R,G,B)): R, G, B stand for color channel for red, green, blue.
                 R,G,B should be int value and 0 <= R,G,B <= 255. eg:(0, 255, 0)
         """
-        for k in self._node_seq:
-            if self._node_tcs[k].remove(color):
-                node_id = 'node{}'.format(self._node_idmap.toConsecutiveId(k))
-                node = find_tag_by_id(self._svg, 'g', node_id)
-                self._update_node_color_(node, self._node_tcs[k].color())
-        for k in self._edge_label.keys():
-            if self._edge_tcs[k].remove(color):
-                edge_id = 'edge{}'.format(self._edge_idmap.toConsecutiveId(k))
-                edge = find_tag_by_id(self._svg, 'g', edge_id)
-                self._update_edge_color_(edge, self._edge_tcs[k].color())
+        self._remove_color_members_(False, color)
+        self._remove_color_members_(True, color)
 
     def removeMarks(self, color_list):
         """Remove the mark colors for node(s) and edge(s).
@@ -274,6 +462,41 @@ class SvgGraph():
         for color in color_list:
             self.removeMark(color)
 
+    def _remove_color_members_(self, is_edge, color):
+        """Remove the mark color from the nodes or edges in the graph which carry it.
+
+        Args:
+            is_edge (bool): Remove the color from edges or nodes.
+            color ((R,G,B)): The mark color to be removed.
+        """
+        if is_edge:
+            (color_members, tcs, in_graph) = (self._edge_color_members, self._edge_tcs, self._edge_label)
+        else:
+            (color_members, tcs, in_graph) = (self._node_color_members, self._node_tcs, self._node_set)
+        members = color_members.pop(tuple(color), None)
+        if not members:
+            return
+        remain = set()
+        for k in members:
+            if k in in_graph:
+                if tcs[k].remove(color):
+                    self._mark_colors[(is_edge, k)] = tcs[k].color()
+            elif k in tcs:
+                # Keep the color of the node/edge marked before it's added into the graph.
+                remain.add(k)
+        if remain:
+            color_members[tuple(color)] = remain
+
+    def layoutCacheInfo(self):
+        """Get the statistic information of the graph layout cache.
+
+        Frames whose topology, labels and layout type are the same as a cached frame reuse it's layout without calling graphviz.
+
+        Returns:
+            dict: {'hits': int, 'misses': int, 'size': int, 'maxsize': int}
+        """
+        return self._layout_cache.info()
+
     def _init_graph_nodes(self, data):
         if not data:
             return
@@ -286,6 +509,49 @@ class SvgGraph():
         else:
             self.addNode(data)
 
+    def _updateNodeNeighbors(self, node, new_neighbor):
+        """Update the neighbors of the node in the graph, after the node's neighbors changed.
+
+        Args:
+            node (subclass of GraphNodeBase): The node object whose neighbors changed.
+            new_neighbor (subclass of GraphNodeBase): The new neighbor node to be added into the graph, can be None.
+        """
+        if new_neighbor:
+            self.addNode(new_neighbor)
+        if node in self._add_history:
+            self._index_neighbors_(node)
+            self._dirty_nodes.add(node)
+
+    def _index_neighbors_(self, node):
+        """Update the successors and predecessors index with the current neighbors of the node.
+        """
+        old_successors = self._node_successors.get(node, ())
+        new_successors = set()
+        for (neighbor, _) in node._neighbors_():
+            if neighbor is not None:
+                new_successors.add(neighbor)
+        for neighbor in new_successors.difference(old_successors):
+            if neighbor in self._node_predecessors:
+                self._node_predecessors[neighbor].add(node)
+            else:
+                self._node_predecessors[neighbor] = {node}
+        for neighbor in old_successors:
+            if neighbor not in new_successors:
+                self._remove_predecessor_(neighbor, node)
+        self._node_successors[node] = new_successors
+
+    def _unindex_neighbors_(self, node):
+        """Remove the node from the successors and predecessors index.
+        """
+        for neighbor in self._node_successors.pop(node, ()):
+            self._remove_predecessor_(neighbor, node)
+
+    def _remove_predecessor_(self, node, pred):
+        preds = self._node_predecessors[node]
+        preds.discard(pred)
+        if len(preds) == 0:
+            self._node_predecessors.pop(node)
+
     def _updateNodeLabel(self, node, label):
         """Update the label value of the node in the graph.
 
@@ -297,15 +563,15 @@ class SvgGraph():
             label = ''
         self._nodes_label_update[node] = label
 
-    def _update_svg_nodes_label(self, svg, node_idmap):
-        time0 = (0, self._delay * 0.5)
-        time1 = (self._delay * 0.6, self._delay)
-        for node, old_label in self._nodes_label_update.items():
-            node_id = 'node{}'.format(node_idmap.toConsecutiveId(node))
-            svg_node = find_tag_by_id(svg, 'g', node_id)
+    def _update_svg_nodes_label(self, svg_layout, node_idmap, frame):
+        svg = svg_layout.svg
+        time0 = (0, frame.delay * 0.5)
+        time1 = (frame.delay * 0.6, frame.delay)
+        for node, old_label in frame.nodes_label_update.items():
+            svg_node = svg_layout.find_node(node_idmap.toConsecutiveId(node))
             if svg_node is None:
                 return
-            ellipse = svg_node.getElementsByTagName('ellipse')[0]
+            ellipse = _first_child_by_tag_(svg_node, 'ellipse')
             cx = float(ellipse.getAttribute('cx'))
             cy = float(ellipse.getAttribute('cy'))
             fill_str = ellipse.getAttribute('fill')
@@ -345,16 +611,17 @@ class SvgGraph():
             label (printable): New label content.
         """
         edge_key = self._make_edge_tuple_(node1, node2)
+        self._dirty_nodes.add(node1)
         if label is None:
             label = ''
         self._edges_lable_update[edge_key] = label
 
-    def _update_svg_edges_label(self, svg, edge_idmap):
-        time0 = (0, self._delay * 0.5)
-        time1 = (self._delay * 0.6, self._delay)
-        for edge_key, old_label in self._edges_lable_update.items():
-            edge_id = 'edge{}'.format(edge_idmap.toConsecutiveId(edge_key))
-            svg_node = find_tag_by_id(svg, 'g', edge_id)
+    def _update_svg_edges_label(self, svg_layout, edge_idmap, frame):
+        svg = svg_layout.svg
+        time0 = (0, frame.delay * 0.5)
+        time1 = (frame.delay * 0.6, frame.delay)
+        for edge_key, old_label in frame.edges_label_update.items():
+            svg_node = svg_layout.find_edge(edge_idmap.toConsecutiveId(edge_key))
             if svg_node is None:
                 return
             text_nodes = svg_node.getElementsByTagName('text')
@@ -380,60 +647,127 @@ class SvgGraph():
         Returns:
             str: SVG string to representation graph nodes and edges with animation.
         """
-        # Sequence the graph and add animation effects.
+        frame = self._capture_frame_()
+        self._layout_frame_(frame)
+        return self._render_frame_(frame)
+
+    def _capture_svg_frame_(self):
+        """Capture the current frame without layout if the graph is deferred, then render it by `_render_svg_frame_`.
+
+        Returns:
+            _GraphFrame: The captured frame, None if the graph is not deferred.
+        """
+        if not self._deferred:
+            return None
+        return self._capture_frame_()
+
+    def _render_svg_frame_(self, frame, raw_svg=None):
+        """Render the frame captured by `_capture_svg_frame_`, the frames should be rendered in the order they are captured.
+
+        Args:
+            frame (_GraphFrame): The captured frame.
+            raw_svg (str): The SVG generated by graphviz for the frame's `layout_job`, layout it now if it's None.
+
+        Returns:
+            str: SVG string to representation graph nodes and edges with animation.
+        """
+        self._layout_frame_(frame, raw_svg)
+        return self._render_frame_(frame)
+
+    def _capture_frame_(self):
+        """Traverse the graph and update the node/edge marks, record everything needed to render the frame.
+
+        Returns:
+            _GraphFrame: The captured frame.
+        """
         self._traverse_graph_()
-        (new_svg, node_idmap, edge_idmap) = self._create_svg_()
+        (node_idmap, edge_idmap) = self._create_idmaps_()
+        frame = _GraphFrame(self._delay, node_idmap, edge_idmap)
+        if self._layout_engine is not None:
+            # Native layout engine returns None if it can't layout current graph, then fallback to graphviz.
+            frame.raw_svg = self._layout_engine.render(self._node_seq, self._edge_label, node_idmap, edge_idmap, self._directed)
+        if frame.raw_svg is None:
+            frame.layout_dot = self._create_graphviz_dot_(node_idmap)
+            # The DOT source is a canonical description of the nodes, edges, labels and graph type.
+            frame.layout_key = sha1(frame.layout_dot.source.encode('utf-8')).digest()
+            frame.raw_svg = self._layout_cache.get(frame.layout_key)
+        frame.node_appear, frame.node_disappear = self._node_appear, self._node_disappear
+        frame.edge_appear, frame.edge_disappear = self._edge_appear, self._edge_disappear
+        frame.nodes_label_update, self._nodes_label_update = self._nodes_label_update, dict()
+        frame.edges_label_update, self._edges_lable_update = self._edges_lable_update, dict()
+        frame.mark_colors, self._mark_colors = self._mark_colors, dict()
+        frame.trace_colors = self._update_trace_color_()
+        for node in self._node_seq:
+            frame.node_colors[node] = self._node_tcs[node].color()
+        for edge in self._edge_label.keys():
+            frame.edge_colors[edge] = self._edge_tcs[edge].color()
+        # Update auxiliary data caches.
+        for node in self._node_disappear:
+            self._node_tcs.pop(node)
+        for edge in self._edge_disappear:
+            self._edge_tcs.pop(edge)
+        self._node_appear = set()
+        self._node_disappear = set()
+        self._edge_appear = set()
+        self._edge_disappear = set()
+        return frame
+
+    def _layout_frame_(self, frame, raw_svg=None):
+        """Layout the captured frame by graphviz if it's layout is not ready.
+
+        Args:
+            frame (_GraphFrame): The captured frame.
+            raw_svg (str): The SVG generated by graphviz for the frame, call graphviz now if it's None.
+        """
+        if frame.raw_svg is None:
+            if raw_svg is None:
+                raw_svg = self._render_dot_(frame.layout_dot)
+            frame.raw_svg = raw_svg
+            self._layout_cache.put(frame.layout_key, raw_svg)
+        frame.layout_dot = None
+
+    def _render_frame_(self, frame):
+        """Render the captured and laid out frame into SVG with animations.
+
+        Args:
+            frame (_GraphFrame): The captured frame.
+
+        Returns:
+            str: SVG string to representation graph nodes and edges with animation.
+        """
+        new_svg = mindom_parseString(frame.raw_svg)
+        new_layout = _SvgLayout(new_svg)
+        node_idmap, edge_idmap = frame.node_idmap, frame.edge_idmap
+        self._update_mark_colors_(frame.mark_colors)
+        # Sequence the graph and add animation effects.
         add_desc_into_svg(new_svg)
-        self._update_svg_size_(new_svg)
-        self._update_svg_(new_svg, node_idmap, edge_idmap)
-        self._update_trace_color_()
+        self._update_svg_size_(new_layout)
+        self._update_svg_(new_layout, frame)
+        self._update_mark_colors_(frame.trace_colors)
         self._compress_svg_()
         res = self._svg.toxml()
         # Update the SVG content and prepare for the next frame.
-        self._svg, self._node_idmap, self._edge_idmap = new_svg, node_idmap, edge_idmap
-        new_nodes = self._get_node_pos_(self._svg)
-        for node_id in new_nodes.keys():
+        self._svg, self._svg_layout = new_svg, new_layout
+        self._node_idmap, self._edge_idmap = node_idmap, edge_idmap
+        for node_id, (svg_node, _, _) in new_layout.nodes.items():
             node = self._node_idmap.toAttributeId(node_id)
-            self._update_node_color_(new_nodes[node_id][0], self._node_tcs[node].color())
-        new_edges = self._get_svg_edges_(self._svg)
-        for edge_id in new_edges.keys():
+            self._update_node_color_(svg_node, frame.node_colors[node])
+        for edge_id, svg_edge in new_layout.edges.items():
             edge = self._edge_idmap.toAttributeId(edge_id)
-            self._update_edge_color_(new_edges[edge_id], self._edge_tcs[edge].color())
-        # Update auxiliary data caches.
-        for node in self._node_disappear:
-            self._node_tcs.pop(node)
-        for edge in self._edge_disappear:
-            self._edge_tcs.pop(edge)
-        self._node_appear.clear()
-        self._node_disappear.clear()
-        self._edge_appear.clear()
-        self._edge_disappear.clear()
+            self._update_edge_color_(svg_edge, frame.edge_colors[edge])
         self._node_move.clear()
         return res.replace('\n', '')
 
     def _compress_svg_(self):
-        graphs = self._svg.getElementsByTagName('g')
-        for graph in graphs:
-            if graph.getAttribute('class') != 'graph':
-                continue
+        for graph in self._svg_layout.graphs:
             nodes_to_remove = list()
             for node in graph.childNodes:
                 if node.nodeType == node.COMMENT_NODE:
                     nodes_to_remove.append(node)
                 elif node.nodeType == node.ELEMENT_NODE:
-                    if node.getAttribute('class') == 'node':
-                        titles = node.getElementsByTagName('title')
-                        for title in titles:
-                            node.removeChild(title)
-                            pass
-                    elif node.getAttribute('class') == 'edge':
-                        titles = node.getElementsByTagName('title')
-                        for title in titles:
-                            title_content = title.firstChild.data
-                            if self._directed:
-                                title_content = title_content.split('->')
-                            else:
-                                title_content = title_content.split('--')
+                    if node.getAttribute('class') in ('node', 'edge'):
+                        title = _first_child_by_tag_(node, 'title')
+                        if title is not None:
                             node.removeChild(title)
                     elif node.tagName == 'title':
                         nodes_to_remove.append(node)
@@ -442,7 +776,27 @@ class SvgGraph():
 
     def _traverse_graph_(self):
         """Traverse each node in the graph and update the related data structure.
+
+        The cached edges are reused for the unchanged nodes, only the neighbors of the dirty, added and removed nodes
+        are read again, and the appear/disappear nodes and edges are computed from them.
+        The whole graph is traversed again if too many nodes changed.
         """
+        changed_num = len(self._dirty_nodes) + len(self._add_nodes) + len(self._remove_nodes)
+        if changed_num == 0:
+            # The topology of this graph is not changed since last frame.
+            self._node_appear, self._node_disappear = set(), set()
+            self._edge_appear, self._edge_disappear = set(), set()
+            return
+        full_traverse = changed_num > len(self._node_seq) * SVG_GRAPH_FULL_TRAVERSE_RATE
+        changed_edges = list()  # The cached edges of the changed nodes in last frame.
+        if full_traverse:
+            self._node_edges.clear()
+        else:
+            for nodes in (self._dirty_nodes, self._add_nodes, self._remove_nodes):
+                for node in nodes:
+                    edges = self._node_edges.pop(node, None)
+                    if edges is not None:
+                        changed_edges.append(edges)
         # Traverse the nodes in the graph and record the new topology structure of this graph.
         new_node_seq = list()
         new_edge_label = dict()
@@ -455,18 +809,43 @@ class SvgGraph():
                 continue
             visited.add(cur_node)
             new_node_seq.append(cur_node)
-            for neigh in cur_node._neighbors_()[::-1]:
-                if neigh[0] is not None and neigh[0] not in self._remove_nodes:
-                    temp_edge = self._make_edge_tuple_(cur_node, neigh[0])
-                    new_edge_label[temp_edge] = neigh[1]
-                    node_stack.append(neigh[0])
+            edges = self._node_edges.get(cur_node)
+            if edges is None:
+                edges = list()
+                for neigh in cur_node._neighbors_()[::-1]:
+                    if neigh[0] is not None:
+                        edges.append((neigh[0], self._make_edge_tuple_(cur_node, neigh[0]), neigh[1]))
+                self._node_edges[cur_node] = edges
+            for (neighbor, edge, label) in edges:
+                if neighbor not in self._remove_nodes:
+                    new_edge_label[edge] = label
+                    node_stack.append(neighbor)
         # Update the newly added and disappeared edges and nodes.
-        old_node_set = set(self._node_seq)
-        new_node_set = set(new_node_seq)
-        self._node_appear = new_node_set - old_node_set
-        self._node_disappear = old_node_set - new_node_set
-        self._edge_appear = new_edge_label.keys() - self._edge_label.keys()
-        self._edge_disappear = self._edge_label.keys() - new_edge_label.keys()
+        if full_traverse:
+            new_node_set = set(new_node_seq)
+            self._node_appear = new_node_set - self._node_set
+            self._node_disappear = self._node_set - new_node_set
+            self._edge_appear = new_edge_label.keys() - self._edge_label.keys()
+            self._edge_disappear = self._edge_label.keys() - new_edge_label.keys()
+            self._node_set = new_node_set
+        else:
+            # The removed nodes have no input edge from other nodes, and all the other nodes are visited.
+            self._node_appear = set([node for node in self._add_nodes if node not in self._remove_nodes and node not in self._node_set])
+            self._node_disappear = self._node_set.intersection(self._remove_nodes)
+            self._edge_appear = set()
+            for node in self._dirty_nodes.union(self._add_nodes):
+                for (neighbor, edge, label) in self._node_edges.get(node, ()):
+                    if edge in new_edge_label and edge not in self._edge_label:
+                        self._edge_appear.add(edge)
+            self._edge_disappear = set()
+            for edges in changed_edges:
+                for (neighbor, edge, label) in edges:
+                    if edge in self._edge_label and edge not in new_edge_label:
+                        self._edge_disappear.add(edge)
+            self._node_set.difference_update(self._node_disappear)
+            self._node_set.update(self._node_appear)
+        for node in self._remove_nodes:
+            self._node_edges.pop(node, None)
         # Update the cached track color information.
         for node in self._node_appear:
             if node not in self._node_tcs.keys():
@@ -479,6 +858,7 @@ class SvgGraph():
         self._edge_label = new_edge_label
         self._add_nodes.clear()
         self._remove_nodes.clear()
+        self._dirty_nodes.clear()
 
     def _update_node_color_(self, node, color):
         """Update the color attribute of the node in SVG.
@@ -514,43 +894,58 @@ class SvgGraph():
                 polygons[0].setAttribute('stroke', rgbcolor2str(color))
 
     def _update_trace_color_(self):
-        """Update the color change of the SVG track in the frame.
+        """Update the color stacks of the marked nodes and edges in the frame.
+
+        Returns:
+            dict((bool, node/edge): (R,G,B)): Key is whether it's an edge and the marked node/edge, value is it's new color.
         """
+        trace_colors = dict()
+        frame_marks = set((k, tuple(color)) for k, color, hold in self._frame_trace)
         for k, color in self._frame_trace_old:
             if type(k) == tuple and k in self._edge_tcs.keys():
-                if (k, color, False) not in self._frame_trace and (k, color, True) not in self._frame_trace:
+                if (k, tuple(color)) not in frame_marks:
                     self._edge_tcs[k].remove(color)
-                edge_id = 'edge{}'.format(self._edge_idmap.toConsecutiveId(k))
-                edge = find_tag_by_id(self._svg, 'g', edge_id)
-                self._update_edge_color_(edge, self._edge_tcs[k].color())
+                    self._edge_color_members.get(tuple(color), set()).discard(k)
+                trace_colors[(True, k)] = self._edge_tcs[k].color()
             elif k in self._node_tcs.keys():
-                if (k, color, False) not in self._frame_trace and (k, color, True) not in self._frame_trace:
+                if (k, tuple(color)) not in frame_marks:
                     self._node_tcs[k].remove(color)
-                node_id = 'node{}'.format(self._node_idmap.toConsecutiveId(k))
-                node = find_tag_by_id(self._svg, 'g', node_id)
-                self._update_node_color_(node, self._node_tcs[k].color())
+                    self._node_color_members.get(tuple(color), set()).discard(k)
+                trace_colors[(False, k)] = self._node_tcs[k].color()
         self._frame_trace_old.clear()
         for k, color, hold in self._frame_trace:
             if type(k) == tuple:
-                edge_id = 'edge{}'.format(self._edge_idmap.toConsecutiveId(k))
-                edge = find_tag_by_id(self._svg, 'g', edge_id)
-                self._update_edge_color_(edge, self._edge_tcs[k].color())
+                trace_colors[(True, k)] = self._edge_tcs[k].color()
             else:
-                node_id = 'node{}'.format(self._node_idmap.toConsecutiveId(k))
-                node = find_tag_by_id(self._svg, 'g', node_id)
-                self._update_node_color_(node, self._node_tcs[k].color())
+                trace_colors[(False, k)] = self._node_tcs[k].color()
             if not hold:
                 self._frame_trace_old.append((k, color))
         self._frame_trace.clear()
+        return trace_colors
+
+    def _update_mark_colors_(self, colors):
+        """Update the colors of the nodes and edges in the SVG of last frame.
+
+        Args:
+            colors (dict((bool, node/edge): (R,G,B))): Key is whether it's an edge and the node or (start_node, end_node) edge
+                to be updated, value is the new color.
+        """
+        for (is_edge, k), color in colors.items():
+            if is_edge:
+                edge = self._svg_layout.find_edge(self._edge_idmap.toConsecutiveId(k))
+                self._update_edge_color_(edge, color)
+            else:
+                node = self._svg_layout.find_node(self._node_idmap.toConsecutiveId(k))
+                self._update_node_color_(node, color)
 
-    def _update_svg_size_(self, new_svg):
+    def _update_svg_size_(self, new_layout):
         """Adjust the view size of self._svg to ensure that all elements can be observed.
 
         Args:
-            new_svg (xmldom.Document): The latest SVG object to be updated.
+            new_layout (_SvgLayout): The layout of the latest SVG object to be updated.
         """
-        old_svg_node = self._svg.getElementsByTagName('svg')[0]
-        new_svg_node = new_svg.getElementsByTagName('svg')[0]
+        old_svg_node = self._svg_layout.root
+        new_svg_node = new_layout.root
         old_svg_width = int(old_svg_node.getAttribute('width')[0:-2])
         old_svg_height = int(old_svg_node.getAttribute('height')[0:-2])
         new_svg_width = int(new_svg_node.getAttribute('width')[0:-2])
@@ -560,29 +955,28 @@ class SvgGraph():
         old_svg_node.setAttribute('width', '{}pt'.format(width))
         old_svg_node.setAttribute('height', '{}pt'.format(height))
         old_svg_node.setAttribute('viewBox', '0.00 0.00 {:.2f} {:.2f}'.format(width, height))
-        graph = find_tag_by_id(new_svg, 'g', 'graph0')
-        clone_graph = graph.cloneNode(deep=False)
+        clone_graph = new_layout.graph.cloneNode(deep=False)
         clone_graph.setAttribute('id', 'graph1')
-        old_svg_node.appendChild(clone_graph)
+        self._svg_layout.add_graph(clone_graph)
 
-    def _update_svg_(self, new_svg, node_idmap, edge_idmap):
+    def _update_svg_(self, new_layout, frame):
         """Add all node and edge related animations into SVG.
 
         Args:
-            new_svg (xmldom.Doucment): The latest SVG object to be updated.
-            node_idmap (ConsecutiveIdMap): The two-way mapping relationship between the node ID in the memory and the ID in the SVG.
-            edge_idmap (ConsecutiveIdMap): The two-way mapping relationship between the edge ID in the memory and the ID in the SVG.
+            new_layout (_SvgLayout): The layout of the latest SVG object to be updated.
+            frame (_GraphFrame): The captured frame of new_layout, it's node_idmap and edge_idmap are the two-way mapping relationship
+                between the node/edge ID in the memory and the ID in the SVG.
         """
-        old_pos = self._get_node_pos_(self._svg)
-        new_pos = self._get_node_pos_(new_svg)
-        old_edges = self._get_svg_edges_(self._svg)
-        new_edges = self._get_svg_edges_(new_svg)
+        node_idmap, edge_idmap = frame.node_idmap, frame.edge_idmap
+        old_layout = self._svg_layout
+        old_pos, new_pos = old_layout.nodes, new_layout.nodes
+        old_edges, new_edges = old_layout.edges, new_layout.edges
         has_disappear_animate = False
-        disappear_animate_end_time = self._delay * 0.2
+        disappear_animate_end_time = frame.delay * 0.2
         # Add the disappearing animation effect for the graph nodes.
         for old_node_id in old_pos.keys():
             old_node = self._node_idmap.toAttributeId(old_node_id)
-            if old_node in self._node_disappear:
+            if old_node in frame.node_disappear:
                 g = old_pos[old_node_id][0]
                 animate = self._svg.createElement('animate')
                 add_animate_appear_into_node(g, animate, (0, disappear_animate_end_time), False)
@@ -599,7 +993,7 @@ class SvgGraph():
         # Add the disappearing animation effect for the edge.
         for old_edge_id in old_edges.keys():
             (node1, node2) = self._edge_idmap.toAttributeId(old_edge_id)  # The ID value of the edge (start_node, end_node) in the memory.
-            if (node1, node2) in self._edge_disappear or node1 in self._node_move or node2 in self._node_move:
+            if (node1, node2) in frame.edge_disappear or node1 in self._node_move or node2 in self._node_move:
                 g = old_edges[old_edge_id]
                 animate = self._svg.createElement('animate')
                 add_animate_appear_into_node(g, animate, (0, disappear_animate_end_time), False)
@@ -607,7 +1001,7 @@ class SvgGraph():
         # Add the moving animation effect for the graph nodes.
         has_move_animate = False
         move_animate_start_time = disappear_animate_end_time if has_disappear_animate else 0
-        move_animate_end_time = move_animate_start_time + (self._delay - move_animate_start_time) * 0.6
+        move_animate_end_time = move_animate_start_time + (frame.delay - move_animate_start_time) * 0.6
         for old_node_id in old_pos.keys():
             old_node = self._node_idmap.toAttributeId(old_node_id)
             if old_node in node_idmap._attr2id.keys():
@@ -621,79 +1015,31 @@ class SvgGraph():
                     add_animate_move_into_node(g, animate, move, (move_animate_start_time, move_animate_end_time), False)
                     has_move_animate = True
         # Add the appearing animation effect for the graph nodes.
-        graph = find_tag_by_id(self._svg, 'g', 'graph1')
+        graph = old_layout.graphs[-1]
         appear_animate_start_time = move_animate_end_time if has_move_animate else move_animate_start_time
-        for old_node in self._node_appear:
+        for old_node in frame.node_appear:
             new_node_id = node_idmap.toConsecutiveId(old_node)
             old_node_id = self._node_idmap.toConsecutiveId(old_node)
             clone_node = new_pos[new_node_id][0].cloneNode(deep=True)
             clone_node.setAttribute('id', 'node{}'.format(old_node_id))
             graph.appendChild(clone_node)
+            old_layout.add_node(old_node_id, clone_node)
             animate = self._svg.createElement('animate')
-            add_animate_appear_into_node(clone_node, animate, (appear_animate_start_time, self._delay), True)
+            add_animate_appear_into_node(clone_node, animate, (appear_animate_start_time, frame.delay), True)
         # Add the appearing animation effect for the graph edges.
-        graph = find_tag_by_id(self._svg, 'g', 'graph1')
         for new_edge_id in new_edges.keys():
             (node1, node2) = edge_idmap.toAttributeId(new_edge_id)
-            if (node1, node2) in self._edge_appear or node1 in self._node_move or node2 in self._node_move:
+            if (node1, node2) in frame.edge_appear or node1 in self._node_move or node2 in self._node_move:
                 old_edge_id = self._edge_idmap.toConsecutiveId((node1, node2))
                 clone_edge = new_edges[new_edge_id].cloneNode(deep=True)
                 clone_edge.setAttribute('id', 'edge{}'.format(old_edge_id))
                 graph.appendChild(clone_edge)
+                old_layout.add_edge(old_edge_id, clone_edge)
                 animate = self._svg.createElement('animate')
-                add_animate_appear_into_node(clone_edge, animate, (appear_animate_start_time, self._delay), True)
+                add_animate_appear_into_node(clone_edge, animate, (appear_animate_start_time, frame.delay), True)
         # Add node/edge label text zoom in/out animations.
-        self._update_svg_nodes_label(self._svg, self._node_idmap)
-        self._nodes_label_update.clear()
-        self._update_svg_edges_label(self._svg, self._edge_idmap)
-        self._edges_lable_update.clear()
-
-    def _get_node_pos_(self, svg):
-        """Get the absolute coordinates of all the graph node(s) in the SVG.
-
-        Args:
-            svg (xmldom.Document): The SVG object to be display.
-
-        Returns:
-            dict(int:tuple(xmldom.Node,float,float)): The map from SVG_node_id to the SVG_node_object and node position.
-                Key is SVG_node_id, value is (SVG_node_object, position_x, position_y).
-        """
-        graph = find_tag_by_id(svg, 'g', 'graph0')
-        transform = graph.getAttribute('transform')
-        translate_index = transform.find('translate')
-        delt_x, delt_y = 0, 0
-        if translate_index != -1:
-            st = transform.find('(', translate_index) + 1
-            ed = transform.find(')', translate_index)
-            translate = transform[st:ed].split(' ')
-            delt_x, delt_y = float(translate[0]), float(translate[1])
-        positions = dict()
-        nodes = svg.getElementsByTagName('g')
-        for node in nodes:
-            if node.getAttribute('class') == 'node':
-                node_id = int(node.getAttribute('id')[4:])
-                ellipse = node.getElementsByTagName('ellipse')[0]
-                cx = float(ellipse.getAttribute('cx')) + delt_x
-                cy = float(ellipse.getAttribute('cy')) + delt_y
-                positions[node_id] = (node, cx, cy)
-        return positions
-
-    def _get_svg_edges_(self, svg):
-        """Get all the edges index and object in the SVG xml tree.
-
-        Args:
-            svg (xmldom.Document): The SVG object to be display.
-
-        Returns:
-            dict(int:xmldom.Node): Key is the edge index in SVG, Value is the edge node in SVG.
-        """
-        edges = dict()
-        nodes = svg.getElementsByTagName('g')
-        for node in nodes:
-            if node.getAttribute('class') == 'edge':
-                edge_id = int(node.getAttribute('id')[4:])
-                edges[edge_id] = node
-        return edges
+        self._update_svg_nodes_label(old_layout, self._node_idmap, frame)
+        self._update_svg_edges_label(old_layout, self._edge_idmap, frame)
 
     def _make_edge_tuple_(self, node1, node2):
         """Create an edge tuple according to nodes and the graph's type.
@@ -710,7 +1056,7 @@ class SvgGraph():
                 return (node2, node1)
 
     def _create_svg_(self):
-        """Call graphviz lib to create a new SVG object to represent the latest graph.
+        """Layout the latest graph by the native layout engine or graphviz, and create a new SVG object to represent it.
         The SVG is static and don't include animations.
 
         Returns:
@@ -719,9 +1065,62 @@ class SvgGraph():
         Raises:
             AlgvizFatalError: Unsupported graphviz version xxx.
         """
-        dot = None
+        (node_idmap, edge_idmap) = self._create_idmaps_()
+        raw_svg_str = None
+        if self._layout_engine is not None:
+            # Native layout engine returns None if it can't layout current graph, then fallback to graphviz.
+            raw_svg_str = self._layout_engine.render(self._node_seq, self._edge_label, node_idmap, edge_idmap, self._directed)
+        if raw_svg_str is None:
+            raw_svg_str = self._create_graphviz_svg_(node_idmap)
+        return (mindom_parseString(raw_svg_str), node_idmap, edge_idmap)
+
+    def _create_idmaps_(self):
+        """
+        Returns:
+            (ConsecutiveIdMap, ConsecutiveIdMap): Map the nodes and edges of the latest graph into their id in SVG.
+        """
         node_idmap = ConsecutiveIdMap(1)
         edge_idmap = ConsecutiveIdMap(1)
+        for node in self._node_seq:
+            node_idmap.toConsecutiveId(node)
+        for edge in self._edge_label.keys():
+            edge_idmap.toConsecutiveId(edge)
+        return (node_idmap, edge_idmap)
+
+    def _create_graphviz_svg_(self, node_idmap):
+        """Call graphviz lib to layout the latest graph, reuse the cached layout if the graph is not changed.
+
+        Args:
+            node_idmap (ConsecutiveIdMap): Map the graph nodes into their id in SVG.
+
+        Returns:
+            str: The SVG string generated by graphviz.
+
+        Raises:
+            AlgvizFatalError: Unsupported graphviz version xxx.
+        """
+        dot = self._create_graphviz_dot_(node_idmap)
+        # The DOT source is a canonical description of the nodes, edges, labels and graph type.
+        layout_key = sha1(dot.source.encode('utf-8')).digest()
+        raw_svg_str = self._layout_cache.get(layout_key)
+        if raw_svg_str is None:
+            raw_svg_str = self._render_dot_(dot)
+            self._layout_cache.put(layout_key, raw_svg_str)
+        return raw_svg_str
+
+    def _create_graphviz_dot_(self, node_idmap):
+        """Describe the latest graph in DOT language for graphviz.
+
+        Args:
+            node_idmap (ConsecutiveIdMap): Map the graph nodes into their id in SVG.
+
+        Returns:
+            graphviz.Digraph/graphviz.Graph: The graph description to be rendered.
+        """
+        # Import graphviz when it's needed, it's slow to import.
+        from graphviz import Digraph as graphviz_Digraph
+        from graphviz import Graph as graphviz_Graph
+        dot = None
         if self._directed:
             dot = graphviz_Digraph(format='svg')
         else:
@@ -746,9 +1145,27 @@ class SvgGraph():
                 dot.edge('{}'.format(node1_id), '{}'.format(node2_id))
             else:
                 dot.edge('{}'.format(node1_id), '{}'.format(node2_id), label='{}'.format(label), fontcolor='#C0C0C0', fontsize='12')
-            edge_idmap.toConsecutiveId((node1, node2))
+        return dot
+
+    def _render_dot_(self, dot):
+        """Call graphviz to layout the graph and render it into SVG.
+
+        Args:
+            dot (graphviz.Digraph/graphviz.Graph): The graph description to be rendered.
+
+        Returns:
+            str: The SVG string generated by graphviz.
+
+        Raises:
+            AlgvizFatalError: Unsupported graphviz version xxx.
+        """
         raw_svg_str = ''
-        if hasattr(dot, '_repr_svg_') and callable(getattr(dot, '_repr_svg_')):
+        if self._layout_pool is not None:
+            try:
+                raw_svg_str = self._layout_pool.render(dot.source, dot.engine)
+            except Exception as e:
+                raise AlgvizFatalError('Error when rendering graph:{}'.format(e))
+        elif hasattr(dot, '_repr_svg_') and callable(getattr(dot, '_repr_svg_')):
             try:
                 raw_svg_str = dot._repr_svg_()
             except Exception as e:
@@ -761,5 +1178,6 @@ class SvgGraph():
             except Exception as e:
                 raise AlgvizFatalError('Error when rendering graph:{}'.format(e))
         else:
+            from graphviz import __version__ as graphviz_version
             raise AlgvizFatalError('Unsupported graphviz version {}'.format(graphviz_version))
-        return (mindom_parseString(raw_svg_str), node_idmap, edge_idmap)
+        return raw_svg_str
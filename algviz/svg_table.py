@@ -13,22 +13,35 @@ License: GPLv3
 """
 
 from xml.dom.minidom import Document, Node
+from algviz.svg_dom import SvgDocument, SvgRawXml, escape_xml, import_node
 from algviz.utility import add_desc_into_svg, add_default_text_style, rgbcolor2str, text_font_size, FONT_FAMILY
-from algviz.utility import auto_text_color, find_tag_by_id, str2rgbcolor, clamp, add_animate_scale_into_text
-from algviz.utility import add_animate_move_into_node, add_animate_appear_into_node, clear_svg_animates
+from algviz.utility import auto_text_color, str2rgbcolor, clamp, add_animate_scale_into_text
+from algviz.utility import add_animate_move_into_node, add_animate_appear_into_node, clear_node_animates
 from algviz.utility import layout_text
 
 
+SVG_BACKENDS = ('minidom', 'string')
+
+
 class SvgTable():
-    def __init__(self, width, height):
+    def __init__(self, width, height, backend='minidom'):
         """Create an XML object to represent SVG table.
 
         Args:
             width (float): The width of svg table.
             heigt (float): The height of svg table.
+            backend (str): 'minidom': build the SVG by xml.dom.minidom.
+                'string': build the SVG by lightweight element records and serialize it by string templates.
         """
-        self._dom = Document()
+        if backend == 'string':
+            self._dom = SvgDocument()
+        else:
+            self._dom = Document()
         self._cur_id = 0
+        self._gid2elem = dict()     # Map the element's unique ID into it's <g> node in SVG.
+        self._fragments = dict()    # Map the child node of <svg> into it's cached XML string.
+        self._rect_layouts = dict()     # Map the rectangle element's ID into the rect it was laid out with.
+        self._animated_gids = set()     # The ID of elements which contain animations.
         self._svg = self._dom.createElement('svg')
         self._svg.setAttribute('width', '{:.0f}pt'.format(width))
         self._svg.setAttribute('height', '{:.0f}pt'.format(height))
@@ -70,6 +83,7 @@ class SvgTable():
         g = self._dom.createElement('g')
         g.setAttribute('id', gid)
         self._svg.appendChild(g)
+        self._gid2elem[int(gid)] = g
         r = self._dom.createElement('rect')
         r.setAttribute('x', '{:.2f}'.format(rect[0]))
         r.setAttribute('y', '{:.2f}'.format(rect[1]))
@@ -115,6 +129,7 @@ class SvgTable():
         g = self._dom.createElement('g')
         g.setAttribute('id', gid)
         self._svg.appendChild(g)
+        self._gid2elem[int(gid)] = g
         t = self._dom.createElement('text')
         t.setAttribute('x', '{:.2f}'.format(pos[0]))
         t.setAttribute('y', '{:.2f}'.format(pos[1]))
@@ -137,9 +152,10 @@ class SvgTable():
             fill ((R,G,B)): Stroke color of this text element. R, G, B stand for color channel for red, green, blue.
                 R,G,B should be int value and 0 <= R,G,B <= 255. eg:(0, 0, 0)
         """
-        g = find_tag_by_id(self._svg, 'g', str(gid))
+        g = self._gid2elem.get(gid)
         if g is None:
             return
+        self._invalidate_(gid, g)
         t = g.getElementsByTagName('text')
         for txt in t:
             if pos is not None:
@@ -167,9 +183,13 @@ class SvgTable():
             opacity (float or None): New opacity arrtibute for this rectangle. Keep old opacity if opacity is None.
             delay (float): The total delay time of text scale animations.
         """
-        g = find_tag_by_id(self._svg, 'g', str(gid))
+        g = self._gid2elem.get(gid)
         if g is None:
             return
+        if rect is not None and text is None and fill is None and stroke is None and opacity is None:
+            if self._rect_layouts.get(gid) == rect:
+                return  # Nothing changed since the element was laid out with the same rect.
+        self._invalidate_(gid, g)
         rects = g.getElementsByTagName('rect')
         if len(rects) == 0:
             return
@@ -217,7 +237,10 @@ class SvgTable():
                         if child.nodeType == Node.TEXT_NODE:
                             t.setAttribute('font-size', '{:.2f}'.format(new_font))
                             break
+            if text is None:
+                self._rect_layouts[gid] = tuple(rect)
         if text is not None:
+            self._animated_gids.add(gid)
             rx = float(r.getAttribute('x'))
             ry = float(r.getAttribute('y'))
             width = float(r.getAttribute('width'))
@@ -254,8 +277,10 @@ class SvgTable():
         Args:
             gid (int): The unique ID of the element to be deleted.
         """
-        g = find_tag_by_id(self._svg, 'g', str(gid))
+        g = self._gid2elem.pop(gid, None)
         if g is not None:
+            self._invalidate_(gid, g)
+            self._animated_gids.discard(gid)
             self._svg.removeChild(g)
 
     def add_animate_move(self, gid, move, time, bessel=True):
@@ -267,8 +292,10 @@ class SvgTable():
             time (tuple(float, float)): (begin, end) The begin and end time of this animation.
             bessel (bool): Whether to set the path of this move animation as bezier curve.
         """
-        g = find_tag_by_id(self._svg, 'g', str(gid))
+        g = self._gid2elem.get(gid)
         if g is not None:
+            self._invalidate_(gid, g)
+            self._animated_gids.add(gid)
             animate = self._dom.createElement('animateMotion')
             add_animate_move_into_node(g, animate, move, time, bessel)
 
@@ -280,8 +307,10 @@ class SvgTable():
             time ((begin, end)): The begin and end time of this animation.
             appear (bool): True for appear animation; False for disappear animation.
         """
-        g = find_tag_by_id(self._svg, 'g', str(gid))
+        g = self._gid2elem.get(gid)
         if g is not None:
+            self._invalidate_(gid, g)
+            self._animated_gids.add(gid)
             animate = self._dom.createElement('animate')
             add_animate_appear_into_node(g, animate, time, appear)
 
@@ -308,6 +337,7 @@ class SvgTable():
         g = self._dom.createElement('g')
         g.setAttribute('id', gid)
         self._svg.appendChild(g)
+        self._gid2elem[int(gid)] = g
         # Create the arrow "^" node of the cursor.
         arrow_width = clamp(cursor[2] * 0.2, 4, 10) * 0.5
         arrow_top_x = cursor[0] + cursor[2]
@@ -395,9 +425,10 @@ class SvgTable():
             gid (int): The unique ID of the cursor to be updated.
             new_pos (delt_x:float, delt_y:float): New position of the cursor's arrow top, relative to cursor's old position.
         """
-        g = find_tag_by_id(self._svg, 'g', str(gid))
+        g = self._gid2elem.get(gid)
         if g is None:
             return
+        self._invalidate_(gid, g)
         # Update cursor arrow polyine's position.
         arrows = g.getElementsByTagName('polyline')
         for svg_arrow in arrows:
@@ -434,9 +465,61 @@ class SvgTable():
     def clear_animates(self):
         """Clear all the animations in this SvgTable.
         """
-        clear_svg_animates(self._svg)
+        for gid in self._animated_gids:
+            g = self._gid2elem.get(gid)
+            if g is not None:
+                self._invalidate_(gid, g)
+                clear_node_animates(g)
+        self._animated_gids.clear()
+
+    def _invalidate_(self, gid, g):
+        """Drop the cached XML string and layout of the element which is going to be changed.
+        """
+        self._fragments.pop(g, None)
+        self._rect_layouts.pop(gid, None)
 
     def _repr_svg_(self):
         """Internal function for jupyter notebook display refresh.
+
+        The XML string of each child node in <svg> is cached until the node changes,
+        so the cost of a frame depends on the number of changed elements.
         """
-        return self._dom.toxml()
+        fragments = self._fragments
+        out = ['<?xml version="1.0" ?><svg']
+        for (name, value) in self._svg.attributes.items():
+            out.append(' {}="{}"'.format(name, escape_xml(value)))
+        out.append('>')
+        for node in self._svg.childNodes:
+            xml = fragments.get(node)
+            if xml is None:
+                xml = node.toxml()
+                fragments[node] = xml
+            out.append(xml)
+        out.append('</svg>')
+        return ''.join(out)
+
+    def _repr_svg_frame_(self):
+        """Snapshot the current frame for Layouter without serializing and parsing the whole SVG.
+
+        The elements which contain animations are copied, others are frozen as their cached XML strings.
+
+        Returns:
+            (int, int, list(SvgElement or SvgRawXml)): The width, height of the svg and the snapshot of it's <g> nodes.
+        """
+        fragments = self._fragments
+        animated = set([self._gid2elem[gid] for gid in self._animated_gids if gid in self._gid2elem])
+        nodes = list()
+        for node in self._svg.childNodes:
+            if node.nodeType != Node.ELEMENT_NODE or node.tagName != 'g':
+                continue
+            if node in animated:
+                nodes.append(import_node(node))
+            else:
+                xml = fragments.get(node)
+                if xml is None:
+                    xml = node.toxml()
+                    fragments[node] = xml
+                nodes.append(SvgRawXml(xml))
+        width = int(self._svg.getAttribute('width')[0:-2])
+        height = int(self._svg.getAttribute('height')[0:-2])
+        return (width, height, nodes)
@@ -10,7 +10,7 @@ License: GPLv3
 
 from algviz.svg_table import SvgTable
 from algviz.cursor import Cursor, _CursorManager
-from algviz.utility import AlgvizParamError, TraceColorStack, clamp
+from algviz.utility import AlgvizParamError, TraceColorArray, clamp
 from algviz.utility import kMinCellWidth, kMaxCellWidth, kMinCellHeight, kMaxCellHeight
 
 
@@ -67,7 +67,7 @@ class Table():
     [WARNING] Don't create this class directly, use algviz.Visualizer.createTable instead.
     """
 
-    def __init__(self, row, col, data, cell_size, show_index):
+    def __init__(self, row, col, data, cell_size, show_index, svg_backend='minidom'):
         """
         Args:
             row (int): The number of rows for this table.
@@ -75,6 +75,7 @@ class Table():
             data (list(list(printable))): The initial data for table cells.
             cell_size tuple(float, float): Table cell size (width, height).
             show_index (bool): Whether to display table row and column labels.
+            svg_backend (str): The SvgTable backend to build SVG, 'minidom' or 'string'.
 
         Raises:
             AlgvizParamError: Table row or col number should > 0.
@@ -85,7 +86,7 @@ class Table():
             raise AlgvizParamError('Table cell_size parameter should be <tuple(float, float)> type.')
         self._row = row
         self._col = col
-        self._cell_tcs = dict()             # Record the trajectory access information (node_index: ColorStack) of all cells.
+        self._cell_colors = TraceColorArray()   # Record the trajectory access information of all cells, indexed by rect gid.
         self._frame_trace_old = list()      # Cache the cell related information that needs to be cleared in the previous frame.
         self._frame_trace = list()          # Record the relevant information of the cell to be refreshed in the next frame.
         self._delay = 0                     # Animation frame delay time, used to adapt Visualizer class.
@@ -98,7 +99,7 @@ class Table():
         self._index2rect = dict()           # Map the row and column index into rectangle's gid in SVG.
         self._items_to_update = dict()      # {key:rect_gid, val:rect_label} Cache all the items in the table to be update since last frame.
         self._data = [[None for _ in range(self._col)] for _ in range(self._row)]
-        self._svg = SvgTable(self._cell_margin, self._cell_margin)
+        self._svg = SvgTable(self._cell_margin, self._cell_margin, svg_backend)
         # Copy data into table.
         if data is not None:
             for r in range(self._row):
@@ -145,7 +146,7 @@ class Table():
         c = self._check_index_type_and_range_(c, self._col)
         if r2 is None or c2 is None:
             gid = self._index2rect[(r, c)]
-            self._cell_tcs[gid].add(color)
+            self._cell_colors.add(gid, color)
             self._frame_trace.append((gid, color, hold))
         else:
             r2 = self._check_index_type_and_range_(r2, self._row)
@@ -153,7 +154,7 @@ class Table():
             for i in range(r, r2 + 1):
                 for j in range(c, c2 + 1):
                     gid = self._index2rect[(i, j)]
-                    self._cell_tcs[gid].add(color)
+                    self._cell_colors.add(gid, color)
                     self._frame_trace.append((gid, color, hold))
 
     def marks(self, color, points, hold=False):
@@ -182,9 +183,8 @@ class Table():
             color ((R,G,B)): R, G, B stand for color channel for red, green, blue.
                 R,G,B should be int value and 0 <= R,G,B <= 255. eg:(0, 255, 0)
         """
-        for gid in self._index2rect.values():
-            if self._cell_tcs[gid].remove(color):
-                self._svg.update_rect_element(gid, fill=self._cell_tcs[gid].color())
+        for gid in self._cell_colors.remove_all(color):
+            self._svg.update_rect_element(gid, fill=self._cell_colors.color(gid))
 
     def removeMarks(self, color_list):
         """Remove the mark colors for cell(s).
@@ -270,7 +270,7 @@ class Table():
                 self._data.pop()
                 for c in range(self._col):
                     self._svg.delete_element(self._index2rect[(r, c)])
-                    self._index2rect.pop((r, c))
+                    self._cell_colors.free(self._index2rect.pop((r, c)))
             if self._show_index:
                 for r in range(row, self._row):
                     self._svg.delete_element(self._row_index2text[r])
@@ -288,7 +288,7 @@ class Table():
                 for c in range(col, self._col):
                     self._data[r].pop()
                     self._svg.delete_element(self._index2rect[(r, c)])
-                    self._index2rect.pop((r, c))
+                    self._cell_colors.free(self._index2rect.pop((r, c)))
             if self._show_index:
                 for c in range(col, self._col):
                     self._svg.delete_element(self._col_index2text[c])
@@ -389,13 +389,27 @@ class Table():
         Returns:
             str: The SVG representation of current table.
         """
+        return self._render_frame_(self._svg._repr_svg_)
+
+    def _repr_svg_frame_(self):
+        """Used by Layouter to take the frame without serializing and parsing the SVG.
+
+        Returns:
+            (int, int, list(SvgElement or SvgRawXml)): The width, height and the <g> nodes of current table.
+        """
+        return self._render_frame_(self._svg._repr_svg_frame_)
+
+    def _render_frame_(self, snapshot):
+        """Update the SVG into a new frame, take it by snapshot and then prepare for the next frame.
+        """
+        frame_marks = set((gid, tuple(color)) for (gid, color, hold) in self._frame_trace)
         for (gid, color) in self._frame_trace_old:
-            if (gid, color, True) not in self._frame_trace and (gid, color, False) not in self._frame_trace:
-                self._cell_tcs[gid].remove(color)
-            self._svg.update_rect_element(gid, fill=self._cell_tcs[gid].color())
+            if (gid, tuple(color)) not in frame_marks:
+                self._cell_colors.remove(gid, color)
+            self._svg.update_rect_element(gid, fill=self._cell_colors.color(gid))
         self._frame_trace_old.clear()
         for (gid, color, hold) in self._frame_trace:
-            self._svg.update_rect_element(gid, fill=self._cell_tcs[gid].color())
+            self._svg.update_rect_element(gid, fill=self._cell_colors.color(gid))
             if not hold:
                 self._frame_trace_old.append((gid, color))
         for gid, label in self._items_to_update.items():
@@ -403,7 +417,7 @@ class Table():
         self._items_to_update.clear()
         self._row_cursor_mgr.refresh_cursors_animation(self._row, (0, self._delay))
         self._col_cursor_mgr.refresh_cursors_animation(self._col, (0, self._delay))
-        res_svg = self._svg._repr_svg_()
+        res_svg = snapshot()
         self._svg.clear_animates()
         self._frame_trace.clear()
         self._row_cursor_mgr.update_cursors_position()
@@ -459,7 +473,7 @@ class Table():
         rect = (rect_pos_x, rect_pos_y, self._cell_width, self._cell_height)
         gid = self._svg.add_rect_element(rect, self._data[r][c], angle=False)
         self._index2rect[(r, c)] = gid
-        self._cell_tcs[gid] = TraceColorStack()
+        self._cell_colors.alloc(gid)
 
     def _new_row_index_text_in_svg_(self, r):
         if not self._show_index:
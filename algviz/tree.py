@@ -20,6 +20,7 @@ class BinaryTreeNode(NodeBase):
         left (BinaryTreeNode): Point to the left subtree node object.
         right (BinaryTreeNode): Point to the right subtree node object.
     """
+    __slots__ = ('left', 'right')
 
     def __init__(self, val, left=None, right=None):
         """
@@ -34,13 +35,6 @@ class BinaryTreeNode(NodeBase):
         super().__setattr__('right', right)
         self._on_update_neighbor_(right)
 
-    def __getattribute__(self, name):
-        if name == 'left' or name == 'right':
-            node = super().__getattribute__(name)
-            return node
-        else:
-            return super().__getattribute__(name)
-
     def __setattr__(self, name, value):
         if name == 'left' or name == 'right':
             super().__setattr__(name, value)
@@ -54,8 +48,8 @@ class BinaryTreeNode(NodeBase):
         Returns:
             list(tuple(BinaryTreeNode, None)): Return left child node and right child node.
         """
-        left_node = super().__getattribute__('left')
-        right_node = super().__getattribute__('right')
+        left_node = self.left
+        right_node = self.right
         # Add edge label if this node just has single child node.
         left_label, right_label = None, None
         if left_node and not right_node:
@@ -134,6 +128,8 @@ class TreeNode(NodeBase):
     Attributes:
         val (printable): The label to be displayed in the binary tree node.
     """
+    __slots__ = ('_children',)
+
     def __init__(self, val):
         """
         Args:
@@ -148,7 +144,7 @@ class TreeNode(NodeBase):
         Returns:
             TreeChildrenIter: Children node iterator.
         """
-        children_ = super().__getattribute__('_children')
+        children_ = self._children
         return TreeChildrenIter(self, tuple(children_))
 
     def childCount(self):
@@ -157,7 +153,7 @@ class TreeNode(NodeBase):
         Returns:
             int: children count.
         """
-        children_ = super().__getattribute__('_children')
+        children_ = self._children
         return len(children_)
 
     def childAt(self, index):
@@ -172,7 +168,7 @@ class TreeNode(NodeBase):
         Raises:
             AlgvizParamError: TreeNode child index type error or out of range.
         """
-        children_ = super().__getattribute__('_children')
+        children_ = self._children
         if type(index) != int or index < 0 or index >= len(children_):
             raise AlgvizParamError('TreeNode child index type error or out of range.')
         return children_[index]
@@ -187,7 +183,7 @@ class TreeNode(NodeBase):
             int: the index position of the child node. If child not found, then return -1.
         """
         res = -1
-        children_ = super().__getattribute__('_children')
+        children_ = self._children
         for i in range(len(children_)):
             if child == children_[i]:
                 res = i
@@ -205,7 +201,7 @@ class TreeNode(NodeBase):
         """
         if (type(index) != int and index is not None) or (type(index) == int and index < 0):
             raise AlgvizParamError('TreeNode child index should be a positive integer!')
-        children_ = super().__getattribute__('_children')
+        children_ = self._children
         for n in children_:
             if child == n:
                 return
@@ -221,7 +217,7 @@ class TreeNode(NodeBase):
         Args:
             child (TreeNode): The child node to be removed.
         """
-        children_ = super().__getattribute__('_children')
+        children_ = self._children
         for i in range(len(children_)):
             if child == children_[i]:
                 children_.pop(i)
@@ -237,14 +233,14 @@ class TreeNode(NodeBase):
         Raises:
             AlgvizParamError: TreeNode child index type error or out of range.
         """
-        children_ = super().__getattribute__('_children')
+        children_ = self._children
         if type(index) != int or index < 0 or index >= len(children_):
             raise AlgvizParamError('TreeNode child index type error or out of range.')
         children_.pop(index)
         self._on_update_neighbor_(None)
 
     def _neighbors_(self):
-        children_ = super().__getattribute__('_children')
+        children_ = self._children
         res = list()
         for child in children_:
             res.append((child, None))
@@ -9,6 +9,10 @@ License: GPLv3
 """
 
 from colorsys import rgb_to_hls
+from collections import OrderedDict
+from array import array
+from itertools import compress
+from threading import Lock
 
 
 _version = '0.3.1'                  # algviz version
@@ -104,6 +108,146 @@ class TraceColorStack():
         return self._colors[-1]
 
 
+class TraceColorArray():
+    """Manage the color stacks of many elements like TraceColorStack, the elements are indexed by non-negative integers.
+
+    Colors are interned into a palette. The top color of each stack is kept in a flat array,
+    and the few colors under it are kept in an overflow dict, so each element only costs a few bytes.
+    """
+
+    def __init__(self, bgcolor=(255, 255, 255)):
+        """
+        Args:
+            bgcolor ((R,G,B)): R, G, B stand for color channel for red, green, blue.
+                R,G,B should be int value and 0 <= R,G,B <= 255. eg:(0, 255, 0)
+        """
+        self._bgcolor = bgcolor
+        self._palette = [None]      # The interned colors, palette index 0 means an empty stack.
+        self._color_ids = dict()    # Map tuple(color) into it's palette index.
+        self._free = 0xFFFF         # The palette index of the elements not allocated.
+        self._tops = array('H')     # The palette index of the top color in each element's stack.
+        self._unders = dict()       # Key: element index; Value: list of the palette index under the top color, bottom first.
+
+    def alloc(self, i):
+        """Allocate an empty color stack for element i.
+
+        Args:
+            i (int): The index of the element.
+        """
+        if i >= len(self._tops):
+            self._tops.extend([self._free] * (i + 1 - len(self._tops)))
+        self._tops[i] = 0
+        self._unders.pop(i, None)
+
+    def free(self, i):
+        """Release the color stack of element i.
+
+        Args:
+            i (int): The index of the element.
+        """
+        if i in self:
+            self._tops[i] = self._free
+            self._unders.pop(i, None)
+
+    def __contains__(self, i):
+        return i < len(self._tops) and self._tops[i] != self._free
+
+    def add(self, i, color):
+        """Add a new color into the color stack of element i.
+
+        Args:
+            i (int): The index of an allocated element.
+            color ((R,G,B)): R, G, B stand for color channel for red, green, blue.
+                R,G,B should be int value and 0 <= R,G,B <= 255. eg:(0, 255, 0)
+        """
+        cid = self._intern_(color)
+        top = self._tops[i]
+        if top == cid:
+            return
+        if top != 0:
+            self._unders.setdefault(i, list()).append(top)
+        self._tops[i] = cid
+
+    def remove(self, i, color):
+        """Remove color from the color stack of element i.
+
+        Args:
+            i (int): The index of the element.
+            color ((R,G,B)): R, G, B stand for color channel for red, green, blue.
+                R,G,B should be int value and 0 <= R,G,B <= 255. eg:(0, 255, 0)
+
+        Returns:
+            bool: Return False if can't color. Return True if successfully deleted color.
+        """
+        cid = self._color_ids.get(tuple(color))
+        if cid is None or i not in self:
+            return False
+        if self._tops[i] != cid and cid not in self._unders.get(i, ()):
+            return False
+        self._remove_(i, cid)
+        return True
+
+    def remove_all(self, color, keep=None):
+        """Remove color from the color stacks of all the elements in one sweep.
+
+        Args:
+            color ((R,G,B)): R, G, B stand for color channel for red, green, blue.
+                R,G,B should be int value and 0 <= R,G,B <= 255. eg:(0, 255, 0)
+            keep (set(int) or None): The elements to keep their color stacks unchanged.
+
+        Returns:
+            list(int): The index of the elements whose color stack changed in ascending order.
+        """
+        cid = self._color_ids.get(tuple(color))
+        if cid is None:
+            return list()
+        changed = set(compress(range(len(self._tops)), map(cid.__eq__, self._tops)))
+        changed.update(i for i, unders in self._unders.items() if cid in unders)
+        if keep:
+            changed.difference_update(keep)
+        for i in changed:
+            self._remove_(i, cid)
+        return sorted(changed)
+
+    def color(self, i):
+        """Get the merged color in the color stack of element i.
+
+        Args:
+            i (int): The index of the element.
+
+        Returns:
+            color ((R,G,B)): R, G, B stand for color channel for red, green, blue.
+        """
+        top = self._tops[i] if i < len(self._tops) else 0
+        if top == 0 or top == self._free:
+            return self._bgcolor
+        return self._palette[top]
+
+    def _remove_(self, i, cid):
+        unders = self._unders.pop(i, None)
+        if unders is not None:
+            unders = [c for c in unders if c != cid]
+        if self._tops[i] == cid:
+            self._tops[i] = unders.pop() if unders else 0
+        if unders:
+            self._unders[i] = unders
+
+    def _intern_(self, color):
+        key = tuple(color)
+        cid = self._color_ids.get(key)
+        if cid is not None:
+            return cid
+        if len(self._palette) == self._free:
+            # Widen the flat array when there are too many colors for it.
+            free = 0xFFFFFFFF
+            self._tops = array('I', (free if c == self._free else c for c in self._tops))
+            self._free = free
+        cid = len(self._palette)
+        self._palette.append(color)
+        self._color_ids[key] = cid
+        return cid
+
+
 class ConsecutiveIdMap():
     """Allocate contiguous integer numbers for hashable objects.
     """
@@ -147,6 +291,69 @@ class ConsecutiveIdMap():
         return self._id2attr[cons_id - self._offset]
 
 
+class LRUCache():
+    """A bounded key-value cache which evicts the least recently used item, it also counts the hits and misses.
+    """
+
+    def __init__(self, maxsize=64):
+        """
+        Args:
+            maxsize (int): The maximum number of items in this cache, cache nothing if maxsize <= 0.
+        """
+        self._maxsize = max(int(maxsize), 0)
+        self._items = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()     # The graph frames may be captured and rendered in different threads.
+
+    def get(self, key):
+        """
+        Args:
+            key (hashable): The key of the cached item.
+
+        Returns:
+            any: The cached value of key, None if key is not in this cache.
+        """
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._items.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key, value):
+        """Add or update an item, evict the least recently used item if the cache is full.
+
+        Args:
+            key (hashable): The key of the item.
+            value (any): The value of the item, should not be None.
+        """
+        if self._maxsize == 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self._maxsize:
+                self._items.popitem(last=False)
+
+    def info(self):
+        """
+        Returns:
+            dict: The hits, misses counters and the current size, maxsize of this cache.
+        """
+        return dict(hits=self._hits, misses=self._misses, size=len(self._items), maxsize=self._maxsize)
+
+    def clear(self):
+        """Remove all the items and reset the counters.
+        """
+        with self._lock:
+            self._items.clear()
+            self._hits = 0
+            self._misses = 0
+
+
 # TODO: Deprecated this function, use a more effective way to find node.
 # Or, just cache the node object directly.
 def find_tag_by_id(node, tag_name, tag_id):
@@ -173,27 +380,35 @@ def clear_svg_animates(svg):
     """
     gg = svg.getElementsByTagName('g')
     for g in gg:
-        texts = g.getElementsByTagName('text')
-        for txt in texts:
-            if txt.getAttribute('class') != 'txt':
+        clear_node_animates(g)
+
+
+def clear_node_animates(g):
+    """Clear the animation effects in one element group of SVG.
+    Args:
+        g (xmldom.Node): The <g> node to be cleared.
+    """
+    texts = g.getElementsByTagName('text')
+    for txt in texts:
+        if txt.getAttribute('class') != 'txt':
+            continue
+        animates = txt.getElementsByTagName('animate')
+        for animate in animates:
+            if animate.getAttribute('attributeName') != 'font-size':
                 continue
-            animates = txt.getElementsByTagName('animate')
-            for animate in animates:
-                if animate.getAttribute('attributeName') != 'font-size':
-                    continue
-                font_size_str = animate.getAttribute('to')
-                if font_size_str == '0':
-                    g.removeChild(txt)
-                    break
-                else:
-                    txt.setAttribute('font-size', font_size_str)
-                    txt.removeChild(animate)
-        animates_appear = g.getElementsByTagName('animate')
-        if len(animates_appear):
-            g.removeAttribute('style')
-        animates_move = g.getElementsByTagName('animateMotion')
-        for animate in animates_appear + animates_move:
-            g.removeChild(animate)
+            font_size_str = animate.getAttribute('to')
+            if font_size_str == '0':
+                g.removeChild(txt)
+                break
+            else:
+                txt.setAttribute('font-size', font_size_str)
+                txt.removeChild(animate)
+    animates_appear = g.getElementsByTagName('animate')
+    if len(animates_appear):
+        g.removeAttribute('style')
+    animates_move = g.getElementsByTagName('animateMotion')
+    for animate in animates_appear + animates_move:
+        g.removeChild(animate)
 
 
 def add_animate_move_into_node(g, animate, move, time, bessel):
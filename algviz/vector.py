@@ -11,7 +11,7 @@ License: GPLv3
 
 from algviz.svg_table import SvgTable
 from algviz.cursor import Cursor, _CursorManager
-from algviz.utility import TraceColorStack, AlgvizParamError, clamp
+from algviz.utility import TraceColorArray, AlgvizParamError, clamp
 from algviz.utility import kMinAnimDelay, kMaxAnimDelay, kMinCellWidth
 from algviz.utility import kMaxCellWidth, kMaxBarHight, kMinCellHeight, kMaxCellHeight
 
@@ -24,7 +24,7 @@ class Vector():
     [WARNING] Don't create this class directly, use algviz.Visualizer.createTable instead.
     """
 
-    def __init__(self, data, delay, cell_size, histogram, show_index):
+    def __init__(self, data, delay, cell_size, histogram, show_index, svg_backend='minidom'):
         """
         Args:
             data (list(printable)): The initialize data for vector.
@@ -32,6 +32,7 @@ class Vector():
             cell_size tuple(float, float): Vector cell size (width, height).
             histogram (bool): Display the data in the form of a histogram or not.
             show_index (bool): Whether to display the vector index label.
+            svg_backend (str): The SvgTable backend to build SVG, 'minidom' or 'string'.
         """
         if type(cell_size) != tuple or len(cell_size) < 2:
             raise AlgvizParamError('Vector cell_size parameter should be <tuple(float, float)> type.')
@@ -48,7 +49,7 @@ class Vector():
         self._show_histogram = histogram
         self._show_index = show_index   # Whether to display the vector index label.
         self._cell_margin = 3           # Margin between two adjacent cells.
-        self._cell_tcs = dict()         # Record the trajectory access information (node_index: ColorStack) of all cells.
+        self._cell_colors = TraceColorArray()   # Record the trajectory access information of all cells, indexed by rect gid.
         self._frame_trace_old = list()  # Cache the cell related information that needs to be cleared in the previous frame.
         self._frame_trace = list()      # Record the relevant information of the cell to be refreshed in the next frame.
         self._rect_move = dict()        # Record the index of moving cells and it's relative moving distance in the next frame.
@@ -59,7 +60,7 @@ class Vector():
         self._label_font_size = int(min(12, self._cell_width * 0.5))   # The font size of the vector's subscript index.
         self._next_iter = 0             # Mark the positon of current iteration.
         self._items_to_update = dict()  # {key:rect_gid, val:rect_label} Cache all the items in the table to be update since last frame.
-        self._svg = SvgTable(self._cell_margin, self._cell_margin)
+        self._svg = SvgTable(self._cell_margin, self._cell_margin, svg_backend)
         # Initial cursor manager.
         self._cursor_manager = _CursorManager((self._cell_width, self._cell_width), self._svg, 'D',
                                               (self._cell_margin, self._cell_margin), self._cell_margin)
@@ -69,7 +70,7 @@ class Vector():
             rect_pos_y = self._cell_margin + self._cursor_manager.get_cursors_occupy()
             rect = (rect_pos_x, rect_pos_y, self._cell_width, self._cell_height)
             rid = self._svg.add_rect_element(rect, text=self._data[i])
-            self._cell_tcs[rid] = TraceColorStack()
+            self._cell_colors.alloc(rid)
             self._index2rect[i] = rid
         # Update SVG and rects size.
         self._update_svg_size_(len(self._data))
@@ -111,7 +112,7 @@ class Vector():
             else:
                 self._rect_move[rrid] = 1
         self._index2rect[index] = rid
-        self._cell_tcs[rid] = TraceColorStack()
+        self._cell_colors.alloc(rid)
         self._rect_appear.append(rid)
         self._data.insert(index, val)
 
@@ -127,7 +128,7 @@ class Vector():
         rect = (rect_pos_x, rect_pos_y, self._cell_width, self._cell_height)
         rid = self._svg.add_rect_element(rect, text=val)
         self._index2rect[index] = rid
-        self._cell_tcs[rid] = TraceColorStack()
+        self._cell_colors.alloc(rid)
         self._rect_appear.append(rid)
         self._data.append(val)
 
@@ -216,7 +217,7 @@ class Vector():
             if i < 0 or i >= len(self._data):
                 i %= len(self._data)
             rid = self._index2rect[i]
-            self._cell_tcs[rid].add(color)
+            self._cell_colors.add(rid, color)
             self._frame_trace.append((rid, color, hold))
 
     def marks(self, color, ranges, hold=False):
@@ -241,9 +242,9 @@ class Vector():
             color ((R,G,B)): R, G, B stand for color channel for red, green, blue.
                 R,G,B should be int value and 0 <= R,G,B <= 255. eg:(0, 255, 0)
         """
-        for rid in self._index2rect.values():
-            if self._cell_tcs[rid].remove(color):
-                self._svg.update_rect_element(rid, fill=self._cell_tcs[rid].color())
+        keep = set(self._rect_disappear)    # The disappearing cells are not in the vector.
+        for rid in self._cell_colors.remove_all(color, keep):
+            self._svg.update_rect_element(rid, fill=self._cell_colors.color(rid))
 
     def removeMarks(self, color_list):
         """Remove the mark colors for cell(s).
@@ -350,18 +351,32 @@ class Vector():
         Returns:
             str: The SVG representation of current Vector.
         """
+        return self._render_frame_(self._svg._repr_svg_)
+
+    def _repr_svg_frame_(self):
+        """Used by Layouter to take the frame without serializing and parsing the SVG.
+
+        Returns:
+            (int, int, list(SvgElement or SvgRawXml)): The width, height and the <g> nodes of current Vector.
+        """
+        return self._render_frame_(self._svg._repr_svg_frame_)
+
+    def _render_frame_(self, snapshot):
+        """Update the SVG into a new frame, take it by snapshot and then prepare for the next frame.
+        """
         # Update the color of the cell tracker.
         all_data_num = len(self._data) + len(self._rect_disappear)
         self._update_svg_size_(all_data_num)
+        frame_marks = set((rid, tuple(color)) for (rid, color, hold) in self._frame_trace)
         for (rid, color) in self._frame_trace_old:
-            if rid not in self._cell_tcs.keys():
+            if rid not in self._cell_colors:
                 continue
-            if (rid, color, False) not in self._frame_trace and (rid, color, True) not in self._frame_trace:
-                self._cell_tcs[rid].remove(color)
-            self._svg.update_rect_element(rid, fill=self._cell_tcs[rid].color())
+            if (rid, tuple(color)) not in frame_marks:
+                self._cell_colors.remove(rid, color)
+            self._svg.update_rect_element(rid, fill=self._cell_colors.color(rid))
         self._frame_trace_old.clear()
         for (rid, color, hold) in self._frame_trace:
-            self._svg.update_rect_element(rid, fill=self._cell_tcs[rid].color())
+            self._svg.update_rect_element(rid, fill=self._cell_colors.color(rid))
             if not hold:
                 self._frame_trace_old.append((rid, color))
         for gid, label in self._items_to_update.items():
@@ -398,7 +413,7 @@ class Vector():
                 self._create_new_subscripts_(len(self._index2text), len(self._data))
         self._rect_move.clear()
         self._cursor_manager.refresh_cursors_animation(all_data_num, (0, self._delay))
-        res = self._svg._repr_svg_()
+        res = snapshot()
         # Clear the animation effect, update the SVG content, and prepare for the next frame.
         self._svg.clear_animates()
         if self._show_histogram > 0:
@@ -412,7 +427,7 @@ class Vector():
                 self._svg.update_rect_element(rid, rect=rect)
         for rid in self._rect_disappear:
             self._svg.delete_element(rid)
-            self._cell_tcs.pop(rid)
+            self._cell_colors.free(rid)
         self._rect_disappear.clear()
         for rid in self._rect_appear:
             self._svg.update_rect_element(rid, opacity=True)
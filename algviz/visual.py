@@ -9,18 +9,21 @@ License: GPLv3
 """
 
 from weakref import WeakKeyDictionary
+from contextlib import ExitStack
 from time import sleep
-from IPython import display
+from queue import Queue
+from threading import Thread
 
 from algviz.table import Table
 from algviz.vector import Vector
 from algviz.svg_graph import SvgGraph
-from algviz.svg_table import SvgTable
+from algviz.svg_table import SvgTable, SVG_BACKENDS
 from algviz.logger import Logger
 from algviz.cursor import Cursor, _CursorRange
 from algviz.map import Map
 from algviz.utility import AlgvizParamError, AlgvizTypeError, AlgvizRuntimeError, kMaxNameChars
 from algviz.layouter import Layouter, is_layout_supported
+from algviz.layout_worker import LayoutWorkerPool
 
 
 class _NoDisplay():
@@ -38,19 +41,142 @@ class _NameDisplay():
         return self._name
 
 
+class _SvgSnapshot():
+    """The SVG of a display object taken at one frame, it's displayed later by the render thread.
+    """
+
+    def __init__(self, svg):
+        self._svg = svg
+
+    def _repr_svg_(self):
+        return self._svg
+
+
+class _GraphSnapshot():
+    """The frame of a graph or map captured at one frame, it's layouted and rendered later by the render thread.
+    """
+
+    def __init__(self, graph, frame):
+        self._graph = graph
+        self._frame = frame
+
+    def _repr_svg_(self):
+        return self._graph._render_svg_frame_(self._frame)
+
+
+def _render_loop_(frames, errors):
+    """Display the frames in the queue one by one and wait for the delay time of each frame.
+
+    Args:
+        frames (Queue): The (list((str, object, str)), float) display operations and wait time of each frame.
+            The loop stops when getting None.
+        errors (list(Exception)): Record the error raised when displaying frames, the later frames are discarded.
+    """
+    while True:
+        frame = frames.get()
+        try:
+            if frame is None:
+                return
+            (ops, wait_time) = frame
+            if len(errors) == 0:
+                display = _ipython_display_()
+                for (method, content, did) in ops:
+                    getattr(display, method)(content, display_id=did)
+                sleep(wait_time)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            frames.task_done()
+
+
+class _RenderThread():
+    """A background thread to display the frames and wait between them, so the algorithm keeps running.
+    """
+
+    def __init__(self, queue_size):
+        """
+        Args:
+            queue_size (int): The maximum number of frames waiting to be displayed.
+        """
+        self._frames = Queue(max(int(queue_size), 1))
+        self._errors = list()
+        self._thread = Thread(target=_render_loop_, args=(self._frames, self._errors), daemon=True)
+        self._thread.start()
+
+    def put(self, ops, wait_time):
+        """Add a frame into the queue, block until there is a free slot if the render thread falls behind.
+
+        Raises:
+            AlgvizRuntimeError: Failed to display the frames.
+        """
+        self._check_errors_()
+        self._frames.put((ops, wait_time))
+
+    def join(self):
+        """Block until all the frames in the queue are displayed.
+
+        Raises:
+            AlgvizRuntimeError: Failed to display the frames.
+        """
+        self._frames.join()
+        self._check_errors_()
+
+    def close(self):
+        self._frames.put(None)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _check_errors_(self):
+        if len(self._errors) > 0:
+            raise AlgvizRuntimeError('Failed to display the frames: {}'.format(self._errors[0]))
+
+
 _next_display_id = 0
 _next_visualizer_id = 0
 
 
+def _ipython_display_():
+    """Import IPython.display when it's needed, so the headless mode can run without IPython.
+    """
+    from IPython import display
+    return display
+
+
 class Visualizer():
 
-    def __init__(self, delay=2.0, wait=0.5, layout=False):
+    def __init__(self, delay=2.0, wait=0.5, layout=False, layout_workers=1, svg_backend='minidom', headless=False,
+                 share_defs=True, delta_frames=False, render_queue=0, export_workers=0):
         """
         Args:
             delay (float): Animation delay time (in seconds).
             wait (True/float/int): (True) wait for the key input to continue execute the code.
                                    (float/int) the wait time before start the next frame of animation.
             layout (boolean): wheather to layout different display objects or not.
+            layout_workers (int): The maximum number of graphviz `dot` processes shared by all the graphs.
+                It's ignored if pygraphviz is installed, the graphs are laid out in process one by one.
+            svg_backend (str): How vectors and tables build their SVG.
+                'minidom': use xml.dom.minidom; 'string': use lightweight element records and string templates.
+            headless (boolean): Record the frames into the layouter without sleeping or requiring IPython,
+                then call the `export` interface to save the animation. The wait parameter is ignored.
+            share_defs (boolean): Share the repeated static elements between the frames of the layouted animation by <defs>
+                and <use>, disable it if the SVG consumer doesn't support <use>.
+            delta_frames (boolean): Export each unchanged element of the layouted animation once and show it by <set>
+                timelines, instead of a full snapshot for each frame. The export size scales with the changes.
+            render_queue (int): The maximum number of frames waiting to be displayed by a background render thread.
+                The SVG of the vectors, tables and loggers are taken when calling `display`, the graphs and maps only capture
+                their frames, then the render thread layouts and renders the graphs, displays the frames and waits for the
+                delay time, so the algorithm keeps running. `display` blocks if the queue is full.
+                0 to display and wait in the calling thread. It's ignored if wait is True or the frames are layouted.
+            export_workers (int): The number of processes to layout the graph frames when exporting the layouted animation.
+                The graph frames are captured when calling `display`, and layouted by graphviz in parallel before export.
+                0 to layout each graph frame when it's displayed.
+
+        Raises:
+            AlgvizParamError: Unsupported svg_backend xxx.
         """
         global _next_visualizer_id
         self._vid = _next_visualizer_id  # One notebook may contain multply visualizers, use vid to identify them.
@@ -74,11 +200,28 @@ class Visualizer():
         self._displayid2name = dict()
         # The next unique cursor id created by this visualizer.
         self._next_cursor_id = -1
+        # The SVG backend used by all the vectors and tables in this visualizer.
+        if svg_backend not in SVG_BACKENDS:
+            raise AlgvizParamError('Unsupported svg_backend {}, should be one of {}.'.format(svg_backend, SVG_BACKENDS))
+        self._svg_backend = svg_backend
+        # The graphviz layout workers reused by all the graphs and maps in this visualizer.
+        self._layout_pool = LayoutWorkerPool(layout_workers)
         # Init display engine.
-        if layout is True and is_layout_supported():
-            self._layouter = Layouter(self._vid)
+        self._headless = headless
+        if headless:
+            self._wait = 0
+            self._layouter = Layouter(self._vid, share_defs, delta_frames, export_workers)
+        elif layout is True and is_layout_supported():
+            self._layouter = Layouter(self._vid, share_defs, delta_frames, export_workers)
         else:
             self._layouter = None
+        # The background render thread and the display operations of the current frame.
+        self._renderer = None
+        if render_queue > 0 and self._layouter is None and self._wait is not True:
+            self._renderer = _RenderThread(render_queue)
+        self._frame_ops = list()
+        # Capture the graph frames and layout them in parallel when exporting.
+        self._deferred_graphs = self._layouter is not None and export_workers > 0
 
     def display(self, delay=None):
         """Refresh all created display objects.
@@ -113,15 +256,19 @@ class Visualizer():
                     self._displayed.remove(did)
             if self._layouter is not None:
                 self._layouter.next_frame(delay + self._wait)
+            elif self._renderer is not None:
+                (ops, self._frame_ops) = (self._frame_ops, list())
+                self._renderer.put(ops, delay + self._wait)
             else:
                 sleep(delay + self._wait)
             return None
         elif self._wait is True and self._layouter is None:
+            display = _ipython_display_()
             display.clear_output(wait=True)
             for elem in self._element2display.keyrefs():
                 did = self._element2display[elem()]
                 if did in self._displayid2name:
-                    svg_title = SvgTable(400, 17)
+                    svg_title = SvgTable(400, 17, self._svg_backend)
                     title_name = '{}:'.format(self._displayid2name[did])
                     svg_title.add_text_element((4, 14), title_name, font_size=14, fill=(0, 0, 0))
                     display.display(svg_title, display_id='algviz_{}'.format(did))
@@ -145,7 +292,7 @@ class Visualizer():
             Table: New created Table object.
         """
         global _next_display_id
-        tab = Table(row, col, data, cell_size, show_index)
+        tab = Table(row, col, data, cell_size, show_index, self._svg_backend)
         self._element2display[tab] = _next_display_id
         if name is not None:
             self._displayid2name[_next_display_id] = name
@@ -165,25 +312,31 @@ class Visualizer():
             Vector: New created Vector object.
         """
         global _next_display_id
-        vec = Vector(data, self._delay, cell_size, histogram, show_index)
+        vec = Vector(data, self._delay, cell_size, histogram, show_index, self._svg_backend)
         self._element2display[vec] = _next_display_id
         if name is not None:
             self._displayid2name[_next_display_id] = name
         _next_display_id += 1
         return vec
 
-    def createGraph(self, data=None, name=None, directed=True):
+    def createGraph(self, data=None, name=None, directed=True, layout_engine='auto'):
         """
         Args:
             data (iterable): The root node(s) to initialize the topology graph.
             name (str): The name of this Vector object.
             directed (bool): Should this graph be directed graph or undirected.
+            layout_engine (str): 'auto': layout trees and linked lists by the builtin layout engines, other graphs by graphviz.
+                'graphviz': layout all kinds of graphs by graphviz.
 
         Returns:
             SvgGraph: Created SvgGraph object.
+
+        Raises:
+            AlgvizParamError: Unsupported layout_engine xxx.
         """
         global _next_display_id
-        gra = SvgGraph(data, directed, self._delay)
+        gra = SvgGraph(data, directed, self._delay, self._layout_pool, layout_engine=layout_engine,
+                       deferred=self._deferred_graphs)
         self._element2display[gra] = _next_display_id
         if name is not None:
             self._displayid2name[_next_display_id] = name
@@ -200,7 +353,7 @@ class Visualizer():
             Map: Created Map object.
         """
         global _next_display_id
-        map = Map(data, self._delay)
+        map = Map(data, self._delay, self._layout_pool)
         self._element2display[map] = _next_display_id
         if name is not None:
             self._displayid2name[_next_display_id] = name
@@ -288,17 +441,108 @@ class Visualizer():
             return
         global _next_display_id
         self._layouter._max_width = max_width
-        display.display(self._layouter, display_id='algviz_{}'.format(_next_display_id))
+        _ipython_display_().display(self._layouter, display_id='algviz_{}'.format(_next_display_id))
         _next_display_id += 1
 
-    def _display(self, content, did):
+    def export(self, file, max_width=800):
+        """Export all the recorded frames as one animated SVG.
+
+        The frames are written into file one by one without building the whole SVG string in memory,
+        and they are released after exported, so the animation can only be exported once.
+
+        Args:
+            file (str or file object): The path of the SVG file, or a writable text file object.
+            max_width (int): The maximum strip width limit to layouter.
+
+        Raises:
+            AlgvizRuntimeError: Export requires layout or headless mode.
+            AlgvizRuntimeError: Failed to layout the animation frames.
+            AlgvizRuntimeError: The frames have been exported.
+        """
         if self._layouter is None:
-            display.display(content, display_id=did)
+            raise AlgvizRuntimeError('Export requires layout or headless mode.')
+        if hasattr(file, 'write'):
+            self._export_to_(file, max_width)
         else:
-            self._layouter.display(content, display_id=did)
+            with open(file, 'w', encoding='utf-8') as f:
+                self._export_to_(f, max_width)
 
-    def _update_display(self, content, did):
+    def exportRanges(self, files, frame_ranges, max_width=800):
+        """Export several ranges of the recorded frames, each range as one animated SVG.
+
+        The layouts of all the ranges are solved in one batch, the ranges with the same display sizes share one layout.
+        The ranges may overlap, and the frames can only be exported once like `export`.
+
+        Args:
+            files (list(str or file object)): The path of the SVG file, or a writable text file object for each range.
+            frame_ranges (list((int, int))): The (start_frame, end_frame) of each range, end_frame is not included.
+                Export until the last frame if end_frame is None.
+            max_width (int): The maximum strip width limit to layouter.
+
+        Raises:
+            AlgvizParamError: The number of files should be the same as frame ranges.
+            AlgvizParamError: Invalid frame range xxx.
+            AlgvizRuntimeError: Export requires layout or headless mode.
+            AlgvizRuntimeError: Failed to layout the animation frames.
+            AlgvizRuntimeError: The frames have been exported.
+        """
         if self._layouter is None:
-            display.update_display(content, display_id=did)
+            raise AlgvizRuntimeError('Export requires layout or headless mode.')
+        if len(files) != len(frame_ranges):
+            raise AlgvizParamError('The number of files should be the same as frame ranges.')
+        frame_count = self._layouter.frame_count()
+        for (start_frame, end_frame) in frame_ranges:
+            if end_frame is None:
+                end_frame = frame_count
+            if start_frame < 0 or start_frame >= end_frame or end_frame > frame_count:
+                raise AlgvizParamError('Invalid frame range {}.'.format((start_frame, end_frame)))
+        with ExitStack() as stack:
+            outs = list()
+            for file in files:
+                if hasattr(file, 'write'):
+                    outs.append(file)
+                else:
+                    outs.append(stack.enter_context(open(file, 'w', encoding='utf-8')))
+            if not self._layouter.export_ranges_to(outs, max_width, frame_ranges):
+                raise AlgvizRuntimeError('Failed to layout the animation frames.')
+
+    def _export_to_(self, file, max_width):
+        if self._layouter._svg_str is not None:     # The animation is already displayed by layout.
+            file.write(self._layouter._svg_str)
+        elif not self._layouter.export_to(file, max_width, 0, None):
+            raise AlgvizRuntimeError('Failed to layout the animation frames.')
+
+    def flush(self):
+        """Block until all the frames are displayed by the render thread.
+
+        Raises:
+            AlgvizRuntimeError: Failed to display the frames.
+        """
+        if self._renderer is not None:
+            self._renderer.join()
+
+    def _display(self, content, did):
+        if self._layouter is not None:
+            self._layouter.display(content, display_id=did)
+        elif self._renderer is not None:
+            self._frame_ops.append(('display', self._snapshot_(content), did))
         else:
+            _ipython_display_().display(content, display_id=did)
+
+    def _update_display(self, content, did):
+        if self._layouter is not None:
             self._layouter.update_display(content, display_id=did)
+        elif self._renderer is not None:
+            self._frame_ops.append(('update_display', self._snapshot_(content), did))
+        else:
+            _ipython_display_().update_display(content, display_id=did)
+
+    def _snapshot_(self, content):
+        """Take the SVG of the display object, the names and empty contents don't change after displayed.
+        The graphs and maps capture their frames here, and layout and render them in the render thread.
+        """
+        if isinstance(content, _NameDisplay) or isinstance(content, _NoDisplay):
+            return content
+        if hasattr(content, '_capture_frame_'):
+            return _GraphSnapshot(content, content._capture_frame_())
+        return _SvgSnapshot(content._repr_svg_())
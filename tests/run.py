@@ -26,8 +26,14 @@ def main():
     nb_failed += run_test_module(test_graph)
     import test_map
     nb_failed += run_test_module(test_map)
+    import test_layout_worker
+    nb_failed += run_test_module(test_layout_worker)
+    import test_layouter
+    nb_failed += run_test_module(test_layouter)
     import test_regression
     nb_failed += run_test_module(test_regression)
+    import test_import
+    nb_failed += run_test_module(test_import)
     print("*" * 45)
     if nb_failed == 0:
         print('Congratulations, everything is OK !!!')
@@ -6,7 +6,10 @@
 '''
 
 
+import random
+
 import algviz
+import algviz.svg_graph
 from algviz.graph import parseGraph, generateRandomGraph, AlgvizRuntimeError
 from result import TestResult
 from utility import equal, equal_table, get_graph_elements, hack_graph
@@ -25,6 +28,7 @@ def test_create_graph():
     ]
     graph_nodes = algviz.parseGraph(nodes, edges, {7: 'node_7'})
     graph = viz.createGraph(graph_nodes)
+    directed_graph = graph
     hack_graph(graph)
     svg_nodes, svg_edges = get_graph_elements(graph._repr_svg_())
     expect_nodes = [0, 1, 2, 3, 4, 5, 6, 'node_7']
@@ -43,6 +47,9 @@ def test_create_graph():
     svg_nodes, svg_edges = get_graph_elements(graph._repr_svg_())
     res.add_case(equal(expect_nodes, svg_nodes) and equal_table(edges, svg_edges), 'Create undirected graph',
                  'nodes:{};edges:{}'.format(svg_nodes, svg_edges), 'nodes:{};edges:{}'.format(expect_nodes, edges))
+    # Test the graphs in one visualizer share the same layout workers.
+    pools = [directed_graph._layout_pool, graph._layout_pool, viz.createMap()._graph._layout_pool]
+    res.add_case(all(pool is viz._layout_pool for pool in pools), 'Share layout workers', pools, viz._layout_pool)
     return res
 
 
@@ -215,6 +222,148 @@ def test_modify_undirected_graph():
     return res
 
 
+def test_remove_node():
+    res = TestResult()
+    viz = algviz.Visualizer()
+    graph_nodes = parseGraph([0, 1, 2, 3], [[0, 1, None], [1, 2, None], [3, 2, None]])
+    graph = viz.createGraph([graph_nodes[0], graph_nodes[3]])
+    hack_graph(graph)
+    # The removed nodes have input edges from the remaining nodes.
+    removed = [graph.removeNode(graph_nodes[1], True), graph.removeNode(graph_nodes[2])]
+    res.add_case(removed == [0, 0], 'Input edges', removed, [0, 0])
+    res.add_case(graph in graph_nodes[2].bind_graphs(), 'Keep binding')
+    # The input edges are removed.
+    graph_nodes[3].remove(graph_nodes[2])
+    removed = [graph.removeNode(graph_nodes[1], True), graph.removeNode(graph_nodes[0], True)]
+    res.add_case(removed == [0, 3], 'Remove subgraph', removed, [0, 3])
+    graph._repr_svg_()  # Skip the animation frame.
+    nodes, edges = get_graph_elements(graph._repr_svg_())
+    res.add_case(equal([3], nodes) and len(edges) == 0, 'Remaining nodes', nodes, [3])
+    # The removed nodes can be added again by a new edge.
+    graph_nodes[3].add(graph_nodes[1])
+    removed = graph.removeNode(graph_nodes[2])
+    res.add_case(removed == 0, 'Add removed nodes', removed, 0)
+    graph._repr_svg_()  # Skip the animation frame.
+    nodes, edges = get_graph_elements(graph._repr_svg_())
+    res.add_case(equal([1, 2, 3], nodes) and equal_table([[1, 2, None], [3, 1, None]], edges), 'Added nodes',
+                 'nodes:{};edges:{}'.format(nodes, edges), 'nodes:[1, 2, 3];edges:[[1, 2, None], [3, 1, None]]')
+    return res
+
+
+def test_incremental_traverse():
+    res = TestResult()
+    rand = random.Random(0)
+    edges = [[i, rand.randrange(12), rand.choice([None, 'e'])] for i in range(12) for k in range(2)]
+    graph_nodes = parseGraph(list(range(12)), edges)
+    viz = algviz.Visualizer()
+    # The same nodes are bound to both graphs, one of them always traverses the whole graph.
+    graphs = [viz.createGraph(graph_nodes[0]), viz.createGraph(graph_nodes[0])]
+    rates = [algviz.svg_graph.SVG_GRAPH_FULL_TRAVERSE_RATE, 0]
+    case_ok = True
+    try:
+        for step in range(60):
+            (node1, node2) = (graph_nodes[rand.randrange(12)], graph_nodes[rand.randrange(12)])
+            op = rand.randrange(5)
+            if op == 0:
+                node1.add(node2, rand.choice([None, 'e']))
+            elif op == 1:
+                node1.remove(node2)
+            elif op == 2:
+                algviz.updateGraphEdge(node1, node2, step)
+            elif op == 3:
+                for graph in graphs:
+                    graph.removeNode(node1, True)
+            else:
+                for graph in graphs:
+                    graph.addNode(node1)
+            results = list()
+            for i in range(len(graphs)):
+                algviz.svg_graph.SVG_GRAPH_FULL_TRAVERSE_RATE = rates[i]
+                graphs[i]._traverse_graph_()
+                results.append((graphs[i]._node_seq, list(graphs[i]._edge_label.items()), graphs[i]._node_appear,
+                                graphs[i]._node_disappear, graphs[i]._edge_appear, graphs[i]._edge_disappear))
+            if results[0] != results[1]:
+                case_ok = False
+    finally:
+        algviz.svg_graph.SVG_GRAPH_FULL_TRAVERSE_RATE = rates[0]
+    res.add_case(case_ok, 'Incremental traverse')
+    return res
+
+
+def test_svg_layout():
+    res = TestResult()
+    viz = algviz.Visualizer()
+    graph_nodes = parseGraph([0, 1, 2, 3], [[0, 1, None], [0, 2, 'e0_2'], [2, 3, None]])
+    graph = viz.createGraph(graph_nodes)
+    hack_graph(graph)
+    graph._repr_svg_()
+    graph_nodes[3].add(graph_nodes[1])
+    graph._repr_svg_()
+    # Test the parsed layout record the same nodes and edges as searching the SVG.
+    svg_layout = graph._svg_layout
+    nodes, edges = dict(), dict()
+    for g in graph._svg.getElementsByTagName('g'):
+        if g.getAttribute('class') == 'node':
+            ellipse = g.getElementsByTagName('ellipse')[0]
+            nodes[int(g.getAttribute('id')[4:])] = (g, float(ellipse.getAttribute('cx')) + svg_layout.delt_x,
+                                                    float(ellipse.getAttribute('cy')) + svg_layout.delt_y)
+        elif g.getAttribute('class') == 'edge':
+            edges[int(g.getAttribute('id')[4:])] = g
+    res.add_case(svg_layout.nodes == nodes and len(nodes) == 4, 'Layout nodes', len(svg_layout.nodes), len(nodes))
+    res.add_case(svg_layout.edges == edges and len(edges) == 4, 'Layout edges', len(svg_layout.edges), len(edges))
+    # Test mark node by the layout record.
+    graph.markNode((255, 0, 0), graph_nodes[3], True)
+    graph._repr_svg_()
+    node_id = graph._node_idmap.toConsecutiveId(graph_nodes[3])
+    ellipse = graph._svg_layout.find_node(node_id).getElementsByTagName('ellipse')[0]
+    res.add_case(ellipse.getAttribute('fill') == '#ff0000', 'Layout mark node', ellipse.getAttribute('fill'), '#ff0000')
+    return res
+
+
+def test_mark_colors():
+    res = TestResult()
+    viz = algviz.Visualizer()
+    graph_nodes = parseGraph([0, 1, 2, 3], [[0, 1, None], [0, 2, None], [2, 3, None], [3, 1, None]])
+    graph = viz.createGraph(graph_nodes)
+    hack_graph(graph)
+    graph._repr_svg_()
+
+    def node_fills():
+        fills = list()
+        for node in graph_nodes.values():
+            svg_node = graph._svg_layout.find_node(graph._node_idmap.toConsecutiveId(node))
+            fills.append(svg_node.getElementsByTagName('ellipse')[0].getAttribute('fill'))
+        return fills
+
+    def edge_strokes():
+        strokes = list()
+        for edge in [(0, 1), (0, 2), (2, 3), (3, 1)]:
+            edge_key = (graph_nodes[edge[0]], graph_nodes[edge[1]])
+            svg_edge = graph._svg_layout.find_edge(graph._edge_idmap.toConsecutiveId(edge_key))
+            strokes.append(svg_edge.getElementsByTagName('path')[0].getAttribute('stroke'))
+        return strokes
+    # Test mark nodes and edges with different colors in one call.
+    red, green = (255, 0, 0), (0, 255, 0)
+    graph.markNodeColors([(graph_nodes[0], red), (graph_nodes[1], green), (graph_nodes[3], red)], True)
+    graph.markEdgeColors([((graph_nodes[0], graph_nodes[2]), green), ((graph_nodes[3], graph_nodes[1]), red)], True)
+    graph._repr_svg_()
+    expect = ['#ff0000', '#00ff00', '#ffffff', '#ff0000']
+    res.add_case(equal(expect, node_fills()), 'Mark node colors', node_fills(), expect)
+    expect = ['#7b7b7b', '#00ff00', '#7b7b7b', '#ff0000']
+    res.add_case(equal(expect, edge_strokes()), 'Mark edge colors', edge_strokes(), expect)
+    # Test remove mark only touch the members of the color.
+    graph.removeMark(red)
+    res.add_case(set(graph._mark_colors.keys()) == {(False, graph_nodes[0]), (False, graph_nodes[3]),
+                                                    (True, (graph_nodes[3], graph_nodes[1]))}, 'Remove mark members')
+    graph._repr_svg_()
+    expect = ['#ffffff', '#00ff00', '#ffffff', '#ffffff']
+    res.add_case(equal(expect, node_fills()), 'Remove mark node colors', node_fills(), expect)
+    expect = ['#7b7b7b', '#00ff00', '#7b7b7b', '#7b7b7b']
+    res.add_case(equal(expect, edge_strokes()), 'Remove mark edge colors', edge_strokes(), expect)
+    res.add_case(red not in graph._node_color_members and red not in graph._edge_color_members, 'Remove color members')
+    return res
+
+
 def test_generate_random_graph():
     res = TestResult()
     # Test generate an undirected graph.
@@ -244,3 +393,25 @@ def test_generate_random_graph():
         print('test_generate_random_directed_graph exception:', e)
         res.add_case(False, 'Generate directed graph')
     return res
+
+
+def test_layout_cache():
+    res = TestResult()
+    viz = algviz.Visualizer()
+    graph_nodes = algviz.parseGraph([0, 1, 2], [[0, 1, None], [0, 2, 'e0_2'], [2, 1, None]])
+    graph = viz.createGraph(graph_nodes)
+    hack_graph(graph)
+    graph._repr_svg_()
+    # Test only mark nodes and edges reuse the cached layout.
+    misses = graph.layoutCacheInfo()['misses']
+    graph.markNode((255, 0, 0), graph_nodes[0])
+    graph.markEdge((0, 255, 0), graph_nodes[0], graph_nodes[2])
+    graph._repr_svg_()
+    info = graph.layoutCacheInfo()
+    res.add_case(info['misses'] == misses and info['hits'] > 0, 'Hit layout cache', info)
+    # Test update node label miss the cache and relayout the graph.
+    graph_nodes[1].val = 'new'
+    nodes, _ = get_graph_elements(graph._repr_svg_())
+    info = graph.layoutCacheInfo()
+    res.add_case(info['misses'] == misses + 1 and equal([0, 2, 'new'], nodes), 'Miss layout cache', info)
+    return res
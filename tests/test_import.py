@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+'''
+@author: zjl9959@gmail.com
+@license: GPLv3
+'''
+
+import os
+import subprocess
+import sys
+
+from result import TestResult
+import algviz
+
+
+IMPORT_TIME_BUDGET = 100000     # The maximum microseconds to import algviz.
+HEAVY_MODULES = ['IPython', 'graphviz', 'xml.sax.saxutils', 'concurrent.futures', 'algviz.visual']
+
+
+def run_python(code):
+    '''
+    @function: Run the code in a new python process with `-X importtime`, import the same algviz as the tests.
+    @param: {code->str} The python code to run.
+    @return: {(str, str)} The stdout and stderr of the process.
+    '''
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(algviz.__file__)))
+    env['PYTHONPATH'] = root + os.pathsep + env.get('PYTHONPATH', '')
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    return (proc.stdout, proc.stderr)
+
+
+def test_import_time():
+    res = TestResult()
+    code = 'import sys, algviz\nprint(",".join([m for m in {} if m in sys.modules]))'.format(HEAVY_MODULES)
+    (out, err) = run_python(code)
+    res.add_case(out.strip() == '', 'Heavy modules', out.strip(), '')
+    import_time = None
+    for line in err.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == 'algviz':
+            import_time = int(fields[1])
+    res.add_case(import_time is not None and import_time < IMPORT_TIME_BUDGET, 'Import time', import_time, IMPORT_TIME_BUDGET)
+    # The Visualizer is imported on first use.
+    (out, err) = run_python('from algviz import *\nprint(Visualizer.__name__)')
+    res.add_case(out.strip() == 'Visualizer', 'Lazy Visualizer', out.strip(), 'Visualizer')
+    return res
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+'''
+@author: zjl9959@gmail.com
+@license: GPLv3
+'''
+
+from result import TestResult
+from algviz.utility import AlgvizFatalError
+import algviz.layout_worker as layout_worker
+
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+
+# A stub `dot` executable which reads graphs from stdin and writes one SVG for each graph.
+# The graph source controls the behaviour of the stub:
+#   crash: write a broken SVG and exit; flaky: crash only the first time in the stub directory;
+#   hang: never answer; wait: answer until the release file is created in the stub directory.
+STUB_DOT = '''#!{python}
+import os
+import re
+import sys
+import time
+
+stub_dir = os.path.dirname(os.path.realpath(__file__))
+count = 0
+source, depth = '', 0
+for line in iter(sys.stdin.readline, ''):
+    source += line
+    depth += line.count('{{') - line.count('}}')
+    if depth > 0 or '}}' not in source:
+        continue
+    count += 1
+    name = re.search(r'graph\\s+(\\w+)', source).group(1)
+    open(os.path.join(stub_dir, 'started_{{}}'.format(os.getpid())), 'w').close()
+    crash = 'crash' in source
+    marker = os.path.join(stub_dir, 'crashed')
+    if 'flaky' in source and not os.path.exists(marker):
+        open(marker, 'w').close()
+        crash = True
+    if crash:
+        sys.stdout.write('<svg>\\n')
+        sys.stdout.flush()
+        sys.exit(1)
+    while 'hang' in source or ('wait' in source and not os.path.exists(os.path.join(stub_dir, 'release'))):
+        time.sleep(0.01)
+    sys.stdout.write('<svg name="{{}}" pid="{{}}" count="{{}}">\\n</svg>\\n'.format(name, os.getpid(), count))
+    sys.stdout.flush()
+    source = ''
+'''
+
+
+class StubDot():
+    '''
+    @function: Replace the `dot` executable of the layout workers by the stub in a temporary directory.
+    '''
+    def __enter__(self):
+        self.dir = tempfile.mkdtemp()
+        path = os.path.join(self.dir, 'dot')
+        with open(path, 'w') as f:
+            f.write(STUB_DOT.format(python=sys.executable))
+        os.chmod(path, 0o755)
+        self._executable = layout_worker.DOT_EXECUTABLE
+        self._has_in_process_engine = layout_worker._has_in_process_engine_
+        layout_worker.DOT_EXECUTABLE = path
+        layout_worker._has_in_process_engine_ = lambda: False
+        return self
+
+    def __exit__(self, *args):
+        layout_worker.DOT_EXECUTABLE = self._executable
+        layout_worker._has_in_process_engine_ = self._has_in_process_engine
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def started_pids(self):
+        return [int(f[len('started_'):]) for f in os.listdir(self.dir) if f.startswith('started_')]
+
+    def release(self):
+        open(os.path.join(self.dir, 'release'), 'w').close()
+
+    def wait_started(self, num):
+        for _ in range(1000):
+            if len(self.started_pids()) >= num:
+                return True
+            time.sleep(0.01)
+        return False
+
+
+def parse_stub_svg(svg):
+    '''
+    @function: Get the (graph name, process id, graph count) from the SVG written by the stub dot.
+    '''
+    match = re.search(r'name="(\w+)" pid="(\d+)" count="(\d+)"', svg)
+    return (match.group(1), int(match.group(2)), int(match.group(3)))
+
+
+def is_process_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def test_dot_process():
+    res = TestResult()
+    if os.name == 'nt':
+        return res
+    with StubDot():
+        # Test each graph is answered by the resident process before the next graph is written.
+        worker = layout_worker._DotProcess('dot', timeout=10)
+        results = [parse_stub_svg(worker.render('digraph g{} {{\n a -> b\n}}'.format(i))) for i in range(3)]
+        names = [r[0] for r in results]
+        res.add_case(names == ['g0', 'g1', 'g2'], 'Render graphs', names, ['g0', 'g1', 'g2'])
+        pid_counts = [(r[1], r[2]) for r in results]
+        expect = [(results[0][1], i + 1) for i in range(3)]
+        res.add_case(pid_counts == expect, 'Reuse process', pid_counts, expect)
+        worker.close()
+        res.add_case(not is_process_alive(results[0][1]), 'Close process')
+    return res
+
+
+def test_dot_process_restart():
+    res = TestResult()
+    if os.name == 'nt':
+        return res
+    with StubDot():
+        worker = layout_worker._DotProcess('dot', timeout=10)
+        (_, pid, _) = parse_stub_svg(worker.render('digraph g0 {}'))
+        # Test the crashed process is restarted and the graph is rendered again.
+        result = parse_stub_svg(worker.render('digraph flaky {}'))
+        res.add_case(result[0] == 'flaky' and result[1] != pid and result[2] == 1, 'Retry after crash', result)
+        # Test the error is raised if the process crashed again after retry.
+        try:
+            worker.render('digraph crash {}')
+            res.add_case(False, 'Crash again')
+        except AlgvizFatalError:
+            res.add_case(True, 'Crash again')
+        result = parse_stub_svg(worker.render('digraph g1 {}'))
+        res.add_case(result[0] == 'g1' and result[2] == 1, 'Restart after crash', result)
+        worker.close()
+    with StubDot() as stub:
+        # Test the stuck process is killed after timeout and restarted for the next graph.
+        worker = layout_worker._DotProcess('dot', timeout=0.2)
+        try:
+            worker.render('digraph hang {}')
+            res.add_case(False, 'Timeout')
+        except AlgvizFatalError:
+            res.add_case(True, 'Timeout')
+        hang_pids = stub.started_pids()
+        alive = [pid for pid in hang_pids if is_process_alive(pid)]
+        res.add_case(len(hang_pids) == layout_worker.RENDER_RETRY + 1 and len(alive) == 0, 'Kill stuck process',
+                     (hang_pids, alive), layout_worker.RENDER_RETRY + 1)
+        result = parse_stub_svg(worker.render('digraph g2 {}'))
+        res.add_case(result[0] == 'g2' and result[2] == 1, 'Restart after timeout', result)
+        worker.close()
+    return res
+
+
+def render_in_threads(pool, sources):
+    results = [None] * len(sources)
+
+    def render(i):
+        results[i] = parse_stub_svg(pool.render(sources[i]))
+    threads = [threading.Thread(target=render, args=(i,)) for i in range(len(sources))]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_layout_worker_pool():
+    res = TestResult()
+    if os.name != 'nt':
+        with StubDot() as stub:
+            # Test the busy worker is not shared, a new worker is started for the concurrent graph.
+            pool = layout_worker.LayoutWorkerPool(2, timeout=10)
+            threads, results = render_in_threads(pool, ['digraph wait0 {}', 'digraph wait1 {}'])
+            res.add_case(stub.wait_started(2), 'Start workers', stub.started_pids(), 2)
+            stub.release()
+            for thread in threads:
+                thread.join()
+            pids = set([r[1] for r in results])
+            res.add_case(len(pids) == 2, 'Concurrent workers', results)
+            # Test the idle workers are reused.
+            result = parse_stub_svg(pool.render('digraph g0 {}'))
+            res.add_case(result[1] in pids and result[2] == 2, 'Reuse idle worker', result)
+            pool.close()
+        with StubDot() as stub:
+            # Test the graphs wait for the idle worker when the pool is full.
+            pool = layout_worker.LayoutWorkerPool(1, timeout=10)
+            threads, results = render_in_threads(pool, ['digraph wait0 {}', 'digraph wait1 {}'])
+            res.add_case(stub.wait_started(1), 'Start worker', stub.started_pids(), 1)
+            stub.release()
+            for thread in threads:
+                thread.join()
+            counts = sorted([r[2] for r in results])
+            res.add_case(len(set([r[1] for r in results])) == 1 and counts == [1, 2], 'Wait for idle worker', results)
+            pool.close()
+    # Test only one in process engine is used for each layout engine.
+    pool = layout_worker.LayoutWorkerPool(4)
+    expect = 1 if layout_worker._has_in_process_engine_() else 4
+    res.add_case(pool.size() == expect, 'Pool size', pool.size(), expect)
+    return res
+
+
+def test_dot_executable():
+    res = TestResult()
+    # Test a real `dot` process answers each graph before the next graph is written, skip it if graphviz is not installed.
+    if shutil.which(layout_worker.DOT_EXECUTABLE) is None:
+        return res
+    worker = layout_worker._DotProcess('dot', timeout=10)
+    svgs = [worker.render('digraph g{} {{\n n{} -> m{}\n}}'.format(i, i, i)) for i in range(3)]
+    worker.close()
+    for i in range(len(svgs)):
+        ok = svgs[i].strip().endswith('</svg>') and '<title>g{}</title>'.format(i) in svgs[i] and \
+            '>n{}</text>'.format(i) in svgs[i]
+        res.add_case(ok, 'Render graph g{} by dot'.format(i), svgs[i])
+    return res
@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+
+'''
+@author: zjl9959@gmail.com
+@license: GPLv3
+'''
+
+from result import TestResult
+from algviz.utility import AlgvizRuntimeError, AlgvizParamError
+from algviz.packing import solve_strip_packing
+from algviz.layouter import PackingSolver, get_packing_solver, NATIVE_SOLVER_MAX_RECTS
+from algviz.svg_dom import SvgElement, parse_svg, parse_svg_frame
+import algviz
+import algviz.visual
+
+import ast
+import io
+import os
+import random
+import re
+import tempfile
+import threading
+import warnings
+import xml.dom.minidom as xmldom
+
+
+def record_frames(viz, frames):
+    vec = viz.createVector([3, 1, 2], name='vec')
+    tab = viz.createTable(2, 2, [[1, 2], [3, 4]])
+    for i in range(frames):
+        vec.mark(algviz.cRed, i % 3)
+        vec.swap(0, 2)
+        tab[i % 2][0] = i
+        viz.display()
+    return vec, tab
+
+
+def get_frame_number(svg_str):
+    '''
+    @function: Get the frame number from the description comment of the exported animation.
+    @param: {svg_str->str} The exported svg string.
+    @return: {int} The frame number.
+    '''
+    svg = xmldom.parseString(svg_str)
+    for node in svg.documentElement.childNodes:
+        if node.nodeType == node.COMMENT_NODE:
+            return ast.literal_eval(node.data)['frames']
+    return -1
+
+
+def test_headless_export():
+    res = TestResult()
+    # Test headless mode never sleep between frames.
+    viz = algviz.Visualizer(delay=1.0, wait=True, headless=True)
+    sleeps = list()
+    visual_sleep = algviz.visual.sleep
+    algviz.visual.sleep = sleeps.append
+    try:
+        record_frames(viz, 5)
+    finally:
+        algviz.visual.sleep = visual_sleep
+    res.add_case(len(sleeps) == 0, 'No sleep', sleeps, [])
+    # Test export the animation into file object.
+    out = io.StringIO()
+    viz.export(out)
+    frames = get_frame_number(out.getvalue())
+    res.add_case(frames == 5, 'Export frames', frames, 5)
+    # Test the frames are released after exported.
+    case_ok = False
+    try:
+        viz.export(io.StringIO())
+    except AlgvizRuntimeError:
+        case_ok = True
+    res.add_case(case_ok, 'Export twice')
+    # Test export the animation into file path, the streamed svg should be the same as serialized by minidom.
+    viz = algviz.Visualizer(headless=True)
+    record_frames(viz, 3)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        svg_path = os.path.join(temp_dir, 'anim.svg')
+        viz.export(svg_path)
+        with open(svg_path, encoding='utf-8') as f:
+            file_str = f.read()
+    res.add_case(xmldom.parseString(file_str).toxml() == file_str, 'Export into file path')
+    frames = get_frame_number(file_str)
+    res.add_case(frames == 3, 'Export frames', frames, 3)
+    # Test export without layouter.
+    case_ok = False
+    try:
+        algviz.Visualizer().export(io.StringIO())
+    except AlgvizRuntimeError:
+        case_ok = True
+    res.add_case(case_ok, 'Export without layouter')
+    return res
+
+
+def test_python_packing_solver():
+    res = TestResult()
+    rand = random.Random(7)
+    for rect_num in (0, 1, 10, 120):
+        rects = [(rand.randint(10, 300), rand.randint(10, 200)) for i in range(rect_num)]
+        positions, height = solve_strip_packing(400, rects)
+        # Test all the rectangles are inside the strip and not overlapped.
+        case_ok = len(positions) == rect_num
+        for i in range(len(positions)):
+            (x, y), (w, h) = positions[i], rects[i]
+            if x < 0 or y < 0 or x + w > 400 or y + h > height:
+                case_ok = False
+            for j in range(i):
+                (x2, y2), (w2, h2) = positions[j], rects[j]
+                if x < x2 + w2 and x2 < x + w and y < y2 + h2 and y2 < y + h:
+                    case_ok = False
+        res.add_case(case_ok, 'Valid packing of {} rects'.format(rect_num), positions)
+        # Test the height is not far from the area lower bound.
+        lower_bound = sum([w * h for (w, h) in rects]) / 400
+        res.add_case(height <= lower_bound * 1.5 + 200, 'Packing height of {} rects'.format(rect_num), height, lower_bound)
+        # Test the solver is stable.
+        res.add_case(solve_strip_packing(400, rects) == (positions, height), 'Stable packing of {} rects'.format(rect_num))
+    return res
+
+
+def test_packing_solver_session():
+    res = TestResult()
+    # Test the packing solver session is shared in one process.
+    res.add_case(get_packing_solver() is get_packing_solver(), 'Shared solver session')
+    # Test the same rectangles in different order reuse the memoized packing result.
+    solver = PackingSolver()
+    rects = [(120, 80), (60, 200), (300, 40), (60, 200)]
+    positions = solver.solve(500, rects)
+    reversed_positions = solver.solve(500, rects[::-1])
+    info = solver.cache_info()
+    res.add_case(info['hits'] == 1 and info['misses'] == 1, 'Memoized packing', info)
+    res.add_case(sorted(positions) == sorted(reversed_positions), 'Positions of reordered rects',
+                 reversed_positions, positions)
+    # Test solve several problems in one batch, the same rectangles in any order are solved once.
+    solver = PackingSolver()
+    batch_positions = solver.solve_batch([(500, rects), (400, rects[1:]), (500, rects[::-1]), (500, rects)])
+    info = solver.cache_info()
+    expect = [positions, 3, reversed_positions, positions]
+    actual = [batch_positions[0], len(batch_positions[1]), batch_positions[2], batch_positions[3]]
+    res.add_case(actual == expect, 'Batch solve', actual, expect)
+    res.add_case(info['misses'] == 2 and info['hits'] == 0, 'Batch solve unique problems', info)
+    # Test the native solver is only used for a few rectangles.
+    calls = list()
+    solver = PackingSolver()
+    solver.native_solver = lambda: calls.append(1)
+    rand = random.Random(0)
+    many_rects = [(rand.randint(20, 400), rand.randint(20, 300)) for i in range(NATIVE_SOLVER_MAX_RECTS + 1)]
+    solver.solve(800, many_rects)
+    solver.solve(800, many_rects[:NATIVE_SOLVER_MAX_RECTS])
+    res.add_case(len(calls) == 1, 'Native solver for a few rects', len(calls), 1)
+    # Test fall back to the python solver with a warning if the native solver failed.
+    solver = PackingSolver()
+    solver.native_solver = lambda: None
+    expect = solver.solve(500, rects)
+
+    class BrokenNativeSolver:
+        def solve_strip_packing(self, *args):
+            raise OSError('broken')
+    solver = PackingSolver()
+    solver.native_solver = lambda: BrokenNativeSolver()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        fallback_positions = solver.solve(500, rects)
+    res.add_case(fallback_positions == expect and len(caught) == 1 and caught[0].category is RuntimeWarning,
+                 'Fall back to python solver', (fallback_positions, [str(w.message) for w in caught]), expect)
+    return res
+
+
+def test_frame_deduplication():
+    res = TestResult()
+    viz = algviz.Visualizer(delay=1.0, headless=True)
+    vec = viz.createVector([1, 2, 3])
+    log = viz.createLogger(3)
+    for i in range(6):
+        if i in (2, 5):
+            vec[0] = i
+        if i == 0:
+            log.write('log')
+        viz.display(0.5 if i == 3 else 1.0)
+    out = io.StringIO()
+    viz.export(out)
+    svg_str = out.getvalue()
+    # Test the consecutive same frames are merged into one frame group.
+    groups = svg_str.count('<g class="frame"')
+    res.add_case(groups == 6, 'Merged frame groups', groups, 6)   # The logo frame is included.
+    # Test the merged frame shows until the last merged frame ends.
+    disappears = re.findall(r'id="V\d+_(\d+)E(\d+)" begin="V\d+_\d+S(\d+).begin\+([\d.]+)s"', svg_str)
+    expect = [('0', '1', '0', '2.0'), ('0', '2', '2', '1.0'), ('0', '4', '3', '1.5'), ('0', '5', '5', '1.0'),
+              ('1', '5', '0', '5.5')]
+    res.add_case(disappears[:5] == expect, 'Merged frame delays', disappears, expect)
+    return res
+
+
+def expand_uses(svg_str, vid):
+    '''
+    @function: Replace the <use> nodes by the referenced <defs> fragments, and remove the visualizer id.
+    @param: {svg_str->str} The exported svg string.
+    @param: {vid->int} The id of the visualizer exported the svg.
+    @return: {str} The expanded svg string.
+    '''
+    dom = xmldom.parseString(svg_str)
+    defs = dict()
+    for node in dom.getElementsByTagName('defs'):
+        if node.firstChild.nodeType == node.ELEMENT_NODE and node.firstChild.getAttribute('id').startswith('V{}_D'.format(vid)):
+            defs[node.firstChild.getAttribute('id')] = node.firstChild.firstChild
+            node.parentNode.removeChild(node)
+    for node in dom.getElementsByTagName('use'):
+        if node.getAttribute('xlink:href')[1:] in defs:
+            node.parentNode.replaceChild(defs[node.getAttribute('xlink:href')[1:]].cloneNode(True), node)
+    return dom.toxml().replace('V{}_'.format(vid), 'V_')
+
+
+def test_shared_defs():
+    res = TestResult()
+    svg_strs = list()
+    for share_defs in (True, False):
+        viz = algviz.Visualizer(delay=1.0, headless=True, share_defs=share_defs)
+        vec = viz.createVector(list(range(10)), name='vec')
+        cur = viz.createCursor(0, 'i')
+        for i in range(6):
+            vec[cur] = -i
+            cur += 1
+            viz.display()
+        out = io.StringIO()
+        viz.export(out)
+        svg_strs.append((out.getvalue(), viz._vid))
+    # Test the repeated fragments are referenced by <use>.
+    uses = svg_strs[0][0].count('<use xlink:href="#V')
+    res.add_case(uses > 0 and svg_strs[1][0].count('<use xlink:href="#V') == 0, 'Use shared fragments', uses)
+    res.add_case(len(svg_strs[0][0]) < len(svg_strs[1][0]) * 0.9, 'Shared svg size', len(svg_strs[0][0]), len(svg_strs[1][0]))
+    # Test the shared svg is the same as the unshared svg after expanding the <use> nodes.
+    shared_xml = expand_uses(*svg_strs[0])
+    unshared_xml = expand_uses(*svg_strs[1])
+    res.add_case(shared_xml == unshared_xml, 'Expand shared fragments')
+    return res
+
+
+def visible_frames(svg_str, vid):
+    '''
+    @function: Collect the visible nodes of each frame in the exported animation.
+    @param: {svg_str->str} The exported svg string.
+    @param: {vid->int} The id of the visualizer exported the svg.
+    @return: {dict} Key:(sequencer id, first frame); Value:list(str) sorted XML of the visible nodes.
+    '''
+    frame_id = re.compile(r'V{}_(\d+)([SE])(\d+)'.format(vid))
+    frames, statics = dict(), list()
+    for g in xmldom.parseString(svg_str).getElementsByTagName('g'):
+        sets = [node for node in g.childNodes if node.nodeType == node.ELEMENT_NODE and node.tagName == 'set']
+        if len(sets) == 2:
+            seq = frame_id.match(sets[0].getAttribute('begin')).group(1)
+            first = int(frame_id.match(sets[0].getAttribute('begin')).group(3))
+            last = int(frame_id.match(sets[1].getAttribute('begin')).group(3))
+            statics.append((seq, first, last, g.getAttribute('transform') + g.firstChild.toxml()))
+        elif g.getAttribute('class') == 'frame':
+            ids, nodes = dict(), list()
+            for node in g.childNodes:
+                match = frame_id.match(node.getAttribute('id')) if node.nodeType == node.ELEMENT_NODE else None
+                if match:
+                    ids[match.group(2)] = (match.group(1), int(match.group(3)))
+                else:
+                    nodes.append(g.getAttribute('transform') + node.toxml())
+            frames[ids['S']] = (ids['E'][1], nodes)
+    visible = dict()
+    for (seq, first), (last, nodes) in frames.items():
+        for (static_seq, static_first, static_last, xml) in statics:
+            if static_seq == seq and static_first <= first and last <= static_last:
+                nodes.append(xml)
+        visible[(seq, first)] = sorted(nodes)
+    return visible
+
+
+def test_delta_frames():
+    res = TestResult()
+    exports = list()
+    for delta_frames in (False, True):
+        viz = algviz.Visualizer(delay=1.0, headless=True, share_defs=False, delta_frames=delta_frames)
+        vec = viz.createVector([3, 1, 2, 5], name='vec')
+        tab = viz.createTable(3, 3, [[i * 3 + j for j in range(3)] for i in range(3)])
+        cur = viz.createCursor(0, 'i')
+        for i in range(8):
+            if i % 3 == 0:
+                vec.swap(0, 3)
+            vec[cur] = -i
+            cur = (cur + 1) % 4
+            if i != 5:
+                tab[i % 3][1] = i
+            viz.display()
+        out = io.StringIO()
+        viz.export(out)
+        exports.append((out.getvalue(), viz._vid))
+    res.add_case(len(exports[1][0]) < len(exports[0][0]), 'Delta svg size', len(exports[1][0]), len(exports[0][0]))
+    # Test each frame shows the same nodes as the full snapshot frames.
+    snapshot_frames = visible_frames(*exports[0])
+    delta_frames = visible_frames(*exports[1])
+    res.add_case(len(delta_frames) == len(snapshot_frames), 'Delta frame number', len(delta_frames), len(snapshot_frames))
+    case_ok = True
+    for key, nodes in snapshot_frames.items():
+        if [xml.replace('V{}_'.format(exports[0][1]), 'V_') for xml in nodes] != \
+           [xml.replace('V{}_'.format(exports[1][1]), 'V_') for xml in delta_frames.get(key, [])]:
+            case_ok = False
+    res.add_case(case_ok, 'Delta frame nodes')
+    return res
+
+
+class FakeDisplay():
+    '''
+    @function: Record the SVG displayed by IPython.display interfaces.
+    '''
+    def __init__(self):
+        self.svgs = list()
+
+    def display(self, content, display_id):
+        if hasattr(content, '_repr_svg_'):
+            self.svgs.append((display_id, content._repr_svg_()))
+
+    def update_display(self, content, display_id):
+        self.display(content, display_id)
+
+
+def test_render_thread():
+    res = TestResult()
+    fake_display = FakeDisplay()
+    ipython_display = algviz.visual._ipython_display_
+    algviz.visual._ipython_display_ = lambda: fake_display
+    visual_sleep = algviz.visual.sleep
+    try:
+        # Test the algorithm keeps running while the render thread waits for the delay, the wait is blocked by an event.
+        sleeps, sleeping, release = list(), threading.Event(), threading.Event()
+
+        def blocked_sleep(seconds):
+            sleeps.append(seconds)
+            sleeping.set()
+            release.wait(10)
+        algviz.visual.sleep = blocked_sleep
+        viz = algviz.Visualizer(delay=0.1, wait=0, render_queue=2)
+        vec = viz.createVector([1, 2, 3])
+        vec[0] = 0
+        viz.display()
+        res.add_case(sleeping.wait(10) and len(fake_display.svgs) == 1, 'Render thread waits', len(fake_display.svgs), 1)
+        for i in range(1, 3):
+            vec[i] = -i
+            viz.display()
+        res.add_case(len(fake_display.svgs) == 1, 'Display without waiting', len(fake_display.svgs), 1)
+        # Test display blocks when the queue is full, until the render thread takes a frame.
+        vec[0] = -3
+        blocked_display = threading.Thread(target=viz.display)
+        blocked_display.start()
+        blocked_display.join(0.1)
+        res.add_case(blocked_display.is_alive(), 'Backpressure')
+        release.set()
+        blocked_display.join()
+        viz.flush()
+        res.add_case(len(fake_display.svgs) == 4 and sleeps == [0.1] * 4, 'Flush', (len(fake_display.svgs), sleeps), 4)
+        algviz.visual.sleep = visual_sleep
+        # Test the displayed frames are the same as displayed synchronously, the graphs are rendered by the render thread.
+        frames = list()
+        render_threads = set()
+        for render_queue in (2, 0):
+            tree = algviz.parseBinaryTree([1, 2, 3, None, 4])
+            graph = algviz.parseGraph([0, 1, 2], [(0, 1, 'x'), (1, 2, None), (2, 0, None)])
+            fake_display.svgs.clear()
+            viz = algviz.Visualizer(delay=0.01, wait=0, render_queue=render_queue)
+            vec = viz.createVector([1, 2, 3])
+            gra1 = viz.createGraph(tree)
+            gra2 = viz.createGraph(graph)
+            m = viz.createMap({'a': 1})
+            if render_queue > 0:
+                render_frame = gra2._render_frame_
+
+                def record_render_thread(frame):
+                    render_threads.add(threading.current_thread())
+                    return render_frame(frame)
+                gra2._render_frame_ = record_render_thread
+            for i in range(6):
+                vec[i % 3] = -i
+                gra1.markNode(algviz.cRed, tree.left, hold=(i % 2 == 0))
+                gra2.markEdge(algviz.cGreen, graph[i % 3], graph[(i + 1) % 3])
+                m['k{}'.format(i)] = i
+                if i == 3:
+                    tree.left.val = 'x'
+                    gra1.removeMark(algviz.cRed)
+                viz.display()
+            viz.flush()
+            # The appearing graph nodes are ordered by their hash, ignore the order and ids of the SVG elements.
+            frames.append([sorted(re.sub(' id="[^"]*"', '', svg).split('>')) for (did, svg) in fake_display.svgs])
+        res.add_case(frames[0] == frames[1], 'Displayed frames', len(frames[0]), len(frames[1]))
+        res.add_case(threading.main_thread() not in render_threads and len(render_threads) == 1, 'Render graphs in thread',
+                     render_threads)
+    finally:
+        algviz.visual._ipython_display_ = ipython_display
+        algviz.visual.sleep = visual_sleep
+    return res
+
+
+def test_parallel_export():
+    res = TestResult()
+    # The same graphs are bound to both visualizers, so they are laid out the same.
+    tree = algviz.parseBinaryTree([1, 2, 3, None, 4, 5, 6])
+    graph = algviz.parseGraph([0, 1, 2, 3], [(0, 1, 'x'), (1, 2, None), (2, 0, None), (2, 3, None)])
+    vizs = [algviz.Visualizer(0.5, headless=True), algviz.Visualizer(0.5, headless=True, export_workers=2)]
+    objs = [(viz.createGraph(tree, layout_engine='graphviz'), viz.createGraph(graph, directed=False),
+             viz.createVector([1, 2, 3])) for viz in vizs]
+    for step in range(6):
+        for (gra1, gra2, vec) in objs:
+            gra1.markNode(algviz.cRed, tree.left, hold=False)
+            gra2.markEdge(algviz.cGreen, graph[0], graph[1], hold=(step % 2 == 0))
+            if step == 3:
+                gra2.removeMark(algviz.cGreen)
+            vec[step % 3] = step
+        if step == 2:
+            tree.left.val = 9
+        for viz in vizs:
+            viz.display()
+    pending = sum([len(seq.pending_layouts()) for seq in vizs[1]._layouter._display_id2seq.values()])
+    res.add_case(pending > 0, 'Pending layouts', pending, '> 0')
+    svgs = list()
+    for viz in vizs:
+        file = io.StringIO()
+        viz.export(file)
+        # The display ids in layout info are different.
+        svgs.append(re.sub(r'<!--.*?-->', '', file.getvalue().replace('V{}_'.format(viz._vid), 'V_')))
+    res.add_case(svgs[0] == svgs[1], 'Parallel export', len(svgs[1]), len(svgs[0]))
+    return res
+
+
+def test_export_ranges():
+    res = TestResult()
+    ranges = [(0, 3), (2, 6), (4, None), (0, 3)]
+    for delta_frames in (False, True):
+        viz = algviz.Visualizer(delay=1.0, headless=True, delta_frames=delta_frames)
+        record_frames(viz, 6)
+        files = [io.StringIO() for r in ranges]
+        viz.exportRanges(files, ranges)
+        # Test each range is the same as exported alone, the display ids in layout info are different.
+        for (start_frame, end_frame), file in zip(ranges, files):
+            single_viz = algviz.Visualizer(delay=1.0, headless=True, delta_frames=delta_frames)
+            record_frames(single_viz, 6)
+            single_file = io.StringIO()
+            single_viz._layouter.export_to(single_file, 800, start_frame, end_frame)
+            svg = re.sub(r'<!--.*?-->', '', file.getvalue().replace('V{}_'.format(viz._vid), 'V_'))
+            expect = re.sub(r'<!--.*?-->', '', single_file.getvalue().replace('V{}_'.format(single_viz._vid), 'V_'))
+            res.add_case(svg == expect, 'Export range {} delta:{}'.format((start_frame, end_frame), delta_frames),
+                         len(svg), len(expect))
+        frames = [get_frame_number(file.getvalue()) for file in files]
+        res.add_case(frames == [3, 4, 2, 3], 'Export ranges frames', frames, [3, 4, 2, 3])
+    # Test the ranges with the same display sizes share one packing result.
+    viz = algviz.Visualizer(headless=True)
+    record_frames(viz, 4)
+    info = get_packing_solver().cache_info()
+    viz.exportRanges([io.StringIO() for i in range(3)], [(0, 4), (0, 4), (0, None)])
+    new_info = get_packing_solver().cache_info()
+    solved = new_info['hits'] + new_info['misses'] - info['hits'] - info['misses']
+    res.add_case(solved == 1, 'Batch layout ranges', solved, 1)
+    # Test invalid parameters.
+    for (files, frame_ranges) in [([io.StringIO()], []), ([io.StringIO()], [(2, 1)]), ([io.StringIO()], [(0, 9)])]:
+        viz = algviz.Visualizer(headless=True)
+        record_frames(viz, 4)
+        try:
+            viz.exportRanges(files, frame_ranges)
+            res.add_case(False, 'Invalid ranges {}'.format(frame_ranges))
+        except AlgvizParamError:
+            res.add_case(True, 'Invalid ranges {}'.format(frame_ranges))
+    case_ok = False
+    try:
+        viz.exportRanges([io.StringIO()], [(0, 2)])
+        viz.exportRanges([io.StringIO()], [(2, 4)])
+    except AlgvizRuntimeError:
+        case_ok = True
+    res.add_case(case_ok, 'Export ranges twice')
+    return res
+
+
+def frame_to_xml(frame):
+    '''
+    @function: Serialize the frame taken by Sequencer into XML string.
+    @param: {frame->(int, int, list)} The width, height and nodes of a frame.
+    @return: {(int, int, str)} The width, height and XML string of the frame.
+    '''
+    g_frame = SvgElement('g')
+    for node in frame[2]:
+        g_frame.appendChild(node)
+    return (frame[0], frame[1], g_frame.toxml())
+
+
+def test_svg_frame_protocol():
+    res = TestResult()
+    # Test the frames taken without parsing are the same as parsed from SVG strings.
+    for backend in ('minidom', 'string'):
+        viz = algviz.Visualizer(svg_backend=backend)
+        objs = [viz.createVector([1, 2, 3]), viz.createVector([1, 2, 3]),
+                viz.createTable(2, 2, [[1, 2], ['a<b', 4]]), viz.createTable(2, 2, [[1, 2], ['a<b', 4]])]
+        case_ok = True
+        for step in range(4):
+            for obj in objs:
+                if isinstance(obj, algviz.vector.Vector):
+                    obj.swap(0, 2)
+                    obj.mark(algviz.cRed, step % 3)
+                    obj[1] = step
+                else:
+                    obj[step % 2][1] = 'x&y'
+            frame = frame_to_xml(objs[0]._repr_svg_frame_())
+            if frame != frame_to_xml(parse_svg_frame(objs[1]._repr_svg_())):
+                case_ok = False
+            frame = frame_to_xml(objs[2]._repr_svg_frame_())
+            if frame != frame_to_xml(parse_svg_frame(objs[3]._repr_svg_())):
+                case_ok = False
+        res.add_case(case_ok, 'Same frames with {} backend'.format(backend))
+    # Test the parsed document generates the same XML as minidom.
+    svg_str = '''<svg width="10pt" height="5pt" xmlns:xlink="x" id="s" xmlns="y"><!-- c --><style><![CDATA[.a{}]]></style>
+<g id="0"><text>a &amp; b &lt; c</text></g></svg>'''
+    svg_xml = parse_svg(svg_str).toxml()
+    expect_xml = xmldom.parseString(svg_str).toxml()
+    res.add_case(svg_xml == expect_xml, 'Parse svg', svg_xml, expect_xml)
+    return res
@@ -274,3 +274,28 @@ def test_two_doubly_linked_lists():
     res.add_case(equal(nodes, expect_nodes) and equal_table(edges, expect_edges), 'Link two lists',
                  'nodes:{};edges:{}'.format(nodes, edges), 'nodes:{};edges:{}'.format(expect_nodes, expect_edges))
     return res
+
+
+def test_linked_list_layout():
+    res = TestResult()
+    viz = algviz.Visualizer()
+    head, _ = algviz.parseDoublyLinkedList([1, 2, 3, 4])
+    graph = viz.createGraph(head)
+    gv_head, _ = algviz.parseDoublyLinkedList([1, 2, 3, 4])
+    gv_graph = viz.createGraph(gv_head, layout_engine='graphviz')
+    hack_graph(graph)
+    hack_graph(gv_graph)
+    # Test native linked list layout generate the same nodes and edges as graphviz.
+    nodes, edges = get_graph_elements(graph._repr_svg_())
+    gv_nodes, gv_edges = get_graph_elements(gv_graph._repr_svg_())
+    misses = graph.layoutCacheInfo()['misses']
+    res.add_case(equal(nodes, gv_nodes) and equal_table(edges, gv_edges) and misses == 0, 'Native linked list layout',
+                 'nodes:{};edges:{};graphviz:{}'.format(nodes, edges, misses), 'nodes:{};edges:{}'.format(gv_nodes, gv_edges))
+    # Test linked list nodes are placed in a row from head to tail.
+    positions = list()
+    for node in graph._svg.getElementsByTagName('ellipse'):
+        positions.append((float(node.getAttribute('cy')), float(node.getAttribute('cx'))))
+    labels = [text.firstChild.data for text in graph._svg.getElementsByTagName('text')]
+    row = [label for _, label in sorted(zip(positions, labels))]
+    res.add_case(row == ['1', '2', '3', '4'] and len(set(y for y, _ in positions)) == 1, 'Linked list in a row', row)
+    return res
@@ -96,3 +96,25 @@ def test_modify_items():
     res.add_case(equal(expect_nodes, svg_nodes) and equal_table(expect_edges, svg_edges), 'Clear map',
                  'nodes:{};edges:{}'.format(svg_nodes, svg_edges), 'nodes:{};edges:{}'.format(expect_nodes, expect_edges))
     return res
+
+
+def test_mark_colors():
+    res = TestResult()
+    viz = algviz.Visualizer()
+    map = viz.createMap({1: 'a', 2: 'b', 3: 'def'})
+    hack_graph(map._graph)
+    map._repr_svg_()
+    # Test mark keys with different colors in one call.
+    red, green = (255, 0, 0), (0, 255, 0)
+    map.markColors([(1, red), (3, green), (4, red)], hold=True)
+    map._repr_svg_()
+    colors = [map._graph._node_tcs[node].color() for k in (1, 2, 3) for node in map._graph_nodes[k]]
+    expect = [red, red, (255, 255, 255), (255, 255, 255), green, green]
+    res.add_case(equal(expect, colors), 'Mark colors', colors, expect)
+    # Test remove one of the mark colors.
+    map.removeMark(red)
+    map._repr_svg_()
+    colors = [map._graph._node_tcs[node].color() for k in (1, 2, 3) for node in map._graph_nodes[k]]
+    expect = [(255, 255, 255), (255, 255, 255), (255, 255, 255), (255, 255, 255), green, green]
+    res.add_case(equal(expect, colors), 'Remove mark colors', colors, expect)
+    return res
@@ -5,6 +5,8 @@
 @license: GPLv3
 '''
 
+import weakref
+
 import algviz
 from result import TestResult
 from utility import equal, equal_table, get_graph_elements, hack_graph
@@ -246,3 +248,80 @@ def test_regression_issue_4():
     except AlgvizParamError:
         res.add_case(True, 'invalidInputCheck')
     return res
+
+
+def test_node_slots():
+    res = TestResult()
+    root = algviz.parseBinaryTree([1, 2, 3])
+    nodes = [root, algviz.TreeNode(1), algviz.GraphNode(1), algviz.ForwardLinkedListNode(1), algviz.DoublyLinkedListNode(1)]
+    # The node attributes are stored in slots, the instance dictionary is empty until a user attribute is set.
+    dicts = [node.__dict__ for node in nodes]
+    res.add_case(all(len(d) == 0 for d in dicts), 'Attributes in slots', dicts, [{}] * len(nodes))
+    for node in nodes:
+        node.visited = True
+    visited = [node.visited for node in nodes]
+    res.add_case(all(visited), 'User attribute', visited, [True] * len(nodes))
+    refs = [weakref.ref(node) for node in nodes]
+    res.add_case(all(ref() is node for ref, node in zip(refs, nodes)), 'Weak reference')
+    # Reading the node attributes should not be intercepted in python.
+    fast_read = [type(node).__getattribute__ is object.__getattribute__ for node in nodes]
+    res.add_case(all(fast_read), 'Fast attribute read', fast_read, [True] * len(nodes))
+    res.add_case(len(root.left.bind_graphs()) == 0, 'Not bound')
+    viz = algviz.Visualizer()
+    graph = viz.createGraph(root)
+    res.add_case(root.left.bind_graphs() == {graph}, 'Bind graph', root.left.bind_graphs(), {graph})
+    root.right.left = algviz.BinaryTreeNode(4)
+    res.add_case(root.right.left.bind_graphs() == {graph}, 'Bind new node', root.right.left.bind_graphs(), {graph})
+    left = root.left
+    root.left = None
+    graph.removeNode(left, recursive=True)
+    res.add_case(len(left.bind_graphs()) == 0, 'Unbind graph', left.bind_graphs(), set())
+    return res
+
+
+def test_tree_layout():
+    res = TestResult()
+    viz = algviz.Visualizer()
+    tree_nodes = [1, 2, 3, 4, 5, None, 6]
+    root = algviz.parseBinaryTree(tree_nodes)
+    graph = viz.createGraph(root)
+    gv_graph = viz.createGraph(algviz.parseBinaryTree(tree_nodes), layout_engine='graphviz')
+    hack_graph(graph)
+    hack_graph(gv_graph)
+    # Test native tree layout generate the same nodes and edges as graphviz.
+    nodes, edges = get_graph_elements(graph._repr_svg_())
+    gv_nodes, gv_edges = get_graph_elements(gv_graph._repr_svg_())
+    misses = graph.layoutCacheInfo()['misses']
+    res.add_case(equal(nodes, gv_nodes) and equal_table(edges, gv_edges) and misses == 0, 'Native tree layout',
+                 'nodes:{};edges:{};graphviz:{}'.format(nodes, edges, misses), 'nodes:{};edges:{}'.format(gv_nodes, gv_edges))
+    # Test left child is placed at the left of it's parent and right child at the right.
+    positions = get_tree_positions(graph)
+    misplaced = list()
+    for node in positions.keys():
+        if node.left is not None and positions[node.left] >= positions[node]:
+            misplaced.append(node.left.val)
+        if node.right is not None and positions[node.right] <= positions[node]:
+            misplaced.append(node.right.val)
+    res.add_case(len(misplaced) == 0, 'Binary tree order', misplaced, [])
+    # Test only relayout the changed subtree.
+    right_layout = graph._layout_engine._subtrees[root.right]
+    root.left.left.left = algviz.BinaryTreeNode(7)
+    graph._repr_svg_()
+    res.add_case(graph._layout_engine._subtrees[root.right] is right_layout, 'Incremental tree layout')
+    # Test unsupported layout engine.
+    case_ok = False
+    try:
+        viz.createGraph(root, layout_engine='unknown')
+    except AlgvizParamError:
+        case_ok = True
+    res.add_case(case_ok, 'Unsupported layout engine')
+    return res
+
+
+def get_tree_positions(graph):
+    positions = dict()
+    for node in graph._svg.getElementsByTagName('g'):
+        if node.getAttribute('class') == 'node':
+            tree_node = graph._node_idmap.toAttributeId(int(node.getAttribute('id')[4:]))
+            positions[tree_node] = float(node.getElementsByTagName('ellipse')[0].getAttribute('cx'))
+    return positions
@@ -5,7 +5,10 @@
 @license: GPLv3
 '''
 
+import random
+
 import algviz
+from algviz.utility import TraceColorStack, TraceColorArray
 from utility import TestCustomPrintableClass, equal
 from result import TestResult
 
@@ -157,6 +160,10 @@ def test_modify_vectors():
     expect_results = [2, 4]
     res.add_case(equal(vec_elems, expect_results), 'Combine operationst',
                  vec_elems, expect_results)
+    # Test the element index of svg is in sync with svg nodes.
+    svg_gids = sorted([int(g.getAttribute('id')) for g in vec._svg._svg.getElementsByTagName('g')])
+    index_gids = sorted(vec._svg._gid2elem.keys())
+    res.add_case(svg_gids == index_gids, 'Element index', index_gids, svg_gids)
     return res
 
 
@@ -189,6 +196,48 @@ def test_mark_elements():
     return res
 
 
+def test_trace_color_array():
+    res = TestResult()
+    rand = random.Random(0)
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (1, 2, 3)]
+    # Test the color stacks in TraceColorArray behave the same as TraceColorStack.
+    color_array = TraceColorArray()
+    color_stacks = dict()
+    case_ok = True
+    for step in range(2000):
+        i = rand.randrange(20)
+        color = rand.choice(colors)
+        op = rand.randrange(6)
+        if op == 0:
+            color_array.alloc(i)
+            color_stacks[i] = TraceColorStack()
+        elif op == 1:
+            color_array.free(i)
+            color_stacks.pop(i, None)
+        elif op == 2 and i in color_stacks:
+            color_array.add(i, color)
+            color_stacks[i].add(color)
+        elif op == 3:
+            ok = color_array.remove(i, color) == (i in color_stacks and color_stacks[i].remove(color))
+            case_ok = case_ok and ok
+        elif op == 4:
+            changed = [k for k in sorted(color_stacks.keys()) if color_stacks[k].remove(color)]
+            case_ok = case_ok and color_array.remove_all(color) == changed
+        if (i in color_array) != (i in color_stacks):
+            case_ok = False
+        elif i in color_stacks and color_array.color(i) != color_stacks[i].color():
+            case_ok = False
+    res.add_case(case_ok, 'Trace color array')
+    # Test keep some elements when remove color from all the elements.
+    color_array = TraceColorArray()
+    for i in range(3):
+        color_array.alloc(i)
+        color_array.add(i, colors[0])
+    changed = color_array.remove_all(colors[0], {1})
+    res.add_case(changed == [0, 2] and color_array.color(1) == colors[0], 'Remove all colors', changed, [0, 2])
+    return res
+
+
 def test_vector_cursor():
     res = TestResult()
     viz = algviz.Visualizer()
@@ -239,6 +288,48 @@ def test_vector_cursor():
     return res
 
 
+def test_svg_backends():
+    res = TestResult()
+    # Run the same operations on vectors and tables with different SVG backends.
+    frames, cache_ok = dict(), True
+    for backend in ('minidom', 'string'):
+        viz = algviz.Visualizer(svg_backend=backend)
+        vec = viz.createVector([1, 2, 3, 4, 5])
+        hist = viz.createVector([3, -1, 4], histogram=True)
+        tab = viz.createTable(3, 3, [[1, 2], ['a<b', 'c&d']])
+        i = viz.createCursor(0, 'i')
+        frames[backend] = list()
+        for step in range(8):
+            vec.append(step)
+            vec.insert(step % 3, 'x\ny')
+            vec.pop(1)
+            vec.swap(0, len(vec) - 1)
+            vec.mark((255, 0, 0), step % len(vec), hold=(step % 2 == 0))
+            i << step % len(vec)
+            vec[i] = -step
+            hist[step % 3] = step - 4
+            tab[step % 2][(step + 1) % 3] = step * 1.5
+            tab.mark((0, 255, 0), step % 2, 0)
+            if step == 4:
+                vec.removeMark((255, 0, 0))
+                tab.reshape(2, 4)
+            frames[backend].append(vec._repr_svg_() + hist._repr_svg_() + tab._repr_svg_())
+            # The cached XML strings of elements should be in sync with the SVG nodes.
+            for svg_table in (vec._svg, hist._svg, tab._svg):
+                if svg_table._repr_svg_() != svg_table._dom.toxml():
+                    cache_ok = False
+    res.add_case(frames['minidom'] == frames['string'], 'Same output of SVG backends')
+    res.add_case(cache_ok, 'Cached element XML strings')
+    # Test invalid svg backend name.
+    case_ok = False
+    try:
+        algviz.Visualizer(svg_backend='unknown')
+    except algviz.utility.AlgvizParamError:
+        case_ok = True
+    res.add_case(case_ok, 'Invalid svg backend')
+    return res
+
+
 def get_vector_elements(svg_str):
     '''
     @function: Parse vector elements from it's display SVG string.
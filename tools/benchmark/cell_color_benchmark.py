@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+"""Measure the memory and removeMark cost of the cell color stacks in Vector and Table.
+
+Each case allocates the color stacks of all the cells, marks one cell in every ten with two colors,
+then reports the traced memory divided by the number of cells and the time to remove one color from all the cells.
+The per-cell TraceColorStack objects are compared with the TraceColorArray used by Vector and Table.
+
+Usage: python tools/benchmark/cell_color_benchmark.py [cells]
+
+Author: zjl9959@gmail.com
+
+License: GPLv3
+
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..'))
+
+from algviz.utility import TraceColorStack, TraceColorArray  # noqa: E402
+
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+
+
+def create_stacks(cell_num):
+    stacks = dict()
+    for i in range(cell_num):
+        stacks[i] = TraceColorStack()
+    for i in range(0, cell_num, 10):
+        stacks[i].add(RED)
+        stacks[i].add(GREEN)
+    return stacks
+
+
+def remove_stacks_color(stacks):
+    return [i for i in stacks.keys() if stacks[i].remove(RED)]
+
+
+def create_array(cell_num):
+    colors = TraceColorArray()
+    for i in range(cell_num):
+        colors.alloc(i)
+    for i in range(0, cell_num, 10):
+        colors.add(i, RED)
+        colors.add(i, GREEN)
+    return colors
+
+
+def remove_array_color(colors):
+    return colors.remove_all(RED)
+
+
+CASES = [
+    ('TraceColorStack', create_stacks, remove_stacks_color),
+    ('TraceColorArray', create_array, remove_array_color),
+]
+
+
+def bench_cell_colors(create, remove, cell_num):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    colors = create(cell_num)
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    start = time.perf_counter()
+    changed = remove(colors)
+    cost = time.perf_counter() - start
+    assert len(changed) == (cell_num + 9) // 10
+    return (used / cell_num, cost * 1000)
+
+
+def main():
+    cell_num = 1000000
+    if len(sys.argv) > 1:
+        cell_num = int(sys.argv[1])
+    print('{:>16}  {:>12}  {:>16}'.format('storage', 'bytes/cell', 'removeMark(ms)'))
+    for (name, create, remove) in CASES:
+        (memory, cost) = bench_cell_colors(create, remove, cell_num)
+        print('{:>16}  {:>12.1f}  {:>16.1f}'.format(name, memory, cost))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+"""Measure the memory cost of each kind of graph node.
+
+Each case creates the nodes and links them into a tree, a graph or a linked list,
+then reports the traced memory divided by the number of nodes.
+The nodes are not bound to any graph, like the nodes of a large test fixture.
+
+Usage: python tools/benchmark/node_memory_benchmark.py [nodes]
+
+Author: zjl9959@gmail.com
+
+License: GPLv3
+
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..'))
+
+from algviz.graph import GraphNode  # noqa: E402
+from algviz.tree import BinaryTreeNode, TreeNode    # noqa: E402
+from algviz.linked_list import ForwardLinkedListNode, DoublyLinkedListNode  # noqa: E402
+
+
+def create_binary_tree(labels):
+    node_num = len(labels)
+    nodes = [BinaryTreeNode(label) for label in labels]
+    for i in range(1, node_num):
+        if i % 2 == 1:
+            nodes[(i - 1) // 2].left = nodes[i]
+        else:
+            nodes[(i - 1) // 2].right = nodes[i]
+    return nodes
+
+
+def create_tree(labels):
+    node_num = len(labels)
+    nodes = [TreeNode(label) for label in labels]
+    for i in range(1, node_num):
+        nodes[(i - 1) // 3].add(nodes[i])
+    return nodes
+
+
+def create_graph(labels):
+    node_num = len(labels)
+    nodes = [GraphNode(label) for label in labels]
+    for i in range(node_num):
+        nodes[i].add(nodes[(i + 1) % node_num])
+    return nodes
+
+
+def create_forward_list(labels):
+    node_num = len(labels)
+    nodes = [ForwardLinkedListNode(label) for label in labels]
+    for i in range(node_num - 1):
+        nodes[i].next = nodes[i + 1]
+    return nodes
+
+
+def create_doubly_list(labels):
+    node_num = len(labels)
+    nodes = [DoublyLinkedListNode(label) for label in labels]
+    for i in range(node_num - 1):
+        nodes[i].next = nodes[i + 1]
+        nodes[i + 1].prev = nodes[i]
+    return nodes
+
+
+CASES = [
+    ('BinaryTreeNode', create_binary_tree),
+    ('TreeNode', create_tree),
+    ('GraphNode', create_graph),
+    ('ForwardLinkedListNode', create_forward_list),
+    ('DoublyLinkedListNode', create_doubly_list),
+]
+
+
+def bench_node_memory(create, node_num):
+    labels = list(range(node_num))
+    tracemalloc.start()
+    # The list of nodes and the node labels are not counted.
+    base = tracemalloc.get_traced_memory()[0] + sys.getsizeof([None] * node_num)
+    nodes = create(labels)
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del nodes
+    return used / node_num
+
+
+def main():
+    node_num = 100000
+    if len(sys.argv) > 1:
+        node_num = int(sys.argv[1])
+    print('{:>24}  {:>14}'.format('node type', 'bytes/node'))
+    for (name, create) in CASES:
+        print('{:>24}  {:>14.1f}'.format(name, bench_node_memory(create, node_num)))
+
+
+if __name__ == '__main__':
+    main()
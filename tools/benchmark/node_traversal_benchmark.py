@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+"""Measure the cost of reading the graph node attributes in tight traversal loops.
+
+It builds a complete binary tree and a doubly linked list, then reports the time
+of a depth first search over the tree and a forward and backward walk over the list.
+
+Usage: python tools/benchmark/node_traversal_benchmark.py [nodes] [rounds]
+
+Author: zjl9959@gmail.com
+
+License: GPLv3
+
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..'))
+
+from algviz.tree import BinaryTreeNode  # noqa: E402
+from algviz.linked_list import DoublyLinkedListNode     # noqa: E402
+
+
+def create_binary_tree(node_num):
+    nodes = [BinaryTreeNode(i) for i in range(node_num)]
+    for i in range(1, node_num):
+        if i % 2 == 1:
+            nodes[(i - 1) // 2].left = nodes[i]
+        else:
+            nodes[(i - 1) // 2].right = nodes[i]
+    return nodes[0]
+
+
+def create_doubly_list(node_num):
+    nodes = [DoublyLinkedListNode(i) for i in range(node_num)]
+    for i in range(node_num - 1):
+        nodes[i].next = nodes[i + 1]
+        nodes[i + 1].prev = nodes[i]
+    return (nodes[0], nodes[-1])
+
+
+def tree_dfs(root):
+    total = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        total += node.val
+        if node.right is not None:
+            stack.append(node.right)
+        if node.left is not None:
+            stack.append(node.left)
+    return total
+
+
+def list_walk(head, tail):
+    total = 0
+    node = head
+    while node is not None:
+        total += node.val
+        node = node.next
+    node = tail
+    while node is not None:
+        total += node.val
+        node = node.prev
+    return total
+
+
+def bench(func, args, rounds):
+    best = None
+    for i in range(rounds):
+        start_time = time.perf_counter()
+        func(*args)
+        cost = time.perf_counter() - start_time
+        if best is None or cost < best:
+            best = cost
+    return best
+
+
+def main():
+    node_num, rounds = 1000000, 3
+    if len(sys.argv) > 1:
+        node_num = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        rounds = int(sys.argv[2])
+    root = create_binary_tree(node_num)
+    print('{:>24}  {:>10}'.format('case', 'ms'))
+    print('{:>24}  {:>10.1f}'.format('binary tree DFS', bench(tree_dfs, (root,), rounds) * 1000))
+    del root
+    (head, tail) = create_doubly_list(node_num)
+    print('{:>24}  {:>10.1f}'.format('doubly linked list walk', bench(list_walk, (head, tail), rounds) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+"""Compare the native and the pure python strip packing solvers used by Layouter.
+
+Each case packs random rectangles into a strip, then reports the used strip height
+divided by the area lower bound (sum of rectangle areas / strip width) and the time cost.
+The native solver is skipped if it's unavailable or there are more than NATIVE_BENCH_MAX_RECTS rectangles,
+Layouter only uses it for up to NATIVE_SOLVER_MAX_RECTS rectangles.
+
+Usage: python tools/benchmark/packing_benchmark.py [cases]
+
+Author: zjl9959@gmail.com
+
+License: GPLv3
+
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..'))
+
+from ctypes import c_int    # noqa: E402
+from algviz.layouter import RectType, get_packing_solver, is_native_solver_supported    # noqa: E402
+from algviz.packing import solve_strip_packing  # noqa: E402
+
+
+RECT_NUMBERS = [4, 8, 10, 20, 50, 100, 200, 500]
+NATIVE_BENCH_MAX_RECTS = 20     # The native solver takes about 10s for each case if there are more rectangles.
+STRIP_WIDTH = 800
+
+
+def random_rects(rect_num, seed):
+    rand = random.Random(seed)
+    return [(rand.randint(20, 400), rand.randint(20, 300)) for i in range(rect_num)]
+
+
+def solve_by_native(strip_width, rects):
+    rects_data = (RectType * len(rects))()
+    for i in range(len(rects)):
+        rects_data[i].id = i
+        rects_data[i].w, rects_data[i].h = rects[i]
+    get_packing_solver().native_solver().solve_strip_packing(c_int(strip_width), c_int(len(rects)), rects_data)
+    return max([rect.y + rect.h for rect in rects_data])
+
+
+def solve_by_python(strip_width, rects):
+    return solve_strip_packing(strip_width, rects)[1]
+
+
+def bench_solver(solver, rect_num, cases):
+    ratio, cost = 0, 0
+    for seed in range(cases):
+        rects = random_rects(rect_num, seed)
+        strip_width = max(STRIP_WIDTH, max([w for (w, h) in rects]) + 50)
+        lower_bound = max(sum([w * h for (w, h) in rects]) / strip_width, max([h for (w, h) in rects]))
+        start_time = time.perf_counter()
+        height = solver(strip_width, rects)
+        cost += time.perf_counter() - start_time
+        ratio += height / lower_bound
+    return ratio / cases, cost / cases
+
+
+def main():
+    cases = 3
+    if len(sys.argv) > 1:
+        cases = int(sys.argv[1])
+    native = is_native_solver_supported()
+    print('{:>8}  {:>14}  {:>12}  {:>14}  {:>12}'.format('rects', 'native ratio', 'native ms', 'python ratio', 'python ms'))
+    for rect_num in RECT_NUMBERS:
+        python_res = bench_solver(solve_by_python, rect_num, cases)
+        if native and rect_num <= NATIVE_BENCH_MAX_RECTS:
+            native_res = bench_solver(solve_by_native, rect_num, cases)
+            native_cols = '{:>14.3f}  {:>12.1f}'.format(native_res[0], native_res[1] * 1000)
+        else:
+            native_cols = '{:>14}  {:>12}'.format('-', '-')
+        print('{:>8}  {}  {:>14.3f}  {:>12.1f}'.format(rect_num, native_cols, python_res[0], python_res[1] * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+"""Measure the per-frame rendering cost of Vector with different cell numbers.
+
+Each frame marks a few cells, swaps two cells and updates one label,
+then calls Vector._repr_svg_ to generate the SVG. The per-frame cost
+should mainly depend on the number of changed cells, since the XML string
+of unchanged cells are cached by SvgTable.
+Both SvgTable backends ('minidom' and 'string') are measured.
+
+Usage: python tools/benchmark/svg_table_benchmark.py [frames]
+
+Author: zjl9959@gmail.com
+
+License: GPLv3
+
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..'))
+
+from algviz.vector import Vector     # noqa: E402
+from algviz.svg_table import SVG_BACKENDS   # noqa: E402
+
+
+CELL_NUMBERS = [100, 500, 1000, 5000, 10000, 50000]
+
+
+def bench_vector_frame(cell_num, frames, backend):
+    vec = Vector(list(range(cell_num)), 0.5, (40, 40), False, True, backend)
+    for i in range(2):  # The first two frames create and lay out all the initial cells.
+        vec._repr_svg_()
+    start_time = time.perf_counter()
+    for i in range(frames):
+        index = i % (cell_num - 1)
+        vec.mark((255, 0, 0), index)
+        vec.swap(index, cell_num - 1 - index)
+        vec[index] = -i
+        vec._repr_svg_()
+    return (time.perf_counter() - start_time) / frames
+
+
+def main():
+    frames = 5
+    if len(sys.argv) > 1:
+        frames = int(sys.argv[1])
+    print('{:>10}  {:>10}  {:>14}  {:>16}'.format('backend', 'cells', 'ms/frame', 'us/frame/cell'))
+    for backend in SVG_BACKENDS:
+        for cell_num in CELL_NUMBERS:
+            cost = bench_vector_frame(cell_num, frames, backend)
+            print('{:>10}  {:>10}  {:>14.2f}  {:>16.3f}'.format(backend, cell_num, cost * 1000, cost * 1e6 / cell_num))
+
+
+if __name__ == '__main__':
+    main()